@@ -0,0 +1,312 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import warnings
+from datetime import datetime
+
+import openpyxl
+
+import vales_core
+import vales_pdf
+
+# Benchmark del sistema de vales con inventarios sintéticos:
+#     python benchmark_vales.py --filas 10 1000 100000 --salida bench.json
+# Cada etapa se mide por separado (tiempo, filas por segundo y RSS pico) y los
+# resultados se guardan en JSON para compararlos entre versiones.
+
+ETAPAS = ['lectura_excel', 'procesamiento_qr', 'normalizacion', 'vale_individual', 'todos_los_vales', 'escritura_zip']
+
+# Mezcla por defecto de formatos de código QR (proporción de filas)
+MEZCLA_QR_DEFAULT = {'|': 0.6, ';': 0.1, ',': 0.1, 'sin_separador': 0.05, 'vacio': 0.15}
+
+AREAS = [
+    'RECURSOS HUMANOS', 'CONTABILIDAD', 'DIRECCION GENERAL DE ADMINISTRACION Y FINANZAS',
+    'ACTIVO FIJO', 'SERVICIOS GENERALES', 'TECNOLOGIAS DE LA INFORMACION',
+]
+BIENES = ['ESCRITORIO', 'SILLA EJECUTIVA', 'ARCHIVERO', 'COMPUTADORA', 'MONITOR', 'IMPRESORA', 'MESA']
+
+def generar_libro_sintetico(ruta, empleados, articulos_por_empleado, mezcla_qr=None,
+                            descripciones_largas=0.0, semilla=0):
+    """
+    Escribe un libro de inventario con las columnas documentadas del sistema.
+    `mezcla_qr` indica la proporción de filas por formato de QR y
+    `descripciones_largas` la proporción de descripciones de más de 100 caracteres.
+    Retorna el número de filas escritas.
+    """
+    aleatorio = random.Random(semilla)
+    mezcla = mezcla_qr or MEZCLA_QR_DEFAULT
+    formatos = list(mezcla)
+    pesos = [mezcla[formato] for formato in formatos]
+
+    libro = openpyxl.Workbook(write_only=True)
+    hoja = libro.create_sheet()
+    hoja.append(vales_core.COLUMNAS_SISTEMA)
+
+    filas = 0
+    for e in range(empleados):
+        nombre = f"EMPLEADO SINTETICO {e:06d}"
+        curp = f"SINT{e:06d}HDFRPN0{e % 10}"
+        rfc = f"SINT{e:06d}A{e % 10}"
+        area = aleatorio.choice(AREAS)
+        edificio = f"EDIFICIO {aleatorio.choice('ABCD')}"
+        ct = aleatorio.choice(['OFICINAS CENTRALES', 'COMISIONADO'])
+        piso = str(aleatorio.randint(1, 8))
+
+        for a in range(articulos_por_empleado):
+            no_sep = f"{aleatorio.randint(0, 999999):06d}"
+            inventario = f"INV-{e:06d}-{a:04d}"
+            descripcion = f"{aleatorio.choice(BIENES)} {a}"
+            if aleatorio.random() < descripciones_largas:
+                descripcion = (descripcion + " CON ESPECIFICACIONES TECNICAS DETALLADAS") * 3
+            valor = round(aleatorio.uniform(100, 50000), 2)
+
+            formato = aleatorio.choices(formatos, pesos)[0]
+            if formato == 'vacio':
+                qr = None
+                fila_sep, fila_inv, fila_desc, fila_valor = no_sep, inventario, descripcion, valor
+            elif formato == 'sin_separador':
+                qr = descripcion
+                fila_sep, fila_inv, fila_desc, fila_valor = None, None, None, 0
+            else:
+                qr = formato.join([no_sep, inventario, descripcion.replace(formato, ' '), f"${valor:,.2f}".replace(formato, '')])
+                fila_sep, fila_inv, fila_desc, fila_valor = None, None, None, 0
+
+            observaciones = aleatorio.choice([None, None, 'BUEN ESTADO', 'REQUIERE MANTENIMIENTO'])
+            hoja.append([
+                nombre, curp, rfc, area, edificio, qr, fila_sep, fila_inv,
+                fila_desc, fila_valor, observaciones, ct, piso
+            ])
+            filas += 1
+
+    libro.save(ruta)
+    return filas
+
+def _rss_actual():
+    """RSS actual del proceso en bytes (None si no está disponible)"""
+    try:
+        with open('/proc/self/statm') as archivo:
+            return int(archivo.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+class MedidorRSS:
+    """Muestrea el RSS en un hilo para obtener el pico de una etapa"""
+    def __init__(self, intervalo=0.005):
+        self.intervalo = intervalo
+        self.pico = 0
+        self._detener = threading.Event()
+        self._hilo = threading.Thread(target=self._muestrear, daemon=True)
+
+    def _muestrear(self):
+        while not self._detener.is_set():
+            self.pico = max(self.pico, _rss_actual() or 0)
+            self._detener.wait(self.intervalo)
+
+    def __enter__(self):
+        self.pico = _rss_actual() or 0
+        self._hilo.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._detener.set()
+        self._hilo.join()
+        self.pico = max(self.pico, _rss_actual() or 0)
+        if not self.pico:
+            # Sin /proc: pico del proceso completo (no se reinicia entre etapas)
+            self.pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def medir_etapa(funcion, filas):
+    """Ejecuta `funcion` y retorna (resultado, métricas de la etapa)"""
+    gc.collect()
+    with MedidorRSS() as medidor:
+        inicio = time.perf_counter()
+        resultado = funcion()
+        segundos = time.perf_counter() - inicio
+    metricas = {
+        'segundos': round(segundos, 4),
+        'filas': filas,
+        'filas_por_segundo': round(filas / segundos, 1) if segundos > 0 else None,
+        'rss_pico_mb': round(medidor.pico / (1024 * 1024), 1),
+    }
+    return resultado, metricas
+
+def bytes_vale_sin_optimizar(generar):
+    """Tamaño del vale que produce `generar` con las imágenes de marca originales"""
+    cache = vales_pdf.CACHE_IMAGENES
+    optimizar = cache.optimizar
+    cache.optimizar = False
+    try:
+        return len(generar())
+    finally:
+        cache.optimizar = optimizar
+
+def ejecutar_caso(filas, articulos_por_empleado, directorio, etapas, procesos,
+                  mezcla_qr=None, descripciones_largas=0.0):
+    """Genera un inventario sintético de ~`filas` filas y mide cada etapa"""
+    empleados = max(1, filas // articulos_por_empleado)
+    ruta_libro = os.path.join(directorio, f"inventario_{filas}.xlsx")
+    filas_reales = generar_libro_sintetico(
+        ruta_libro, empleados, articulos_por_empleado, mezcla_qr, descripciones_largas
+    )
+    caso = {
+        'filas': filas_reales,
+        'empleados': empleados,
+        'articulos_por_empleado': articulos_por_empleado,
+        'bytes_libro': os.path.getsize(ruta_libro),
+        'etapas': {},
+    }
+    fecha = datetime(2025, 1, 1)
+
+    df, caso['etapas']['lectura_excel'] = medir_etapa(
+        lambda: vales_core.leer_excel_inventario(ruta_libro), filas_reales
+    )
+    df = df.dropna(subset=['NOMBRE'])
+    df['VALOR'] = df['VALOR'].fillna(0).astype(float)
+
+    if 'procesamiento_qr' in etapas:
+        df, caso['etapas']['procesamiento_qr'] = medir_etapa(
+            lambda: vales_core.procesar_dataframe_con_qr(df), filas_reales
+        )
+    else:
+        df = vales_core.procesar_dataframe_con_qr(df)
+
+    if 'normalizacion' in etapas:
+        memoria_antes = vales_core.memoria_inventario(df)
+        (df, indice), metricas = medir_etapa(lambda: vales_core.normalizar_inventario(df), filas_reales)
+        metricas['memoria_antes_mb'] = round(memoria_antes / 1_048_576, 2)
+        metricas['memoria_despues_mb'] = round(vales_core.memoria_inventario(df, indice) / 1_048_576, 2)
+        caso['etapas']['normalizacion'] = metricas
+    else:
+        df, indice = vales_core.normalizar_inventario(df)
+
+    if 'vale_individual' in etapas:
+        empleado = next(iter(indice))
+        bloque = vales_core.obtener_bloque_empleado(df, indice, empleado)
+        datos = vales_core.obtener_datos_empleado(df, indice, empleado)
+        def generar():
+            return vales_core.generar_vale_pdf(empleado, datos, bloque, fecha=fecha)
+
+        pdf_bytes, metricas = medir_etapa(generar, len(bloque))
+        metricas['bytes_vale'] = len(pdf_bytes)
+        # Tamaño antes y después de optimizar las imágenes de marca
+        metricas['bytes_vale_imagenes_originales'] = bytes_vale_sin_optimizar(generar)
+        caso['etapas']['vale_individual'] = metricas
+
+    directorio_pdf = os.path.join(directorio, f"vales_{filas}")
+    if 'todos_los_vales' in etapas or 'escritura_zip' in etapas:
+        os.makedirs(directorio_pdf, exist_ok=True)
+
+        def generar_todos():
+            # Sin caché para medir el renderizado; los PDF se guardan en disco para la etapa ZIP
+            total_bytes = 0
+            for _, resultado, error in vales_core.iterar_vales(df, indice, procesos, fecha, cache=None):
+                if error is not None:
+                    continue
+                filename, pdf_bytes = resultado
+                total_bytes += len(pdf_bytes)
+                with open(os.path.join(directorio_pdf, filename), 'wb') as archivo:
+                    archivo.write(pdf_bytes)
+            return total_bytes
+
+        total_bytes, metricas = medir_etapa(generar_todos, filas_reales)
+        metricas['empleados_por_segundo'] = round(len(indice) / metricas['segundos'], 1) if metricas['segundos'] else None
+        metricas['bytes_pdf'] = total_bytes
+        metricas['bytes_promedio_vale'] = round(total_bytes / max(1, len(indice)))
+        metricas['procesos'] = procesos
+        caso['etapas']['todos_los_vales'] = metricas
+
+    if 'escritura_zip' in etapas:
+        def leer_vales():
+            for filename in sorted(os.listdir(directorio_pdf)):
+                with open(os.path.join(directorio_pdf, filename), 'rb') as archivo:
+                    yield filename, (filename, archivo.read()), None
+
+        ruta_zip, metricas = medir_etapa(
+            lambda: vales_core.escribir_zip_vales(leer_vales(), fecha, destino=os.path.join(directorio, 'vales.zip')),
+            filas_reales
+        )
+        metricas['bytes_zip'] = os.path.getsize(ruta_zip)
+        caso['etapas']['escritura_zip'] = metricas
+
+    shutil.rmtree(directorio_pdf, ignore_errors=True)
+    return caso
+
+def _version_git():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark del sistema de vales con inventarios sintéticos")
+    parser.add_argument('--filas', type=int, nargs='+', default=[10, 100, 1000, 10000, 100000],
+                        help="Tamaños de inventario a medir (filas)")
+    parser.add_argument('--articulos', type=int, default=10, help="Artículos por empleado")
+    parser.add_argument('--etapas', nargs='+', choices=ETAPAS, default=ETAPAS, help="Etapas a medir")
+    parser.add_argument('--procesos', type=int, default=1, help="Procesos para generar todos los vales")
+    parser.add_argument('--qr', type=json.loads, default=None,
+                        help='Mezcla de formatos QR en JSON, p. ej. \'{"|": 0.8, "vacio": 0.2}\'')
+    parser.add_argument('--descripciones-largas', type=float, default=0.0,
+                        help="Proporción de descripciones largas (0 a 1)")
+    parser.add_argument('--etiqueta', default=None, help="Etiqueta de la versión medida")
+    parser.add_argument('--salida', default='bench_resultados.json', help="Archivo JSON de resultados")
+    args = parser.parse_args(argv)
+
+    warnings.simplefilter("ignore", DeprecationWarning)
+    warnings.filterwarnings("ignore", message="Substituting font", category=UserWarning)
+
+    resultados = {
+        'etiqueta': args.etiqueta,
+        'git': _version_git(),
+        'version_plantilla': vales_core.VERSION_PLANTILLA_VALE,
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'parametros': {
+            'articulos_por_empleado': args.articulos,
+            'procesos': args.procesos,
+            'mezcla_qr': args.qr or MEZCLA_QR_DEFAULT,
+            'descripciones_largas': args.descripciones_largas,
+        },
+        'casos': [],
+    }
+
+    with tempfile.TemporaryDirectory(prefix="bench_vales_") as directorio:
+        for filas in args.filas:
+            caso = ejecutar_caso(
+                filas, args.articulos, directorio, args.etapas, args.procesos,
+                args.qr, args.descripciones_largas
+            )
+            resultados['casos'].append(caso)
+            resumen = ", ".join(
+                f"{etapa} {metricas['segundos']:.3f}s" for etapa, metricas in caso['etapas'].items()
+            )
+            vale = caso['etapas'].get('vale_individual')
+            if vale:
+                resumen += (
+                    f", vale {vale['bytes_vale_imagenes_originales'] / 1024:.0f} KB -> "
+                    f"{vale['bytes_vale'] / 1024:.0f} KB"
+                )
+            print(f"{caso['filas']} filas: {resumen}", file=sys.stderr)
+
+    with open(args.salida, 'w', encoding='utf-8') as archivo:
+        json.dump(resultados, archivo, ensure_ascii=False, indent=2)
+    print(f"Resultados guardados en {args.salida}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
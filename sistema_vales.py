@@ -1,772 +1,1146 @@
-import streamlit as st
-import pandas as pd
-from fpdf import FPDF
-import base64
-from datetime import datetime
-import os
-import zipfile
-import tempfile
-import io
-import logging
-import re
-from PIL import Image
-import numpy as np
-import atexit
-import sys
-
-# CONFIGURACIÓN COMPATIBLE CON STREAMLIT CLOUD
-st.set_page_config(
-    page_title="Sistema de Vales de Resguardo DGA",
-    layout="wide",
-    page_icon="🏛️",
-    initial_sidebar_state="expanded"
-)
-
-# Evitar errores de caché
-@st.cache_resource(show_spinner=False)
-def load_data():
-    return None
-
-# Configurar logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
-
-# Configuración de la página
-st.set_page_config(
-    page_title="Sistema de Vales de Resguardo - Área de Activo Fijo DGA", 
-    layout="wide",
-    page_icon="🏛️"
-)
-
-# Inicializar session_state para manejo de estado
-if 'selected_employee' not in st.session_state:
-    st.session_state.selected_employee = None
-if 'df_processed' not in st.session_state:
-    st.session_state.df_processed = None
-if 'empleados_list' not in st.session_state:
-    st.session_state.empleados_list = []
-if 'file_uploaded' not in st.session_state:
-    st.session_state.file_uploaded = False
-
-class PDF(FPDF):
-    def __init__(self):
-        super().__init__()
-    
-    def header(self):
-        # Logo horizontal en TODAS las páginas
-        try:
-            self.image("LOGOS_VALE.png", x=10, y=8, w=190)
-        except:
-            # Si no encuentra el logo, poner título
-            self.set_font("Arial", 'B', 14)
-            self.cell(0, 5, "VALES DE RESGUARDO INTERNO 2025", 0, 1, 'C')
-        self.ln(12)
-    
-    def footer(self):
-        # Pie de página con IMAGEN en TODAS las páginas
-        try:
-            # Usar la imagen Pie_vale.png en lugar de texto
-            self.image("Pie_vale.png", x=10, y=self.h - 30, w=190)
-        except:
-            # Fallback a texto si la imagen no existe
-            self.set_y(-25)
-            self.set_font("Arial", 'I', 8)
-            self.set_text_color(100, 100, 100)
-            self.cell(0, 5, "Agustin Delgado No. 58, Col. Transito, CP. 06820, Alcaldia Cuauhtemoc, CDMX.", 0, 1, 'C')
-            self.cell(0, 5, "Tel: (55) 3601 7100", 0, 1, 'C')
-            self.cell(0, 5, f"Página {self.page_no()}", 0, 0, 'C')
-
-def procesar_codigo_qr(codigo_qr):
-    """
-    Procesa el código QR para extraer:
-    - No. SEP
-    - Número de inventario
-    - Descripción
-    - Valor
-    """
-    # Inicializar valores por defecto
-    no_sep = ""
-    numero_inventario = ""
-    descripcion = ""
-    valor = 0
-    
-    try:
-        # MEJORA: Validación de código QR vacío
-        if not codigo_qr or codigo_qr.strip() == "":
-            return no_sep, numero_inventario, descripcion, valor
-            
-        # MEJORA: Limpieza del código QR
-        codigo_qr = codigo_qr.strip()
-        
-        # Intentar diferentes patrones de códigos QR
-        # Patrón 1: Formato estándar con separadores |
-        if "|" in codigo_qr:
-            partes = codigo_qr.split("|")
-            if len(partes) >= 4:
-                no_sep = partes[0].strip()
-                numero_inventario = partes[1].strip()
-                descripcion = partes[2].strip()
-                # Extraer valor numérico (eliminar caracteres no numéricos)
-                valor_str = re.sub(r'[^\d.]', '', partes[3])
-                valor = float(valor_str) if valor_str else 0
-        
-        # Patrón 2: Formato con otros separadores
-        elif ";" in codigo_qr:
-            partes = codigo_qr.split(";")
-            if len(partes) >= 4:
-                no_sep = partes[0].strip()
-                numero_inventario = partes[1].strip()
-                descripcion = partes[2].strip()
-                valor_str = re.sub(r'[^\d.]', '', partes[3])
-                valor = float(valor_str) if valor_str else 0
-                
-        # MEJORA: Patrón 3 - Formato con comas
-        elif "," in codigo_qr:
-            partes = codigo_qr.split(",")
-            if len(partes) >= 4:
-                no_sep = partes[0].strip()
-                numero_inventario = partes[1].strip()
-                descripcion = partes[2].strip()
-                valor_str = re.sub(r'[^\d.]', '', partes[3])
-                valor = float(valor_str) if valor_str else 0
-                
-        # Si no coincide con ningún patrón conocido, usar el código completo como descripción
-        else:
-            descripcion = codigo_qr[:50]  # Limitar a 50 caracteres
-            
-    except Exception as e:
-        logger.error(f"Error al procesar código QR '{codigo_qr}': {str(e)}")
-    
-    return no_sep, numero_inventario, descripcion, valor
-
-def procesar_dataframe_con_qr(df):
-    """
-    Procesa el DataFrame que contiene la columna QR y completa las columnas correspondientes
-    """
-    # MEJORA: Validación de DataFrame vacío
-    if df is None or df.empty:
-        return df
-        
-    # Verificar si existe la columna QR
-    if 'QR' not in df.columns:
-        return df
-    
-    # Crear copia del DataFrame para no modificar el original
-    df_procesado = df.copy()
-    
-    # Asegurar que existan las columnas necesarias
-    columnas_necesarias = ['No. SEP', 'NUMERO DE INVVENTARIO', 'DESCRIPCION', 'VALOR']
-    for col in columnas_necesarias:
-        if col not in df_procesado.columns:
-            df_procesado[col] = ""
-            if col == 'VALOR':
-                df_procesado[col] = 0.0
-    
-    # Procesar cada fila con código QR
-    for idx, row in df_procesado.iterrows():
-        qr_value = str(row['QR']) if pd.notna(row['QR']) else ""
-        
-        # MEJORA: Validación más robusta de valores QR
-        if qr_value and qr_value.strip() not in ["", "nan", "None"]:
-            # Verificar si las columnas destino ya tienen datos
-            no_sep_existente = str(row['No. SEP']) if pd.notna(row['No. SEP']) else ""
-            inventario_existente = str(row['NUMERO DE INVVENTARIO']) if pd.notna(row['NUMERO DE INVVENTARIO']) else ""
-            
-            # Solo procesar QR si las columnas destino están vacías
-            if not no_sep_existente.strip() and not inventario_existente.strip():
-                no_sep, numero_inv, descripcion, valor = procesar_codigo_qr(qr_value)
-                
-                # Actualizar las columnas correspondientes
-                if no_sep:
-                    df_procesado.at[idx, 'No. SEP'] = no_sep
-                if numero_inv:
-                    df_procesado.at[idx, 'NUMERO DE INVVENTARIO'] = numero_inv
-                if descripcion and (not row['DESCRIPCION'] or pd.isna(row['DESCRIPCION']) or str(row['DESCRIPCION']).strip() == ""):
-                    df_procesado.at[idx, 'DESCRIPCION'] = descripcion
-                if valor > 0 and (not row['VALOR'] or row['VALOR'] == 0):
-                    df_procesado.at[idx, 'VALOR'] = valor
-    
-    return df_procesado
-
-def generar_vale_pdf(empleado, datos_empleado, inventario_empleado):
-    """Genera el contenido PDF y lo retorna como bytes"""
-    try:
-        # MEJORA: Validación de datos de entrada
-        if inventario_empleado is None or inventario_empleado.empty:
-            raise Exception("No hay datos de inventario para generar el vale")
-            
-        if datos_empleado is None or datos_empleado.empty:
-            raise Exception("No hay datos del empleado")
-        
-        # Crear PDF con formato oficial
-        pdf = PDF()
-        pdf.add_page()
-        pdf.set_auto_page_break(auto=True, margin=30)
-        pdf.set_margins(left=10, top=25, right=10)
-        
-        # Título principal
-        pdf.set_font("Arial", 'B', 16)
-        pdf.cell(0, 8, "VALE DE RESGUARDO 2025", 0, 1, 'C')
-        pdf.ln(3)
-        
-        # Sección de información del responsable - FORMATO MEJORADO CON 2 COLUMNAS PEGADAS
-        y_start = pdf.get_y()
-        pdf.rect(10, y_start, 190, 42)
-        
-        # Título dentro del marco
-        pdf.set_font("Arial", 'B', 11)
-        pdf.set_xy(10, y_start + 3)
-        pdf.cell(190, 6, "INFORMACIÓN DEL RESPONSABLE", 0, 1, 'C')
-        pdf.line(10, y_start + 9, 200, y_start + 9)  # Línea bajo el título
-
-        # Línea vertical divisoria más a la derecha (120 en lugar de 130)
-        pdf.line(120, y_start + 9, 120, y_start + 42)
-
-        # Columna izquierda - Información más pegada
-        pdf.set_font("Arial", 'B', 8)
-        pdf.set_xy(12, y_start + 12)
-        pdf.cell(35, 5, "NOMBRE COMPLETO:", 0, 0)
-        pdf.set_font("Arial", '', 8)
-        nombre = f"{datos_empleado.get('NOMBRE', '')}"
-        # Ajustar nombre largo
-        if len(nombre) > 35:
-            nombre = nombre[:32] + "..."
-        pdf.cell(85, 5, nombre, 0, 1)
-        
-        pdf.set_font("Arial", 'B', 8)
-        pdf.set_xy(12, y_start + 17)
-        pdf.cell(15, 5, "CURP:", 0, 0)
-        pdf.set_font("Arial", '', 8)
-        curp = f"{datos_empleado.get('CURP', '')}"
-        pdf.cell(93, 5, curp, 0, 1)
-        
-        pdf.set_font("Arial", 'B', 8)
-        pdf.set_xy(12, y_start + 22)
-        pdf.cell(12, 5, "RFC:", 0, 0)
-        pdf.set_font("Arial", '', 8)
-        rfc = f"{datos_empleado.get('RFC', '')}"
-        pdf.cell(96, 5, rfc, 0, 1)
-        
-        # Área de adscripción - Más compacta y pegada
-        pdf.set_font("Arial", 'B', 8)
-        pdf.set_xy(12, y_start + 27)
-        pdf.cell(42, 5, "AREA DE ADSCRIPCION:", 0, 0)
-        pdf.set_font("Arial", '', 8)
-        area = f"{datos_empleado.get('AREA O DEPARTAMENTO', '')}"
-        
-        # Verificar si el área es demasiado larga para una línea
-        if len(area) > 20:
-            # Dividir en two líneas
-            mitad = len(area) // 2
-            espacio_idx = area.rfind(' ', 0, mitad)
-            if espacio_idx == -1:
-                espacio_idx = mitad
-                
-            linea1 = area[:espacio_idx].strip()
-            linea2 = area[espacio_idx:].strip()
-            
-            pdf.cell(66, 5, linea1, 0, 1)
-            pdf.set_x(54)
-            pdf.cell(66, 5, linea2, 0, 1)
-        else:
-            pdf.cell(66, 5, area, 0, 1)
-        
-        # Campo EDIFICIO
-        pdf.set_font("Arial", 'B', 8)
-        pdf.set_xy(12, y_start + 37)
-        pdf.cell(25, 5, "EDIFICIO:", 0, 0)
-        pdf.set_font("Arial", '', 8)
-        edificio = f"{datos_empleado.get('EDIFICIO', '')}"
-        pdf.cell(83, 5, edificio, 0, 1)
-        
-        # Columna derecha - Información más pegada y ajustada
-        pdf.set_font("Arial", 'B', 8)
-        pdf.set_xy(122, y_start + 12)
-        pdf.cell(38, 5, "CENTRO DE TRABAJO:", 0, 0)
-        pdf.set_font("Arial", '', 8)
-        ct = f"{datos_empleado.get('CT', 'COMISIONADO')}"
-        pdf.cell(40, 5, ct, 0, 1)
-        
-        pdf.set_font("Arial", 'B', 8)
-        pdf.set_xy(122, y_start + 17)
-        pdf.cell(15, 5, "PISO:", 0, 0)
-        pdf.set_font("Arial", '', 8)
-        piso = f"{datos_empleado.get('PISO', '')}"
-        pdf.cell(63, 5, piso, 0, 1)
-        
-        pdf.set_font("Arial", 'B', 8)
-        pdf.set_xy(122, y_start + 22)
-        pdf.cell(48, 5, "FECHA LEVANTAMIENTO:", 0, 0)
-        pdf.set_font("Arial", '', 8)
-        pdf.cell(30, 5, f"{datetime.now().strftime('%d/%m/%Y')}", 0, 1)
-        
-        pdf.set_font("Arial", 'B', 8)
-        pdf.set_xy(122, y_start + 27)
-        pdf.cell(33, 5, "TOTAL MUEBLES:", 0, 0)
-        pdf.set_font("Arial", '', 8)
-        pdf.cell(45, 5, f"{len(inventario_empleado)}", 0, 1)
-        
-        pdf.set_y(y_start + 43)
-        
-        # Tabla de bienes - ANCHOS AJUSTADOS PARA OBSERVACIONES
-        pdf.set_font("Arial", 'B', 12)
-        pdf.cell(0, 8, "INVENTARIO OFICIAL DE BIENES MUEBLES", 0, 1, 'C')
-        pdf.ln(2)
-        
-        # Encabezados de tabla con anchos OPTIMIZADOS para observaciones
-        col_widths = [8, 15, 40, 65, 20, 42]
-        headers = ["No.", "No. SEP", "NO. INVENTARIO", "DESCRIPCION DEL BIEN", "VALOR", "OBSERV."]
-        
-        def draw_headers():
-            pdf.set_draw_color(0, 51, 102)
-            pdf.set_fill_color(230, 240, 250)
-            pdf.set_font("Arial", 'B', 7)
-            for i, header in enumerate(headers):
-                pdf.cell(col_widths[i], 7, header, 1, 0, 'C', fill=True)
-            pdf.ln()
-            pdf.set_font("Arial", '', 7)
-        
-        draw_headers()
-        
-        total_valor = 0
-        for idx, (_, item) in enumerate(inventario_empleado.iterrows(), 1):
-            if pdf.get_y() > 220:
-                pdf.add_page()
-                draw_headers()
-            
-            fill_color = (245, 245, 245) if idx % 2 == 0 else (255, 255, 255)
-            pdf.set_fill_color(*fill_color)
-            
-            pdf.cell(col_widths[0], 6, str(idx), 1, 0, 'C', fill=True)
-            
-            no_sep = str(item.get('No. SEP', ''))
-            if no_sep.lower() == 'nan' or no_sep == '':
-                no_sep = ''
-            pdf.cell(col_widths[1], 6, no_sep[:8], 1, 0, 'C', fill=True)
-            
-            no_inv = str(item.get('NUMERO DE INVVENTARIO', ''))
-            if no_inv.lower() == 'nan' or no_inv == '':
-                no_inv = ''
-            
-            if len(no_inv) > 20:
-                pdf.set_font("Arial", '', 6)
-                pdf.cell(col_widths[2], 6, no_inv[:25], 1, 0, 'C', fill=True)
-                pdf.set_font("Arial", '', 7)
-            else:
-                pdf.cell(col_widths[2], 6, no_inv, 1, 0, 'C', fill=True)
-            
-            descripcion = str(item.get('DESCRIPCION', ''))
-            if len(descripcion) > 35:
-                descripcion = descripcion[:32] + "..."
-            pdf.cell(col_widths[3], 6, descripcion, 1, 0, 'L', fill=True)
-            
-            valor = item.get('VALOR', 0)
-            pdf.cell(col_widths[4], 6, f"${valor:.2f}", 1, 0, 'R', fill=True)
-            
-            observ = str(item.get('OBSERVACIONES', ''))
-            if no_sep == '' and no_inv == '' and valor == 0:
-                observ = "EN PROCESO DE ALTA"
-            elif observ.lower() == 'nan':
-                observ = ''
-            
-            if len(observ) > 25:
-                pdf.set_font("Arial", '', 6)
-                pdf.cell(col_widths[5], 6, observ[:35], 1, 0, 'C', fill=True)
-                pdf.set_font("Arial", '', 7)
-            else:
-                pdf.cell(col_widths[5], 6, observ, 1, 0, 'C', fill=True)
-            
-            pdf.ln()
-            total_valor += valor
-        
-        # Total
-        pdf.set_font("Arial", 'B', 8)
-        pdf.set_fill_color(220, 230, 240)
-        pdf.cell(sum(col_widths[:4]), 7, "VALOR TOTAL DEL INVENTARIO:", 1, 0, 'R', fill=True)
-        pdf.cell(col_widths[4], 7, f"${total_valor:.2f}", 1, 0, 'R', fill=True)
-        pdf.cell(col_widths[5], 7, "", 1, 1, fill=True)
-        
-        pdf.ln(8)
-        
-        # Condiciones de resguardo
-        pdf.set_font("Arial", 'B', 9)
-        pdf.cell(0, 6, "CONDICIONES DE RESGUARDO", 0, 1, 'C')
-        
-        pdf.set_font("Arial", '', 7)
-        condiciones = [
-            "- Los bienes muebles se entregan bajo custodia del resguardante.",
-            "- El resguardante es responsable conforme to the Ley General de Bienes Nacionales.",
-            "- Los bienes son propiedad institucional, no del personal.",
-            "- Debe notificar cualquier movimiento, pérdida or daño inmediatamente.",
-            "- En caso de cambio de adscripción or renuncia, debe devolver los bienes."
-        ]
-        
-        for condicion in condiciones:
-            pdf.cell(0, 3.5, condicion, 0, 1)
-            
-        pdf.ln(5)
-        
-        # Sección de firmas
-        y_firmas = pdf.get_y()
-        pdf.rect(10, y_firmas, 190, 40)
-        
-        # Título de la sección
-        pdf.set_font("Arial", 'B', 9)
-        pdf.set_xy(10, y_firmas + 3)
-        pdf.cell(190, 6, "FIRMAS", 0, 1, 'C')
-        pdf.line(10, y_firmas + 9, 200, y_firmas + 9)
-        
-        # Línea vertical divisoria en el centro
-        pdf.line(105, y_firmas + 9, 105, y_firmas + 40)
-        
-        # RESGUARDANTE (LADO IZQUIERDO)
-        pdf.set_font("Arial", 'B', 9)
-        pdf.set_xy(10, y_firmas + 12)
-        pdf.cell(95, 5, "RESGUARDANTE", 0, 0, 'C')
-        
-        # Espacio para firma
-        pdf.set_font("Arial", '', 8)
-        pdf.set_xy(25, y_firmas + 22)
-        pdf.cell(65, 10, "_________________________", 0, 0, 'C')
-        
-        nombre_resguardante = f"{datos_empleado.get('NOMBRE', '')}"
-        if len(nombre_resguardante) > 35:
-            nombre_resguardante = nombre_resguardante[:32] + "..."
-        
-        pdf.set_xy(10, y_firmas + 32)
-        pdf.cell(95, 5, nombre_resguardante, 0, 0, 'C')
-        
-        # AUTORIZA (LADO DERECHO)
-        pdf.set_font("Arial", 'B', 9)
-        pdf.set_xy(105, y_firmas + 12)
-        pdf.cell(95, 5, "AUTORIZA", 0, 0, 'C')
-        
-        # Espacio para firma
-        pdf.set_font("Arial", '', 8)
-        pdf.set_xy(120, y_firmas + 22)
-        pdf.cell(65, 10, "_________________________", 0, 0, 'C')
-        
-        pdf.set_xy(105, y_firmas + 32)
-        pdf.cell(95, 5, "EDNA SANCHEZ MARTINEZ", 0, 0, 'C')
-        
-        pdf.set_font("Arial", 'I', 7)
-        pdf.set_xy(105, y_firmas + 37)
-        pdf.cell(95, 4, "Coordinadora Administrativa", 0, 0, 'C')
-        
-        # Retornar el PDF como bytes
-        return pdf.output(dest='S').encode('latin1')
-        
-    except Exception as e:
-        logger.error(f"Error al generar el PDF para {empleado}: {str(e)}")
-        raise Exception(f"Error al generar el PDF para {empleado}: {str(e)}")
-
-def generar_vale_individual(empleado, df):
-    """Genera y descarga un vale de resguardo individual"""
-    try:
-        # MEJORA: Validación de empleado existente
-        if empleado not in df['NOMBRE'].values:
-            st.error(f"Empleado '{empleado}' no encontrado en los datos")
-            return
-            
-        # Filtrar datos del empleado
-        datos_empleado = df[df['NOMBRE'] == empleado].iloc[0]
-        inventario_empleado = df[df['NOMBRE'] == empleado]
-        
-        # MEJORA: Validación de inventario vacío
-        if inventario_empleado.empty:
-            st.warning(f"El empleado {empleado} no tiene artículos en el inventario")
-            return
-        
-        # Generar PDF
-        pdf_bytes = generar_vale_pdf(empleado, datos_empleado, inventario_empleado)
-        
-        # Descargar
-        filename = f"Vale_Resguardo_{empleado.replace(' ', '_')}.pdf"
-        
-        st.download_button(
-            label="📥 Descargar Vale Oficial",
-            data=pdf_bytes,
-            file_name=filename,
-            mime="application/pdf",
-            type="primary",
-            key=f"download_{empleado}"
-        )
-        
-        st.success(f"✅ Vale oficial generado para {empleado}")
-        
-    except Exception as e:
-        st.error(f"Error al generar el vale: {str(e)}")
-
-def generar_todos_los_vales(df):
-    """Genera todos los vales y retorna un archivo ZIP"""
-    try:
-        # MEJORA: Validación de DataFrame vacío
-        if df is None or df.empty:
-            st.error("No hay datos para generar vales")
-            return None
-            
-        empleados = df['NOMBRE'].unique()
-        zip_buffer = io.BytesIO()
-        
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for empleado in empleados:
-                try:
-                    datos_empleado = df[df['NOMBRE'] == empleado].iloc[0]
-                    inventario_empleado = df[df['NOMBRE'] == empleado]
-                    
-                    # MEJORA: Saltar empleados sin inventario
-                    if inventario_empleado.empty:
-                        continue
-                        
-                    pdf_bytes = generar_vale_pdf(empleado, datos_empleado, inventario_empleado)
-                    
-                    filename = f"Vale_Resguardo_{empleado.replace(' ', '_')}.pdf"
-                    zipf.writestr(filename, pdf_bytes)
-                    
-                except Exception as e:
-                    st.warning(f"⚠️ Error con {empleado}: {str(e)}")
-                    continue
-        
-        zip_buffer.seek(0)
-        return zip_buffer.getvalue()
-        
-    except Exception as e:
-        st.error(f"Error al generar el archivo ZIP: {str(e)}")
-        return None
-
-def procesar_archivo_excel(uploaded_file):
-    """Procesa el archivo Excel y devuelve un DataFrame limpio"""
-    try:
-        # MEJORA: Validación de archivo vacío
-        if uploaded_file is None:
-            return None
-            
-        # Leer el archivo Excel
-        df = pd.read_excel(uploaded_file)
-        
-        # MEJORA: Validación de DataFrame vacío
-        if df is None or df.empty:
-            st.error("El archivo Excel está vacío")
-            return None
-        
-        # Validar columnas mínimas requeridas
-        columnas_requeridas = ['NOMBRE', 'DESCRIPCION', 'VALOR']
-        for col in columnas_requeridas:
-            if col not in df.columns:
-                st.error(f"El archivo debe contener la columna: {col}")
-                return None
-        
-        # Limpiar datos
-        df = df.dropna(subset=['NOMBRE'])
-        df['VALOR'] = pd.to_numeric(df['VALOR'], errors='coerce').fillna(0)
-        
-        # Limpiar nombres de columnas (eliminar espacios extra)
-        df.columns = df.columns.str.strip()
-        
-        # Procesar códigos QR si existe la columna
-        if 'QR' in df.columns:
-            df = procesar_dataframe_con_qr(df)
-        
-        return df
-        
-    except Exception as e:
-        st.error(f"Error al procesar el archivo: {str(e)}")
-        return None
-
-def mostrar_estadisticas(df):
-    """Muestra estadísticas del inventario"""
-    # MEJORA: Validación de DataFrame
-    if df is None or df.empty:
-        st.warning("No hay datos para mostrar estadísticas")
-        return
-        
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        st.metric("Total de empleados", len(df['NOMBRE'].unique()))
-    with col2:
-        st.metric("Total de artículos", len(df))
-    with col3:
-        st.metric("Valor total inventario", f"${df['VALOR'].sum():,.2f}")
-    with col4:
-        valor_promedio = df['VALOR'].mean() if len(df) > 0 else 0
-        st.metric("Valor promedio por artículo", f"${valor_promedio:,.2f}")
-
-def mostrar_encabezado_web():
-    """Muestra el encabezado de la página web"""
-    try:
-        # Intenta cargar la imagen del encabezado
-        st.image("ENCABEZADO_WEB.png", use_container_width=True)
-    except:
-        # Si no encuentra la imagen, muestra un encabezado alternativo
-        st.markdown("""
-        <div style="background-color: #0c4e94; padding: 20px; border-radius: 10px; text-align: center; margin-bottom: 20px;">
-            <h1 style="color: white; margin: 0;">Sistema de Vales de Resguardo</h1>
-            <p style="color: white; margin: 5px 0 0 0;">Área de Activo Fijo - Dirección General de Administración</p>
-        </div>
-        """, unsafe_allow_html=True)
-
-def mostrar_pie_web():
-    """Muestra el pie de página de la web"""
-    try:
-        # MEJORA: Usar la imagen Pie_vale.png para el pie de página web también
-        st.image("Pie_vale.png", use_container_width=True)
-    except:
-        # Si no encuentra la imagen, muestra un pie de página alternativo
-        st.markdown("""
-        <div style="background-color: #f0f2f6; padding: 15px; text-align: center; margin-top: 30px; border-top: 2px solid #0c4e94;">
-            <p style="color: #555555; margin: 0;">Sistema desarrollado por el Área de Activo Fijo - DGA 2025</p>
-        </div>
-        """, unsafe_allow_html=True)
-
-def main():
-    """Función principal de la aplicación"""
-    # Mostrar encabezado
-    mostrar_encabezado_web()
-    
-    st.title("🏛️ Sistema de Generación de Vales de Resguardo")
-    
-    # Cargar archivo Excel
-    uploaded_file = st.file_uploader("Cargar archivo de inventario Excel", type=["xlsx", "xls"])
-    
-    if uploaded_file:
-        try:
-            # Procesar el archivo
-            if st.session_state.df_processed is None:
-                df = procesar_archivo_excel(uploaded_file)
-                if df is None:
-                    return
-                st.session_state.df_processed = df
-                st.session_state.empleados_list = sorted(df['NOMBRE'].unique())
-                # Establecer el primer empleado como selección predeterminada
-                if st.session_state.selected_employee is None and st.session_state.empleados_list:
-                    st.session_state.selected_employee = st.session_state.empleados_list[0]
-                st.session_state.file_uploaded = True
-            else:
-                df = st.session_state.df_processed
-                
-            # MEJORA: Validación de DataFrame procesado
-            if df is None or df.empty:
-                st.error("No se pudieron procesar los datos del archivo")
-                return
-                
-            # Mostrar estadísticas generales
-            mostrar_estadisticas(df)
-            
-            # Seleccionar empleado
-            empleados = st.session_state.empleados_list
-            
-            # MEJORA: Validación de lista de empleados
-            if not empleados:
-                st.warning("No se encontraron empleados en el archivo")
-                return
-                
-            # Obtener el índice actual para mantener la selección
-            current_index = 0
-            if st.session_state.selected_employee in empleados:
-                current_index = empleados.index(st.session_state.selected_employee)
-            
-            # Widget para seleccionar empleado
-            selected_employee = st.selectbox(
-                "Seleccionar empleado", 
-                options=empleados,
-                index=current_index,
-                key='employee_selector'
-            )
-            
-            # Actualizar session_state con la selección actual
-            st.session_state.selected_employee = selected_employee
-            
-            # Filtrar datos del empleado seleccionado
-            datos_empleado = df[df['NOMBRE'] == selected_employee]
-            
-            # MEJORA: Validación de datos del empleado
-            if datos_empleado.empty:
-                st.warning(f"No se encontraron datos para el empleado: {selected_employee}")
-                return
-            
-            # Botones de acción
-            col1, col2 = st.columns(2)
-            with col1:
-                if st.button("📄 Generar Vale Individual", type="primary", use_container_width=True):
-                    generar_vale_individual(selected_employee, df)
-            
-            with col2:
-                if st.button("📚 Generar Todos los Vales", use_container_width=True):
-                    with st.spinner("🔄 Generando todos los vales, por favor espere..."):
-                        zip_data = generar_todos_los_vales(df)
-                        
-                        if zip_data:
-                            st.download_button(
-                                label="📦 Descargar Todos los Vales (ZIP)",
-                                data=zip_data,
-                                file_name="Todos_Los_Vales_de_Resguardo.zip",
-                                mime="application/zip",
-                                type="primary",
-                                key="download_all"
-                            )
-                            st.success("✅ Todos los vales han sido generados exitosamente")
-            
-            # Vista previa de datos
-            columnas_a_mostrar = ['DESCRIPCION', 'NUMERO DE INVVENTARIO', 'No. SEP', 'VALOR', 'OBSERVACIONES']
-            if 'QR' in datos_empleado.columns:
-                columnas_a_mostrar = ['QR'] + columnas_a_mostrar
-                
-            columnas_disponibles = [col for col in columnas_a_mostrar if col in datos_empleado.columns]
-            
-            st.dataframe(
-                datos_empleado[columnas_disponibles],
-                height=300,
-                use_container_width=True
-            )
-                    
-        except Exception as e:
-            st.error(f"Error al procesar el archivo: {str(e)}")
-    else:
-        # Si no hay archivo cargado, resetear el estado
-        if st.session_state.file_uploaded:
-            st.session_state.df_processed = None
-            st.session_state.empleados_list = []
-            st.session_state.selected_employee = None
-            st.session_state.file_uploaded = False
-            
-        st.info("📁 Por favor, carga un archivo Excel para comenzar")
-        
-        # Mostrar información de ejemplo cuando no hay archivo cargado
-        with st.expander("💡 Ver ejemplo de estructura del archivo"):
-            st.markdown("""
-            **Estructura recomendada del archivo Excel:**
-            
-            | NOMBRE | CURP | RFC | AREA O DEPARTAMENTO | EDIFICIO | QR | No. SEP | NUMERO DE INVVENTARIO | DESCRIPCION | VALOR | OBSERVACIONES | CT | PISO |
-            |--------|------|-----|---------------------|----------|----|---------|----------------------|-------------|-------|--------------|----|------|
-            | JUAN PEREZ LOPEZ | PELJ800101HDFRPN01 | PELJ800101ABC | RECURSOS HUMANOS | EDIFICIO A | 12345\|67890\|ESCRITORIO OFICINA\|1500.00 | 12345 | 67890 | ESCRITORIO OFICINA | 1500.00 | BUEN ESTADO | OFICINAS CENTRALES | 2 |
-            | MARIA GARCIA HERNANDEZ | GAHM750512MDFRRR02 | GAHM750512DEF | CONTABILIDAD | EDIFICIO B | 54321\|09876\|SILLA EJECUTIVA\|2500.50 | 54321 | 09876 | SILLA EJECUTIVA | 2500.50 | NUEVO | OFICINAS CENTRALES | 3 |
-            """)
-    
-    # Información adicional en sidebar
-    st.sidebar.markdown("### ℹ️ Información del Sistema")
-    st.sidebar.info("""
-    **Sistema de Vales de Resguardo**
-    
-    🔸 Genera vales en formato PDF oficial  
-    🔸 Procesa automáticamente códigos QR  
-    🔸 Calcula totales automáticamente  
-    
-    **Instrucciones:**
-    1. Carga tu archivo Excel de inventario
-    2. Selecciona un empleado
-    3. Genera y descarga el vale
-    """)
-
-    # Créditos
-    st.sidebar.markdown("---")
-    st.sidebar.markdown("**Desarrollado por:**")
-    st.sidebar.markdown("Área de Activo Fijo")
-    st.sidebar.markdown("DGA 2025")
-    st.sidebar.markdown("Pedro Álvaro Pérez Rodríguez")
-    
-    # Mostrar pie de página
-    mostrar_pie_web()
-
-if __name__ == "__main__":
-
-    main()
+import sys
+
+if __name__ == "__main__" and sys.argv[1:2] == ["batch"]:
+    # Modo por lotes sin Streamlit: python -m sistema_vales batch inventario.xlsx --out vales/
+    from vales_core import main_cli
+    sys.exit(main_cli(sys.argv[1:]))
+
+import streamlit as st
+import pandas as pd
+import io
+import os
+import zipfile
+import logging
+import time
+
+import vales_core
+from vales_core import (
+    CACHE_VALES,
+    AlmacenInventario,
+    COLUMNA_ORIGEN,
+    CRITERIOS_PARTICION,
+    DIMENSIONES_RESUMEN,
+    NOMBRE_PDF_UNICO,
+    PROCESOS_GENERACION,
+    ErrorInventario,
+    Rendimiento,
+    TrabajoVales,
+    comparar_inventarios,
+    construir_cubo_inventario,
+    construir_indice_activos,
+    construir_indice_busqueda,
+    construir_indice_empleados,
+    describir_error_lectura,
+    eliminar_archivo_temporal,
+    estadisticas_inventario,
+    etapa_rendimiento,
+    exportar_resumen_excel,
+    fecha_vales_del_dia,
+    generar_pdf_unico,
+    generar_vale_con_cache,
+    memoria_inventario,
+    normalizar_inventario,
+    generar_zip_vales,
+    huella_archivos,
+    indice_empleados_afectados,
+    obtener_bloque_empleado,
+    obtener_datos_empleado,
+    resumir_cambios,
+    resumir_cubo,
+)
+
+# Configuración de la página (una sola llamada, antes de cualquier otro elemento)
+st.set_page_config(
+    page_title="Sistema de Vales de Resguardo - Área de Activo Fijo DGA",
+    layout="wide",
+    page_icon="🏛️",
+    initial_sidebar_state="expanded"
+)
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Opciones de compresión del ZIP masivo (los PDF ya vienen comprimidos)
+COMPRESIONES_ZIP = {
+    "Sin compresión (más rápido)": zipfile.ZIP_STORED,
+    "Comprimido (deflate)": zipfile.ZIP_DEFLATED,
+}
+
+# Almacén local SQLite del inventario (activado por defecto si se define VALES_ALMACEN)
+RUTA_ALMACEN = os.environ.get('VALES_ALMACEN', 'inventario_vales.sqlite')
+ALMACEN_ACTIVADO = 'VALES_ALMACEN' in os.environ
+
+# Formatos de archivo de inventario aceptados (gz = CSV comprimido con gzip)
+TIPOS_ARCHIVO_INVENTARIO = ["xlsx", "xls", "csv", "gz"]
+
+# Coincidencias que muestra el selector de empleados
+RESULTADOS_BUSQUEDA = 50
+# Asignaciones que muestra el buscador de activos
+RESULTADOS_ACTIVOS = 50
+# Opción del tablero de resumen que no filtra el nivel
+TODOS_RESUMEN = "(Todos)"
+
+# Caché de inventarios procesados compartida entre sesiones (por huella del archivo)
+CACHE_INVENTARIOS_MAX = int(os.environ.get('VALES_CACHE_INVENTARIOS', 8))
+CACHE_INVENTARIOS_TTL = int(os.environ.get('VALES_CACHE_INVENTARIOS_TTL', 12 * 60 * 60))
+# Resúmenes del tablero en caché (uno por inventario, nivel y filtros elegidos)
+CACHE_RESUMENES_MAX = 256
+# Archivos generados (ZIP) en memoria para sus botones de descarga: Streamlit lee
+# los datos completos en cada reejecución, así que se leen del disco una sola vez
+CACHE_DESCARGAS_MAX = 4
+CACHE_DESCARGAS_TTL = 30 * 60
+
+# Imágenes de la página web (se leen del disco una sola vez por proceso)
+IMAGEN_ENCABEZADO_WEB = "ENCABEZADO_WEB.png"
+IMAGEN_PIE_WEB = "Pie_vale.png"
+# Ancho máximo (px) con el que Streamlit sirve una imagen: una más ancha se redimensiona en cada reejecución
+ANCHO_MAXIMO_IMAGEN_WEB = 1460
+
+# Inicializar session_state para manejo de estado
+if 'selected_employee' not in st.session_state:
+    st.session_state.selected_employee = None
+if 'df_processed' not in st.session_state:
+    st.session_state.df_processed = None
+# Índice de búsqueda de empleados (nombre, CURP, RFC) del inventario cargado
+if 'indice_busqueda' not in st.session_state:
+    st.session_state.indice_busqueda = None
+if 'indice_empleados' not in st.session_state:
+    st.session_state.indice_empleados = {}
+# Índice de activos (No. de inventario y No. SEP) con sus asignaciones duplicadas
+if 'indice_activos' not in st.session_state:
+    st.session_state.indice_activos = None
+# Agregados por área, edificio, CT y piso (estadísticas y tablero sin recorrer las filas)
+if 'cubo_inventario' not in st.session_state:
+    st.session_state.cubo_inventario = None
+if 'zip_path' not in st.session_state:
+    st.session_state.zip_path = None
+if 'pdf_unico_path' not in st.session_state:
+    st.session_state.pdf_unico_path = None
+# Generación masiva en segundo plano (sobrevive a las reejecuciones del script)
+if 'trabajo_vales' not in st.session_state:
+    st.session_state.trabajo_vales = None
+# ZIP por partición elegido para descargar
+if 'zip_particion_elegido' not in st.session_state:
+    st.session_state.zip_particion_elegido = None
+# Avance de la generación masiva en pausa para descargar los ZIP ya terminados
+if 'avance_pausado' not in st.session_state:
+    st.session_state.avance_pausado = False
+if 'archivo_id' not in st.session_state:
+    st.session_state.archivo_id = None
+if 'huella_archivo' not in st.session_state:
+    st.session_state.huella_archivo = None
+if 'memoria_inventario' not in st.session_state:
+    st.session_state.memoria_inventario = None
+# Hojas de los archivos cargados que no se pudieron leer: [{'archivo', 'hoja', 'error'}]
+if 'errores_lectura' not in st.session_state:
+    st.session_state.errores_lectura = []
+# Versión anterior del inventario para regenerar solo los vales con cambios
+if 'df_anterior' not in st.session_state:
+    st.session_state.df_anterior = None
+if 'indice_anterior' not in st.session_state:
+    st.session_state.indice_anterior = None
+if 'huella_anterior' not in st.session_state:
+    st.session_state.huella_anterior = None
+if 'cambios' not in st.session_state:
+    st.session_state.cambios = None
+if 'zip_afectados_path' not in st.session_state:
+    st.session_state.zip_afectados_path = None
+if 'rendimiento' not in st.session_state:
+    st.session_state.rendimiento = Rendimiento()
+if 'file_uploaded' not in st.session_state:
+    st.session_state.file_uploaded = False
+# La sesión usa el inventario del almacén local en lugar de un archivo cargado
+if 'usando_almacen' not in st.session_state:
+    st.session_state.usando_almacen = False
+
+
+def generar_vale_individual(empleado, df, indice=None, cache=CACHE_VALES):
+    """Genera y descarga un vale de resguardo individual"""
+    try:
+        if indice is None:
+            indice = construir_indice_empleados(df)
+
+        # MEJORA: Validación de empleado existente
+        if empleado not in indice:
+            st.error(f"Empleado '{empleado}' no encontrado en los datos")
+            return
+
+        # Filtrar datos del empleado
+        inventario_empleado = obtener_bloque_empleado(df, indice, empleado)
+
+        # MEJORA: Validación de inventario vacío
+        if inventario_empleado is None or inventario_empleado.empty:
+            st.warning(f"El empleado {empleado} no tiene artículos en el inventario")
+            return
+
+        # Generar PDF (o reutilizarlo de la caché si no cambió)
+        with etapa_rendimiento('vale_individual', empleado=empleado, articulos=len(inventario_empleado)) as medicion:
+            filename, pdf_bytes = generar_vale_con_cache(
+                empleado, obtener_datos_empleado(df, indice, empleado), inventario_empleado,
+                fecha_vales_del_dia(), cache
+            )
+            medicion['bytes'] = len(pdf_bytes)
+        
+        st.download_button(
+            label="📥 Descargar Vale Oficial",
+            data=pdf_bytes,
+            file_name=filename,
+            mime="application/pdf",
+            type="primary",
+            key=f"download_{empleado}"
+        )
+        
+        st.success(f"✅ Vale oficial generado para {empleado}")
+        
+    except Exception as e:
+        st.error(f"Error al generar el vale: {str(e)}")
+
+def generar_todos_los_vales(df, indice=None, procesos=None, fecha=None, compresion=None, cache=CACHE_VALES):
+    """Genera todos los vales en un ZIP en disco y retorna su ruta (None si falla)"""
+    try:
+        return generar_zip_vales(
+            df, indice,
+            procesos=procesos,
+            fecha=fecha,
+            compresion=compresion,
+            cache=cache,
+            al_error=lambda empleado, error: st.warning(f"⚠️ Error con {empleado}: {str(error)}")
+        )
+
+    except ErrorInventario as e:
+        st.error(str(e))
+        return None
+    except Exception as e:
+        st.error(f"Error al generar el archivo ZIP: {str(e)}")
+        return None
+
+def iniciar_generacion_masiva(df, indice, procesos=None, compresion=None, particion=None, max_bytes=None):
+    """
+    Inicia la generación de todos los vales en segundo plano, reemplazando la
+    anterior; con `particion`, un ZIP por grupo de empleados de hasta `max_bytes`
+    """
+    cancelar_generacion_masiva()
+    # Liberar el ZIP de una generación anterior
+    eliminar_archivo_temporal(st.session_state.zip_path)
+    st.session_state.zip_path = None
+    st.session_state.avance_pausado = False
+    try:
+        st.session_state.trabajo_vales = TrabajoVales(
+            df, indice,
+            procesos=procesos,
+            compresion=compresion,
+            particion=particion,
+            max_bytes=max_bytes
+        ).iniciar()
+    except ErrorInventario as e:
+        st.error(str(e))
+
+def cancelar_generacion_masiva():
+    """Cancela la generación masiva en curso, si la hay, y descarta sus archivos"""
+    trabajo = st.session_state.trabajo_vales
+    if trabajo is not None:
+        # El ZIP terminado que ya es el de la sesión se conserva
+        trabajo.descartar(conservar=[st.session_state.zip_path])
+    st.session_state.trabajo_vales = None
+
+@st.cache_resource(max_entries=CACHE_DESCARGAS_MAX, ttl=CACHE_DESCARGAS_TTL, show_spinner=False)
+def contenido_descarga(ruta, tamano, modificado):
+    """Bytes de un archivo generado; se vuelve a leer solo si cambian su tamaño o su fecha"""
+    with open(ruta, 'rb') as archivo:
+        return archivo.read()
+
+def datos_descarga(ruta):
+    """Datos para el botón de descarga de un archivo en disco (ver `contenido_descarga`)"""
+    estado = os.stat(ruta)
+    return contenido_descarga(ruta, estado.st_size, estado.st_mtime_ns)
+
+def formatear_duracion(segundos):
+    """Duración en formato m:ss"""
+    minutos, segundos = divmod(int(round(segundos)), 60)
+    return f"{minutos}:{segundos:02d}"
+
+def mostrar_archivos_particionados(trabajo):
+    """Descarga de los ZIP por partición ya terminados (disponibles mientras se generan los demás)"""
+    archivos = list(trabajo.archivos)
+    if not archivos:
+        return
+    por_nombre = {archivo['nombre']: archivo for archivo in archivos}
+    nombres = list(por_nombre)
+    # La lista crece mientras se generan los ZIP: conservar el elegido entre reejecuciones
+    elegido = st.session_state.zip_particion_elegido
+    # Un solo botón para el ZIP elegido: solo ese archivo se lee en cada reejecución
+    nombre = st.selectbox(
+        f"ZIP por {trabajo.particion} terminados ({len(archivos)})",
+        options=nombres,
+        index=nombres.index(elegido) if elegido in por_nombre else 0,
+        format_func=lambda nombre: (
+            f"{nombre} · {por_nombre[nombre]['vales']} vales · {por_nombre[nombre]['bytes'] / 1_048_576:,.1f} MB"
+        )
+    )
+    st.session_state.zip_particion_elegido = nombre
+    archivo = por_nombre[nombre]
+    st.download_button(
+        label=f"📦 Descargar {archivo['nombre']}",
+        data=datos_descarga(archivo['ruta']),
+        file_name=archivo['nombre'],
+        mime="application/zip",
+        key="download_particion"
+    )
+
+def mostrar_archivos_particionados_en_curso(trabajo):
+    """
+    ZIP por partición terminados mientras se generan los demás. El botón de descarga
+    lee el archivo en cada reejecución, por lo que solo se muestra con el avance
+    en pausa (sin las reejecuciones de cada segundo).
+    """
+    if not trabajo.archivos:
+        return
+    if st.session_state.avance_pausado:
+        mostrar_archivos_particionados(trabajo)
+        if st.button("▶️ Reanudar el avance", key='reanudar_avance'):
+            st.session_state.avance_pausado = False
+            st.rerun()
+    elif st.button(
+        f"📥 Descargar los {len(trabajo.archivos)} ZIP ya terminados (pausa el avance)",
+        key='pausar_avance'
+    ):
+        st.session_state.avance_pausado = True
+        st.rerun()
+
+def mostrar_generacion_masiva():
+    """Avance de la generación masiva y descarga del ZIP (o de cada ZIP por partición) cuando termina"""
+    trabajo = st.session_state.trabajo_vales
+    if trabajo is None:
+        return
+
+    avance = trabajo.avance()
+    estado = trabajo.estado
+    if estado in ('en_curso', 'cancelando'):
+        texto = f"🔄 {avance['hechos']} de {avance['total']} empleados"
+        if avance['vales_por_segundo']:
+            texto += f" · {avance['vales_por_segundo']:.1f} vales/s"
+        if avance['eta_segundos'] is not None:
+            texto += f" · faltan ~{formatear_duracion(avance['eta_segundos'])}"
+        st.progress(avance['fraccion'], text=texto)
+        if estado == 'cancelando':
+            st.caption("Cancelando...")
+        elif st.button("⏹️ Cancelar generación", key='cancelar_generacion'):
+            trabajo.cancelar()
+            st.rerun()
+        mostrar_archivos_particionados_en_curso(trabajo)
+        return
+
+    if estado == 'cancelado':
+        st.info(f"Generación cancelada después de {avance['hechos']} de {avance['total']} empleados")
+        mostrar_archivos_particionados(trabajo)
+        return
+    if estado == 'error':
+        st.error(f"Error al generar el archivo ZIP: {str(trabajo.error)}")
+        mostrar_archivos_particionados(trabajo)
+        return
+
+    if trabajo.particion:
+        for empleado, error in trabajo.errores:
+            st.warning(f"⚠️ Error con {empleado}: {str(error)}")
+        mostrar_archivos_particionados(trabajo)
+        st.success(
+            f"✅ Todos los vales han sido generados exitosamente en {len(trabajo.archivos)} archivos ZIP "
+            f"({avance['hechos']} empleados en {formatear_duracion(avance['segundos'])})"
+        )
+        return
+
+    # El ZIP terminado pasa a ser el de la sesión
+    st.session_state.zip_path = trabajo.ruta
+    for empleado, error in trabajo.errores:
+        st.warning(f"⚠️ Error con {empleado}: {str(error)}")
+    st.download_button(
+        label="📦 Descargar Todos los Vales (ZIP)",
+        data=datos_descarga(trabajo.ruta),
+        file_name="Todos_Los_Vales_de_Resguardo.zip",
+        mime="application/zip",
+        type="primary",
+        key="download_all"
+    )
+    st.success(
+        f"✅ Todos los vales han sido generados exitosamente "
+        f"({avance['hechos']} empleados en {formatear_duracion(avance['segundos'])})"
+    )
+
+def esperar_generacion_masiva(intervalo=1.0):
+    """
+    Mientras la generación masiva siga en curso, vuelve a ejecutar el script para
+    refrescar el avance (salvo con el avance en pausa para descargar)
+    """
+    trabajo = st.session_state.trabajo_vales
+    if trabajo is not None and trabajo.en_curso and not st.session_state.avance_pausado:
+        time.sleep(intervalo)
+        st.rerun()
+
+def generar_pdf_para_imprimir(df, indice=None, fecha=None):
+    """Genera todos los vales en un solo PDF en disco y retorna su ruta (None si falla)"""
+    try:
+        return generar_pdf_unico(
+            df, indice,
+            fecha=fecha,
+            al_error=lambda empleado, error: st.warning(f"⚠️ Error con {empleado}: {str(error)}")
+        )
+
+    except ErrorInventario as e:
+        st.error(str(e))
+        return None
+    except Exception as e:
+        st.error(f"Error al generar el PDF para imprimir: {str(e)}")
+        return None
+
+def procesar_archivos_excel(archivos):
+    """
+    Procesa uno o varios archivos Excel (todas sus hojas) y devuelve (df, errores por hoja);
+    df es None si ninguna hoja es válida
+    """
+    try:
+        return vales_core.procesar_archivos_excel(archivos)
+
+    except ErrorInventario as e:
+        st.error(str(e))
+        return None, []
+    except Exception as e:
+        st.error(f"Error al procesar el archivo: {str(e)}")
+        return None, []
+
+class ArchivoInvalido(Exception):
+    """El archivo no pudo procesarse (el motivo ya se mostró al usuario)"""
+
+@st.cache_resource(max_entries=CACHE_INVENTARIOS_MAX, ttl=CACHE_INVENTARIOS_TTL, show_spinner=False)
+def cargar_inventario(huella, _archivos):
+    """
+    Procesa los archivos (lectura de todas las hojas + códigos QR) y los normaliza:
+    retorna la tabla de artículos, el índice de empleados (con la tabla de sus
+    datos), el índice de búsqueda de empleados, el índice de activos, el cubo de
+    agregados, la memoria del inventario (bytes antes y después de normalizar) y
+    los errores de las hojas que no se cargaron.
+    El resultado se comparte entre todas las sesiones por la huella del contenido,
+    por lo que no debe modificarse. Los archivos inválidos no se guardan en caché.
+    """
+    df, errores = procesar_archivos_excel(_archivos)
+    if df is None:
+        raise ArchivoInvalido(huella)
+    memoria_antes = memoria_inventario(df)
+    articulos, indice = normalizar_inventario(df)
+    busqueda = construir_indice_busqueda(articulos, indice)
+    activos = construir_indice_activos(articulos)
+    cubo = construir_cubo_inventario(articulos, indice)
+    memoria = (memoria_antes, memoria_inventario(articulos, indice))
+    return articulos, indice, busqueda, activos, cubo, memoria, errores
+
+@st.cache_resource(max_entries=CACHE_INVENTARIOS_MAX, ttl=CACHE_INVENTARIOS_TTL, show_spinner=False)
+def estadisticas_cacheadas(huella, _df, _cubo):
+    """Estadísticas generales del inventario (una vez por huella del contenido)"""
+    return estadisticas_inventario(_df, _cubo)
+
+def mostrar_estadisticas(df, memoria=None, cubo=None, huella=None):
+    """
+    Muestra estadísticas del inventario (del cubo de agregados si se indica) y,
+    si se indica, la memoria que ocupa (antes, después). Con `huella` las
+    estadísticas se calculan una sola vez por inventario.
+    """
+    # MEJORA: Validación de DataFrame
+    if df is None or df.empty:
+        st.warning("No hay datos para mostrar estadísticas")
+        return
+        
+    if huella is None:
+        estadisticas = estadisticas_inventario(df, cubo)
+    else:
+        estadisticas = estadisticas_cacheadas(huella, df, cubo)
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Total de empleados", estadisticas['empleados'])
+    with col2:
+        st.metric("Total de artículos", estadisticas['articulos'])
+    with col3:
+        st.metric("Valor total inventario", f"${estadisticas['valor_total']:,.2f}")
+    with col4:
+        st.metric("Valor promedio por artículo", f"${estadisticas['valor_promedio']:,.2f}")
+
+    if isinstance(df, AlmacenInventario):
+        st.caption(f"💾 Inventario consultado del almacén local ({df.ruta}); no se mantiene en memoria")
+    elif memoria is not None:
+        antes, despues = memoria
+        st.caption(
+            f"💾 Memoria del inventario en la sesión: {despues / 1_048_576:,.1f} MB "
+            f"(sin normalizar: {antes / 1_048_576:,.1f} MB)"
+        )
+
+@st.cache_resource(max_entries=CACHE_INVENTARIOS_MAX, ttl=CACHE_INVENTARIOS_TTL, show_spinner=False)
+def resumen_excel(huella, _cubo):
+    """Libro Excel con el resumen del inventario (uno por huella del contenido)"""
+    return exportar_resumen_excel(_cubo)
+
+@st.cache_resource(max_entries=CACHE_RESUMENES_MAX, ttl=CACHE_INVENTARIOS_TTL, show_spinner=False)
+def resumen_tablero(huella, dimensiones, filtros, _cubo):
+    """
+    Resumen del cubo por `dimensiones` con `filtros` (tupla de pares), compartido
+    entre reejecuciones y sesiones del mismo inventario. No debe modificarse.
+    """
+    return resumir_cubo(_cubo, list(dimensiones), dict(filtros))
+
+def mostrar_tablero(cubo, huella):
+    """
+    Tablero de totales por área, edificio, CT y piso: al elegir un valor en un
+    nivel se desglosa el siguiente. Usa solo el cubo de agregados.
+    """
+    if cubo is None or cubo.empty:
+        return
+
+    with st.expander("📊 Resumen por área, edificio, CT y piso"):
+        filtros = {}
+        nivel = None
+        columnas = st.columns(len(DIMENSIONES_RESUMEN))
+        for columna, dimension in zip(columnas, DIMENSIONES_RESUMEN):
+            opciones = resumen_tablero(huella, (dimension,), tuple(filtros.items()), cubo)[dimension].tolist()
+            with columna:
+                valor = st.selectbox(dimension, options=[TODOS_RESUMEN] + opciones, key=f'tablero_{dimension}')
+            if valor == TODOS_RESUMEN:
+                nivel = dimension
+                break
+            filtros[dimension] = valor
+
+        resumen = resumen_tablero(huella, (nivel,) if nivel else (), tuple(filtros.items()), cubo)
+        # Barra de valor dentro de la tabla (un gráfico aparte se recalcula en cada reejecución)
+        st.dataframe(
+            resumen,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                'VALOR_TOTAL': st.column_config.ProgressColumn(
+                    format="$%.2f", min_value=0, max_value=max(float(resumen['VALOR_TOTAL'].max()), 1.0)
+                ),
+                'VALOR_PROMEDIO': st.column_config.NumberColumn(format="$%.2f"),
+            }
+        )
+        st.download_button(
+            label="📥 Descargar resumen (Excel)",
+            data=resumen_excel(huella, cubo),
+            file_name="Resumen_Inventario.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            key="download_resumen"
+        )
+
+def mostrar_origenes(df, errores):
+    """Muestra de cuántos archivos y hojas se leyó el inventario y las hojas que no se cargaron"""
+    if isinstance(df, pd.DataFrame) and COLUMNA_ORIGEN in df.columns:
+        origen = df[COLUMNA_ORIGEN]
+        # Las categorías ya son los orígenes distintos (no se recorren las filas en cada reejecución)
+        origenes = len(origen.cat.categories) if isinstance(origen.dtype, pd.CategoricalDtype) else origen.nunique()
+        if origenes > 1:
+            st.caption(f"📑 Inventario combinado de {origenes} hojas (columna {COLUMNA_ORIGEN})")
+
+    if errores:
+        with st.expander(f"⚠️ {len(errores)} hojas no se cargaron", expanded=True):
+            for error in errores:
+                st.warning(describir_error_lectura(error))
+
+def guardar_version_anterior():
+    """Conserva el inventario actual como versión anterior antes de reemplazarlo"""
+    df = st.session_state.df_processed
+    if df is not None:
+        indice = st.session_state.indice_empleados
+        if isinstance(df, AlmacenInventario):
+            if df.huella() != st.session_state.huella_archivo:
+                # Otra sesión ya reemplazó el almacén: la versión de esta sesión no se puede recuperar
+                return
+            # El almacén se reemplazará con la nueva versión: conservar una copia en memoria
+            df, indice = df.a_dataframe()
+        st.session_state.df_anterior = df
+        st.session_state.indice_anterior = indice
+        st.session_state.huella_anterior = st.session_state.huella_archivo
+
+@st.cache_resource(show_spinner=False)
+def obtener_almacen(ruta=RUTA_ALMACEN):
+    """Almacén local del inventario, compartido por todas las sesiones"""
+    return AlmacenInventario(ruta)
+
+def guardar_en_almacen(almacen, df, indice, huella):
+    """Guarda el inventario procesado en el almacén local si aún no está guardado"""
+    if almacen.huella() == huella:
+        return
+    try:
+        with st.spinner("💾 Guardando el inventario en el almacén local..."):
+            almacen.cargar(df, indice, huella)
+    except Exception as e:
+        st.warning(f"No se pudo guardar el inventario en el almacén local: {str(e)}")
+
+@st.cache_resource(max_entries=CACHE_INVENTARIOS_MAX, ttl=CACHE_INVENTARIOS_TTL, show_spinner=False)
+def indices_almacen(huella, _almacen):
+    """
+    Índice de empleados, índice de búsqueda, índice de activos y cubo de agregados
+    del inventario guardado en el almacén. Se construyen una vez por huella y se
+    comparten entre las sesiones que usan el almacén, por lo que no deben modificarse.
+    """
+    indice = _almacen.indice()
+    busqueda = construir_indice_busqueda(_almacen, indice)
+    activos = construir_indice_activos(_almacen)
+    cubo = construir_cubo_inventario(_almacen, indice)
+    return indice, busqueda, activos, cubo
+
+def abrir_almacen(almacen, conservar_anterior=True):
+    """
+    Usa el inventario guardado en el almacén local como inventario de la sesión.
+    Con `conservar_anterior`, el inventario actual de la sesión queda como versión anterior.
+    """
+    huella = almacen.huella()
+    indice, busqueda, activos, cubo = indices_almacen(huella, almacen)
+    if conservar_anterior:
+        guardar_version_anterior()
+    cancelar_generacion_masiva()
+    st.session_state.df_processed = almacen
+    st.session_state.indice_empleados = indice
+    st.session_state.indice_busqueda = busqueda
+    st.session_state.indice_activos = activos
+    st.session_state.cubo_inventario = cubo
+    st.session_state.memoria_inventario = None
+    st.session_state.errores_lectura = []
+    st.session_state.huella_archivo = huella
+    st.session_state.archivo_id = None
+    if st.session_state.selected_employee not in indice and len(busqueda):
+        st.session_state.selected_employee = busqueda.empleados[0]
+    st.session_state.file_uploaded = True
+    st.session_state.usando_almacen = True
+
+def verificar_almacen(almacen):
+    """
+    Reabre el almacén si otra sesión reemplazó el inventario guardado: los índices,
+    el cubo y la huella de esta sesión ya no corresponden a las filas del almacén.
+    Retorna False si el almacén quedó vacío.
+    """
+    if almacen.huella() == st.session_state.huella_archivo:
+        return True
+    if almacen.metadatos() is None:
+        cancelar_generacion_masiva()
+        st.session_state.usando_almacen = False
+        return False
+    # El inventario de esta sesión ya no está en el almacén: no hay versión anterior que conservar
+    abrir_almacen(almacen, conservar_anterior=False)
+    st.warning("⚠️ Otra sesión reemplazó el inventario del almacén local; se muestra la versión guardada más reciente.")
+    return True
+
+def mostrar_almacen_guardado(almacen):
+    """Ofrece abrir el inventario guardado en el almacén local sin volver a cargar el archivo"""
+    try:
+        metadatos = almacen.metadatos()
+    except Exception as e:
+        st.warning(f"No se pudo leer el almacén local: {str(e)}")
+        return
+    if not metadatos:
+        return
+    if st.button(
+        f"💾 Usar el inventario guardado ({metadatos['empleados']:,} empleados, "
+        f"{metadatos['articulos']:,} artículos, cargado el {metadatos['fecha_carga'].replace('T', ' ')})",
+        use_container_width=True
+    ):
+        abrir_almacen(almacen)
+        st.rerun()
+
+def mostrar_cambios_inventario(df, indice, procesos, compresion):
+    """Diferencia con la versión anterior del inventario y regeneración de los vales afectados"""
+    with st.expander("🔄 Cambios respecto al inventario anterior"):
+        archivo_anterior = st.file_uploader(
+            "Comparar con otra versión del inventario (opcional)",
+            type=TIPOS_ARCHIVO_INVENTARIO,
+            key='archivo_anterior'
+        )
+        if archivo_anterior is not None:
+            huella = huella_archivos([archivo_anterior])
+            if huella != st.session_state.huella_anterior:
+                try:
+                    st.session_state.df_anterior, st.session_state.indice_anterior, *_ = cargar_inventario(
+                        huella, [archivo_anterior]
+                    )
+                except ArchivoInvalido:
+                    return
+                st.session_state.huella_anterior = huella
+
+        anterior = st.session_state.df_anterior
+        if anterior is None:
+            st.info("Carga una nueva versión del inventario o un archivo anterior para ver los cambios")
+            return
+        if st.session_state.huella_anterior == st.session_state.huella_archivo:
+            st.info("El inventario anterior es idéntico al actual")
+            return
+
+        # La diferencia se calcula una vez por par de versiones
+        clave = (st.session_state.huella_anterior, st.session_state.huella_archivo)
+        if st.session_state.cambios is None or st.session_state.cambios[0] != clave:
+            eliminar_archivo_temporal(st.session_state.zip_afectados_path)
+            st.session_state.zip_afectados_path = None
+            actual, indice_actual = df.a_dataframe() if isinstance(df, AlmacenInventario) else (df, indice)
+            st.session_state.cambios = (
+                clave,
+                comparar_inventarios(anterior, actual, st.session_state.indice_anterior, indice_actual)
+            )
+        cambios = st.session_state.cambios[1]
+
+        if cambios.empty:
+            st.success("✅ No hay cambios en las asignaciones")
+            return
+
+        resumen = resumir_cambios(cambios)
+        afectados = indice_empleados_afectados(indice, cambios)
+
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Empleados con cambios", len(resumen))
+        with col2:
+            st.metric("Artículos dados de alta", int(resumen['ALTAS'].sum()))
+        with col3:
+            st.metric("Artículos dados de baja", int(resumen['BAJAS'].sum()))
+        with col4:
+            st.metric("Artículos modificados", int(resumen['MODIFICADOS'].sum()))
+
+        st.dataframe(resumen, use_container_width=True, hide_index=True)
+        st.dataframe(cambios, height=250, use_container_width=True, hide_index=True)
+
+        sin_vale = len(resumen) - len(afectados)
+        if sin_vale:
+            st.caption(f"{sin_vale} empleados ya no tienen artículos asignados y no generan vale")
+
+        if afectados and st.button(f"🔄 Regenerar solo los {len(afectados)} vales afectados", use_container_width=True):
+            with st.spinner("🔄 Generando los vales afectados..."):
+                eliminar_archivo_temporal(st.session_state.zip_afectados_path)
+                st.session_state.zip_afectados_path = generar_todos_los_vales(
+                    df, afectados,
+                    procesos=procesos,
+                    compresion=compresion
+                )
+
+        if st.session_state.zip_afectados_path:
+            st.download_button(
+                label="📦 Descargar Vales Afectados (ZIP)",
+                data=datos_descarga(st.session_state.zip_afectados_path),
+                file_name="Vales_de_Resguardo_Actualizados.zip",
+                mime="application/zip",
+                key="download_afectados"
+            )
+
+def mostrar_panel_rendimiento():
+    """Muestra en la barra lateral las mediciones de rendimiento de la sesión"""
+    rendimiento = st.session_state.rendimiento
+    st.sidebar.markdown("---")
+    if not st.sidebar.checkbox("⏱️ Mostrar panel de Rendimiento", key='mostrar_rendimiento'):
+        return
+
+    with st.sidebar.expander("Rendimiento", expanded=True):
+        rendimiento.medir_memoria = st.checkbox(
+            "Medir memoria pico (tracemalloc, más lento)",
+            value=rendimiento.medir_memoria,
+            key='medir_memoria'
+        )
+        if not rendimiento.etapas:
+            st.caption("Aún no hay mediciones en esta sesión")
+            return
+
+        st.markdown("**Etapas**")
+        st.dataframe(pd.DataFrame(list(rendimiento.etapas)[::-1]), use_container_width=True)
+
+        mas_lentos = rendimiento.mas_lentos(10)
+        if mas_lentos:
+            st.markdown("**Empleados más lentos del último lote**")
+            st.dataframe(pd.DataFrame(mas_lentos), use_container_width=True)
+
+@st.cache_resource(show_spinner=False)
+def imagen_web(ruta):
+    """
+    Bytes PNG de una imagen de la página (None si no existe), leídos y reducidos
+    a ANCHO_MAXIMO_IMAGEN_WEB una sola vez por proceso
+    """
+    try:
+        with open(ruta, 'rb') as archivo:
+            datos = archivo.read()
+    except OSError:
+        logger.warning(f"No se encontró la imagen {ruta}")
+        return None
+
+    from PIL import Image
+
+    with Image.open(io.BytesIO(datos)) as imagen:
+        if imagen.width <= ANCHO_MAXIMO_IMAGEN_WEB and imagen.format == 'PNG':
+            return datos
+        alto = int(imagen.height * ANCHO_MAXIMO_IMAGEN_WEB / imagen.width)
+        if imagen.width > ANCHO_MAXIMO_IMAGEN_WEB:
+            imagen = imagen.resize((ANCHO_MAXIMO_IMAGEN_WEB, alto), resample=Image.LANCZOS)
+        salida = io.BytesIO()
+        imagen.save(salida, format='PNG', optimize=True)
+        return salida.getvalue()
+
+def mostrar_encabezado_web():
+    """Muestra el encabezado de la página web"""
+    imagen = imagen_web(IMAGEN_ENCABEZADO_WEB)
+    if imagen is not None:
+        st.image(imagen, use_column_width=True)
+    else:
+        # Si no encuentra la imagen, muestra un encabezado alternativo
+        st.markdown("""
+        <div style="background-color: #0c4e94; padding: 20px; border-radius: 10px; text-align: center; margin-bottom: 20px;">
+            <h1 style="color: white; margin: 0;">Sistema de Vales de Resguardo</h1>
+            <p style="color: white; margin: 5px 0 0 0;">Área de Activo Fijo - Dirección General de Administración</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+def mostrar_pie_web():
+    """Muestra el pie de página de la web"""
+    # MEJORA: Usar la imagen Pie_vale.png para el pie de página web también
+    imagen = imagen_web(IMAGEN_PIE_WEB)
+    if imagen is not None:
+        st.image(imagen, use_column_width=True)
+    else:
+        # Si no encuentra la imagen, muestra un pie de página alternativo
+        st.markdown("""
+        <div style="background-color: #f0f2f6; padding: 15px; text-align: center; margin-top: 30px; border-top: 2px solid #0c4e94;">
+            <p style="color: #555555; margin: 0;">Sistema desarrollado por el Área de Activo Fijo - DGA 2025</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+def seleccionar_empleado(busqueda, limite=RESULTADOS_BUSQUEDA):
+    """
+    Buscador de empleados por nombre, CURP o RFC: el selector muestra solo las
+    coincidencias. Retorna el empleado seleccionado.
+    """
+    consulta = st.text_input(
+        "Buscar empleado",
+        key='busqueda_empleado',
+        placeholder="Nombre, CURP o RFC (sin importar acentos ni mayúsculas)"
+    )
+    empleados = busqueda.buscar(consulta, limite)
+    seleccionado = st.session_state.selected_employee
+
+    if not empleados:
+        st.warning(f"No hay empleados que coincidan con \"{consulta}\"")
+        # Conservar la selección actual mientras se corrige la búsqueda
+        empleados = [seleccionado] if seleccionado is not None else busqueda.buscar("", 1)
+    elif len(empleados) == limite:
+        st.caption(f"Mostrando las primeras {limite} coincidencias de {len(busqueda):,} empleados; escriba más para acotar")
+
+    # Mantener la selección si sigue entre las coincidencias
+    current_index = empleados.index(seleccionado) if seleccionado in empleados else 0
+
+    return st.selectbox(
+        "Seleccionar empleado",
+        options=empleados,
+        index=current_index,
+        key='employee_selector'
+    )
+
+@st.cache_resource(max_entries=CACHE_INVENTARIOS_MAX, ttl=CACHE_INVENTARIOS_TTL, show_spinner=False)
+def reporte_duplicados_csv(huella, _duplicados):
+    """CSV de las asignaciones duplicadas (uno por huella del contenido)"""
+    return _duplicados.to_csv(index=False).encode('utf-8-sig')
+
+def mostrar_activos(activos, huella, limite=RESULTADOS_ACTIVOS):
+    """Buscador de activos (quién tiene un bien) y reporte de números asignados a más de un empleado"""
+    if activos is None:
+        return
+
+    duplicados = activos.duplicados
+    titulo = "🔎 Buscar activo por No. de inventario o No. SEP"
+    if len(duplicados):
+        titulo += f" · ⚠️ {duplicados['NUMERO'].nunique():,} números asignados a más de un empleado"
+    with st.expander(titulo, expanded=bool(len(duplicados))):
+        consulta = st.text_input(
+            "Número de inventario o No. SEP",
+            key='busqueda_activo',
+            placeholder="Número completo o sus primeros caracteres"
+        )
+        if consulta.strip():
+            resultados = activos.buscar(consulta, limite)
+            if resultados.empty:
+                st.warning(f"No hay activos que coincidan con \"{consulta}\"")
+            else:
+                if len(resultados) == limite:
+                    st.caption(f"Mostrando las primeras {limite} asignaciones; escriba más para acotar")
+                st.dataframe(resultados, use_container_width=True, hide_index=True)
+
+        if duplicados.empty:
+            st.success("✅ Ningún No. de inventario ni No. SEP está asignado a más de un empleado")
+            return
+
+        st.warning(
+            f"⚠️ {len(duplicados):,} asignaciones en conflicto: revíselas antes de generar y firmar los vales"
+        )
+        st.dataframe(duplicados, height=250, use_container_width=True, hide_index=True)
+        st.download_button(
+            label="📥 Descargar reporte de duplicados (CSV)",
+            data=reporte_duplicados_csv(huella, duplicados),
+            file_name="Activos_Duplicados.csv",
+            mime="text/csv",
+            key="download_duplicados"
+        )
+
+def mostrar_inventario():
+    """Estadísticas, selección de empleado, generación de vales y vista previa del inventario de la sesión"""
+    df = st.session_state.df_processed
+    indice = st.session_state.indice_empleados
+
+    # MEJORA: Validación de DataFrame procesado
+    if df is None or df.empty:
+        st.error("No se pudieron procesar los datos del archivo")
+        return
+        
+    # Mostrar estadísticas generales
+    mostrar_estadisticas(
+        df, st.session_state.memoria_inventario, st.session_state.cubo_inventario, st.session_state.huella_archivo
+    )
+    mostrar_tablero(st.session_state.cubo_inventario, st.session_state.huella_archivo)
+    mostrar_origenes(df, st.session_state.errores_lectura)
+    mostrar_activos(st.session_state.indice_activos, st.session_state.huella_archivo)
+    
+    # Seleccionar empleado
+    busqueda = st.session_state.indice_busqueda
+    
+    # MEJORA: Validación de lista de empleados
+    if busqueda is None or not len(busqueda):
+        st.warning("No se encontraron empleados en el archivo")
+        return
+
+    selected_employee = seleccionar_empleado(busqueda)
+    
+    # Actualizar session_state con la selección actual
+    st.session_state.selected_employee = selected_employee
+    
+    # Filtrar datos del empleado seleccionado
+    datos_empleado = obtener_bloque_empleado(df, indice, selected_employee)
+    
+    # MEJORA: Validación de datos del empleado
+    if datos_empleado is None or datos_empleado.empty:
+        st.warning(f"No se encontraron datos para el empleado: {selected_employee}")
+        return
+    
+    # Procesos para la generación masiva
+    procesos = st.sidebar.number_input(
+        "Procesos para generar todos los vales",
+        min_value=1,
+        max_value=max(PROCESOS_GENERACION, os.cpu_count() or 1),
+        value=PROCESOS_GENERACION,
+        step=1,
+        key='procesos_generacion'
+    )
+    compresion = st.sidebar.selectbox(
+        "Compresión del ZIP",
+        options=list(COMPRESIONES_ZIP),
+        key='compresion_zip'
+    )
+    particion = st.sidebar.selectbox(
+        "Dividir todos los vales en un ZIP por",
+        options=[None] + CRITERIOS_PARTICION,
+        format_func=lambda criterio: "Sin dividir (un solo ZIP)" if criterio is None else criterio,
+        key='particion_zip'
+    )
+    max_mb = st.sidebar.number_input(
+        "Tamaño máximo de cada ZIP (MB, 0 = sin límite)",
+        min_value=0,
+        value=0,
+        step=10,
+        disabled=particion is None,
+        key='max_mb_zip'
+    )
+
+    # Botones de acción
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        if st.button("📄 Generar Vale Individual", type="primary", use_container_width=True):
+            generar_vale_individual(selected_employee, df, indice)
+    
+    with col2:
+        trabajo = st.session_state.trabajo_vales
+        if st.button(
+            "📚 Generar Todos los Vales",
+            use_container_width=True,
+            disabled=trabajo is not None and trabajo.en_curso
+        ):
+            iniciar_generacion_masiva(
+                df, indice,
+                procesos=int(procesos),
+                compresion=COMPRESIONES_ZIP[compresion],
+                particion=particion,
+                max_bytes=int(max_mb) * 1024 * 1024 if particion and max_mb else None
+            )
+
+    with col3:
+        if st.button("🖨️ PDF Único para Imprimir", use_container_width=True):
+            with st.spinner("🔄 Generando el PDF para imprimir, por favor espere..."):
+                # Liberar el PDF de una generación anterior
+                eliminar_archivo_temporal(st.session_state.pdf_unico_path)
+                st.session_state.pdf_unico_path = generar_pdf_para_imprimir(df, indice)
+
+                if st.session_state.pdf_unico_path:
+                    with open(st.session_state.pdf_unico_path, 'rb') as pdf_data:
+                        st.download_button(
+                            label="🖨️ Descargar PDF para Imprimir",
+                            data=pdf_data,
+                            file_name=NOMBRE_PDF_UNICO,
+                            mime="application/pdf",
+                            type="primary",
+                            key="download_pdf_unico"
+                        )
+                    st.success("✅ PDF único generado: un vale por empleado, con marcadores")
+
+    mostrar_generacion_masiva()
+    
+    # Vista previa de datos
+    columnas_a_mostrar = ['DESCRIPCION', 'NUMERO DE INVVENTARIO', 'No. SEP', 'VALOR', 'OBSERVACIONES']
+    if 'QR' in datos_empleado.columns:
+        columnas_a_mostrar = ['QR'] + columnas_a_mostrar
+        
+    columnas_disponibles = [col for col in columnas_a_mostrar if col in datos_empleado.columns]
+    
+    st.dataframe(
+        datos_empleado[columnas_disponibles],
+        height=300,
+        use_container_width=True
+    )
+
+    mostrar_cambios_inventario(df, indice, int(procesos), COMPRESIONES_ZIP[compresion])
+
+def main():
+    """Función principal de la aplicación"""
+    # Mostrar encabezado
+    mostrar_encabezado_web()
+    
+    st.title("🏛️ Sistema de Generación de Vales de Resguardo")
+    
+    # Almacén local opcional: el inventario sobrevive a los reinicios del servidor
+    almacen = None
+    if st.sidebar.checkbox(
+        "💾 Guardar el inventario en el almacén local (SQLite)",
+        value=ALMACEN_ACTIVADO,
+        key='usar_almacen'
+    ):
+        almacen = obtener_almacen()
+
+    # Cargar archivos de inventario (uno por área; se leen todas las hojas de cada libro)
+    uploaded_files = st.file_uploader(
+        "Cargar archivos de inventario (Excel o CSV exportado del ERP)",
+        type=TIPOS_ARCHIVO_INVENTARIO,
+        accept_multiple_files=True
+    )
+    
+    if uploaded_files:
+        st.session_state.usando_almacen = False
+        try:
+            # Procesar los archivos solo si cambió el contenido cargado
+            archivo_id = tuple(getattr(archivo, 'file_id', None) for archivo in uploaded_files)
+            if st.session_state.df_processed is None or st.session_state.archivo_id != archivo_id:
+                huella = huella_archivos(uploaded_files)
+                if st.session_state.df_processed is None or st.session_state.huella_archivo != huella:
+                    try:
+                        df, indice, busqueda, activos, cubo, memoria, errores = cargar_inventario(
+                            huella, uploaded_files
+                        )
+                    except ArchivoInvalido:
+                        guardar_version_anterior()
+                        st.session_state.df_processed = None
+                        st.session_state.archivo_id = None
+                        st.session_state.huella_archivo = None
+                        return
+                    guardar_version_anterior()
+                    cancelar_generacion_masiva()
+                    st.session_state.df_processed = df
+                    st.session_state.indice_empleados = indice
+                    st.session_state.memoria_inventario = memoria
+                    st.session_state.indice_busqueda = busqueda
+                    st.session_state.indice_activos = activos
+                    st.session_state.cubo_inventario = cubo
+                    st.session_state.errores_lectura = errores
+                    st.session_state.huella_archivo = huella
+                    # Establecer el primer empleado como selección predeterminada
+                    if st.session_state.selected_employee not in indice and len(busqueda):
+                        st.session_state.selected_employee = busqueda.empleados[0]
+                    st.session_state.file_uploaded = True
+                    if almacen is not None:
+                        guardar_en_almacen(almacen, df, indice, huella)
+                st.session_state.archivo_id = archivo_id
+            mostrar_inventario()
+                    
+        except Exception as e:
+            st.error(f"Error al procesar el archivo: {str(e)}")
+    elif st.session_state.usando_almacen and almacen is not None:
+        try:
+            if verificar_almacen(almacen):
+                mostrar_inventario()
+            else:
+                st.rerun()
+        except Exception as e:
+            st.error(f"Error al consultar el almacén local: {str(e)}")
+    else:
+        # Si no hay archivo cargado, resetear el estado
+        if st.session_state.file_uploaded:
+            guardar_version_anterior()
+            cancelar_generacion_masiva()
+            st.session_state.df_processed = None
+            st.session_state.indice_busqueda = None
+            st.session_state.indice_empleados = {}
+            st.session_state.indice_activos = None
+            st.session_state.cubo_inventario = None
+            eliminar_archivo_temporal(st.session_state.zip_path)
+            st.session_state.zip_path = None
+            eliminar_archivo_temporal(st.session_state.pdf_unico_path)
+            st.session_state.pdf_unico_path = None
+            eliminar_archivo_temporal(st.session_state.zip_afectados_path)
+            st.session_state.zip_afectados_path = None
+            st.session_state.selected_employee = None
+            st.session_state.archivo_id = None
+            st.session_state.huella_archivo = None
+            st.session_state.memoria_inventario = None
+            st.session_state.errores_lectura = []
+            st.session_state.usando_almacen = False
+            st.session_state.file_uploaded = False
+            
+        st.info("📁 Por favor, carga un archivo Excel o CSV para comenzar")
+        if almacen is not None:
+            mostrar_almacen_guardado(almacen)
+        
+        # Mostrar información de ejemplo cuando no hay archivo cargado
+        with st.expander("💡 Ver ejemplo de estructura del archivo"):
+            st.markdown("""
+            **Estructura recomendada del archivo Excel:**
+            
+            | NOMBRE | CURP | RFC | AREA O DEPARTAMENTO | EDIFICIO | QR | No. SEP | NUMERO DE INVVENTARIO | DESCRIPCION | VALOR | OBSERVACIONES | CT | PISO |
+            |--------|------|-----|---------------------|----------|----|---------|----------------------|-------------|-------|--------------|----|------|
+            | JUAN PEREZ LOPEZ | PELJ800101HDFRPN01 | PELJ800101ABC | RECURSOS HUMANOS | EDIFICIO A | 12345\|67890\|ESCRITORIO OFICINA\|1500.00 | 12345 | 67890 | ESCRITORIO OFICINA | 1500.00 | BUEN ESTADO | OFICINAS CENTRALES | 2 |
+            | MARIA GARCIA HERNANDEZ | GAHM750512MDFRRR02 | GAHM750512DEF | CONTABILIDAD | EDIFICIO B | 54321\|09876\|SILLA EJECUTIVA\|2500.50 | 54321 | 09876 | SILLA EJECUTIVA | 2500.50 | NUEVO | OFICINAS CENTRALES | 3 |
+            """)
+    
+    # Información adicional en sidebar
+    st.sidebar.markdown("### ℹ️ Información del Sistema")
+    st.sidebar.info("""
+    **Sistema de Vales de Resguardo**
+    
+    🔸 Genera vales en formato PDF oficial  
+    🔸 Procesa automáticamente códigos QR  
+    🔸 Calcula totales automáticamente  
+    
+    **Instrucciones:**
+    1. Carga tu archivo Excel de inventario
+    2. Selecciona un empleado
+    3. Genera y descarga el vale
+    """)
+
+    # Créditos
+    st.sidebar.markdown("---")
+    st.sidebar.markdown("**Desarrollado por:**")
+    st.sidebar.markdown("Área de Activo Fijo")
+    st.sidebar.markdown("DGA 2025")
+    st.sidebar.markdown("Pedro Álvaro Pérez Rodríguez")
+
+    # Panel opcional de rendimiento
+    mostrar_panel_rendimiento()
+    
+    # Mostrar pie de página
+    mostrar_pie_web()
+
+if __name__ == "__main__":
+
+    # Las etapas medidas durante la ejecución se registran en el panel de Rendimiento
+    with st.session_state.rendimiento.activar():
+        main()
+    esperar_generacion_masiva()
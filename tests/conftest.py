@@ -0,0 +1,38 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+# Los módulos del sistema están en la raíz del repositorio
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+
+@pytest.fixture(autouse=True)
+def directorio_repositorio(monkeypatch):
+    """Las imágenes de marca de los vales se buscan relativas al directorio de trabajo"""
+    monkeypatch.chdir(RAIZ)
+
+
+@pytest.fixture
+def inventario_ejemplo():
+    """Inventario leído (una fila por artículo) de 4 empleados en 2 áreas, con 3 artículos cada uno"""
+    filas = []
+    for e in range(4):
+        for a in range(3):
+            filas.append({
+                'NOMBRE': f'EMPLEADO {e}',
+                'CURP': f'CURP{e:04d}',
+                'RFC': f'RFC{e:04d}',
+                'AREA O DEPARTAMENTO': 'RECURSOS HUMANOS' if e < 2 else 'FINANZAS',
+                'EDIFICIO': 'A',
+                'CT': f'CT{e % 2}',
+                'PISO': '1',
+                'No. SEP': f'{e}{a:02d}',
+                'NUMERO DE INVVENTARIO': f'INV-{e}-{a}',
+                'DESCRIPCION': f'SILLA {a}',
+                'VALOR': 100.0 * (a + 1),
+                'OBSERVACIONES': '',
+            })
+    return pd.DataFrame(filas)
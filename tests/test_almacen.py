@@ -0,0 +1,71 @@
+import pandas as pd
+import pytest
+
+from vales_core import AlmacenInventario
+
+
+def inventario(prefijo, empleados, articulos_por_empleado=2):
+    filas = [
+        {'NOMBRE': f'{prefijo} {e}', 'CURP': f'CURP{e}', 'DESCRIPCION': f'SILLA {a}', 'VALOR': 100.0,
+         'NUMERO DE INVVENTARIO': f'{prefijo}-{e}-{a}'}
+        for e in range(empleados) for a in range(articulos_por_empleado)
+    ]
+    return pd.DataFrame(filas)
+
+
+def test_recarga_fallida_conserva_el_contenido_anterior(tmp_path, monkeypatch):
+    ruta = str(tmp_path / 'inventario.sqlite')
+    almacen = AlmacenInventario(ruta)
+    almacen.cargar(inventario('ANTERIOR', 3), huella='anterior')
+
+    insertar = AlmacenInventario._insertar
+
+    def insertar_con_error(self, conexion, tabla, df, columnas, filas_por_lote):
+        if tabla == 'articulos':
+            raise RuntimeError("fallo simulado al insertar")
+        return insertar(self, conexion, tabla, df, columnas, filas_por_lote)
+
+    monkeypatch.setattr(AlmacenInventario, '_insertar', insertar_con_error)
+    with pytest.raises(RuntimeError):
+        almacen.cargar(inventario('NUEVO', 5), huella='nuevo')
+
+    # Una instancia nueva (p. ej. tras reiniciar el servidor) lee el archivo
+    reabierto = AlmacenInventario(ruta)
+    assert reabierto.huella() == 'anterior'
+    assert len(reabierto) == 6
+    assert list(reabierto.indice()) == ['ANTERIOR 0', 'ANTERIOR 1', 'ANTERIOR 2']
+    assert len(reabierto.bloque_empleado('ANTERIOR 1')) == 2
+
+
+def test_lector_ve_la_version_anterior_durante_la_recarga(tmp_path, monkeypatch):
+    ruta = str(tmp_path / 'inventario.sqlite')
+    AlmacenInventario(ruta).cargar(inventario('ANTERIOR', 2), huella='anterior')
+    lector = AlmacenInventario(ruta)
+    vistos = []
+
+    insertar = AlmacenInventario._insertar
+
+    def insertar_y_leer(self, conexion, tabla, df, columnas, filas_por_lote):
+        insertar(self, conexion, tabla, df, columnas, filas_por_lote)
+        if tabla == 'articulos':
+            vistos.append(len(lector.bloque_empleado('ANTERIOR 0')))
+
+    monkeypatch.setattr(AlmacenInventario, '_insertar', insertar_y_leer)
+    AlmacenInventario(ruta).cargar(inventario('NUEVO', 4), huella='nuevo')
+
+    assert vistos == [2]
+    assert AlmacenInventario(ruta).huella() == 'nuevo'
+
+
+def test_huella_refleja_la_recarga_de_otra_instancia(tmp_path):
+    ruta = str(tmp_path / 'inventario.sqlite')
+    almacen = AlmacenInventario(ruta)
+    almacen.cargar(inventario('ANTERIOR', 2), huella='anterior')
+    assert almacen.metadatos()['empleados'] == 2
+
+    # Otro proceso reemplaza el inventario con su propia instancia
+    AlmacenInventario(ruta).cargar(inventario('NUEVO', 3), huella='nuevo')
+
+    assert almacen.huella() == 'nuevo'
+    assert almacen.metadatos()['empleados'] == 3
+    assert list(almacen.indice()) == ['NUEVO 0', 'NUEVO 1', 'NUEVO 2']
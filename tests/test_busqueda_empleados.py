@@ -0,0 +1,37 @@
+from vales_core import IndiceBusquedaEmpleados, construir_indice_busqueda
+
+
+def indice_busqueda():
+    return IndiceBusquedaEmpleados(
+        ['ANA MARTÍNEZ', 'JOSÉ PEÑA LÓPEZ', 'MARTHA RUIZ', 'ROSA SANMARTIN'],
+        curps=['MARA800101', 'PELJ750512', 'RUMA900303', None],
+        rfcs=['MARA800101AB1', None, 'RUMA900303CD2', 'SARO850505EF3'],
+    )
+
+
+def test_prefijo_antes_que_subcadena():
+    # Prefijo de MARTHA y de la palabra MARTÍNEZ; subcadena en SANMARTIN
+    assert indice_busqueda().buscar('mart') == ['MARTHA RUIZ', 'ANA MARTÍNEZ', 'ROSA SANMARTIN']
+
+
+def test_sin_acentos_ni_espacios_extra():
+    indice = indice_busqueda()
+    assert indice.buscar('  jose   pena ') == ['JOSÉ PEÑA LÓPEZ']
+    assert indice.buscar('LOPEZ') == ['JOSÉ PEÑA LÓPEZ']
+    assert indice.buscar('martinez') == ['ANA MARTÍNEZ']
+
+
+def test_curp_rfc_y_limite():
+    indice = indice_busqueda()
+    assert indice.buscar('pelj75') == ['JOSÉ PEÑA LÓPEZ']
+    assert indice.buscar('CD2') == ['MARTHA RUIZ']
+    assert indice.buscar('mart', limite=1) == ['MARTHA RUIZ']
+    assert indice.buscar('') == indice.empleados
+    assert indice.buscar('XYZ') == []
+
+
+def test_construido_desde_el_inventario(inventario_ejemplo):
+    indice = construir_indice_busqueda(inventario_ejemplo)
+    assert len(indice) == 4
+    assert indice.buscar('curp0002') == ['EMPLEADO 2']
+    assert indice.buscar('empleado') == ['EMPLEADO 0', 'EMPLEADO 1', 'EMPLEADO 2', 'EMPLEADO 3']
@@ -0,0 +1,50 @@
+import shutil
+from datetime import datetime
+
+import vales_core
+from vales_core import CachePDF, clave_vale, iterar_vales
+
+FECHA = datetime(2025, 1, 2)
+
+
+def generar_contando(monkeypatch):
+    """Sustituye generar_vale_pdf por una versión que anota los empleados renderizados"""
+    renderizados = []
+    generar = vales_core.generar_vale_pdf
+
+    def generar_vale_pdf(empleado, *args, **kwargs):
+        renderizados.append(empleado)
+        return generar(empleado, *args, **kwargs)
+
+    monkeypatch.setattr(vales_core, 'generar_vale_pdf', generar_vale_pdf)
+    return renderizados
+
+
+def test_segunda_generacion_solo_renderiza_los_cambiados(inventario_ejemplo, monkeypatch):
+    renderizados = generar_contando(monkeypatch)
+    cache = CachePDF(max_bytes=50 * 1024 * 1024)
+
+    primera = list(iterar_vales(inventario_ejemplo, procesos=1, fecha=FECHA, cache=cache))
+    assert len(renderizados) == 4
+
+    modificado = inventario_ejemplo.copy()
+    modificado.loc[modificado['NOMBRE'] == 'EMPLEADO 2', 'DESCRIPCION'] = 'ESCRITORIO'
+    renderizados.clear()
+    segunda = list(iterar_vales(modificado, procesos=1, fecha=FECHA, cache=cache))
+
+    assert renderizados == ['EMPLEADO 2']
+    cambiados = [a[0] for a, b in zip(primera, segunda) if a[1] != b[1]]
+    assert cambiados == ['EMPLEADO 2']
+
+
+def test_clave_cambia_con_el_logotipo(inventario_ejemplo, tmp_path, monkeypatch):
+    logotipo = tmp_path / 'LOGOS_VALE.png'
+    shutil.copy(vales_core.IMAGEN_ENCABEZADO_VALE, logotipo)
+    monkeypatch.setattr(vales_core, 'IMAGEN_ENCABEZADO_VALE', str(logotipo))
+    bloque = inventario_ejemplo[inventario_ejemplo['NOMBRE'] == 'EMPLEADO 0']
+    datos = bloque.iloc[0]
+
+    antes = clave_vale('EMPLEADO 0', datos, bloque, FECHA)
+    assert clave_vale('EMPLEADO 0', datos, bloque, FECHA) == antes
+    shutil.copy(vales_core.IMAGEN_PIE_VALE, logotipo)
+    assert clave_vale('EMPLEADO 0', datos, bloque, FECHA) != antes
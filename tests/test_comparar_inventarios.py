@@ -0,0 +1,49 @@
+import pandas as pd
+
+from vales_core import comparar_inventarios, normalizar_inventario, resumir_cambios
+
+
+def nueva_version(anterior):
+    """Baja de INV-0-0, alta de INV-1-9, nuevo VALOR de INV-2-1 y filas reordenadas"""
+    actual = anterior[anterior['NUMERO DE INVVENTARIO'] != 'INV-0-0'].copy()
+    actual.loc[actual['NUMERO DE INVVENTARIO'] == 'INV-2-1', 'VALOR'] = 999.0
+    alta = actual[actual['NOMBRE'] == 'EMPLEADO 1'].iloc[[0]].assign(
+        **{'NUMERO DE INVVENTARIO': 'INV-1-9', 'No. SEP': '199', 'DESCRIPCION': 'MESA'}
+    )
+    return pd.concat([alta, actual.iloc[::-1]], ignore_index=True)
+
+
+def test_altas_bajas_y_modificados(inventario_ejemplo):
+    cambios = comparar_inventarios(inventario_ejemplo, nueva_version(inventario_ejemplo))
+
+    cambios = cambios.sort_values('ARTICULO').reset_index(drop=True)
+    assert cambios[['NOMBRE', 'ARTICULO', 'CAMBIO', 'DESCRIPCION', 'COLUMNAS']].values.tolist() == [
+        ['EMPLEADO 0', 'INV-0-0', 'BAJA', 'SILLA 0', ''],
+        ['EMPLEADO 1', 'INV-1-9', 'ALTA', 'MESA', ''],
+        ['EMPLEADO 2', 'INV-2-1', 'MODIFICADO', 'SILLA 1', 'VALOR'],
+    ]
+
+    resumen = resumir_cambios(cambios)
+    assert resumen.values.tolist() == [
+        ['EMPLEADO 0', 0, 1, 0],
+        ['EMPLEADO 1', 1, 0, 0],
+        ['EMPLEADO 2', 0, 0, 1],
+    ]
+
+
+def test_datos_del_empleado_en_inventarios_normalizados(inventario_ejemplo):
+    actual = inventario_ejemplo.copy()
+    actual.loc[actual['NOMBRE'] == 'EMPLEADO 3', 'AREA O DEPARTAMENTO'] = 'CONTABILIDAD'
+
+    # Normalizados, los datos del empleado solo están en la tabla del índice
+    anterior, indice_anterior = normalizar_inventario(inventario_ejemplo)
+    actual, indice_actual = normalizar_inventario(actual)
+    cambios = comparar_inventarios(anterior, actual, indice_anterior, indice_actual)
+
+    assert set(cambios['CAMBIO']) == {'MODIFICADO'}
+    assert cambios['ARTICULO'].tolist() == ['INV-3-0', 'INV-3-1', 'INV-3-2']
+    assert set(cambios['COLUMNAS']) == {'AREA O DEPARTAMENTO'}
+
+
+def test_sin_cambios(inventario_ejemplo):
+    assert comparar_inventarios(inventario_ejemplo, inventario_ejemplo.iloc[::-1]).empty
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from vales_core import (
+    AlmacenInventario,
+    SIN_DATO_RESUMEN,
+    construir_cubo_inventario,
+    estadisticas_inventario,
+    normalizar_inventario,
+    resumir_cubo,
+)
+
+
+@pytest.fixture
+def inventario(inventario_ejemplo):
+    """Un artículo en proceso de alta (sin números y con valor 0) y un empleado sin PISO"""
+    df = inventario_ejemplo.copy()
+    df.loc[0, ['No. SEP', 'NUMERO DE INVVENTARIO', 'VALOR']] = [np.nan, '', 0.0]
+    df.loc[df['NOMBRE'] == 'EMPLEADO 3', 'PISO'] = np.nan
+    return df
+
+
+def test_totales_iguales_a_las_estadisticas(inventario):
+    cubo = construir_cubo_inventario(inventario)
+    esperadas = estadisticas_inventario(inventario)
+
+    assert estadisticas_inventario(inventario, cubo) == pytest.approx(esperadas)
+    assert cubo['EN_PROCESO_ALTA'].sum() == 1
+
+
+def test_cualquier_nivel_suma_el_total(inventario):
+    cubo = construir_cubo_inventario(inventario)
+    total = resumir_cubo(cubo).iloc[0]
+
+    for dimension in ('AREA O DEPARTAMENTO', 'CT', 'PISO'):
+        por_dimension = resumir_cubo(cubo, [dimension])
+        assert por_dimension['EMPLEADOS'].sum() == total['EMPLEADOS'] == 4
+        assert por_dimension['ARTICULOS'].sum() == total['ARTICULOS'] == 12
+        assert por_dimension['VALOR_TOTAL'].sum() == pytest.approx(total['VALOR_TOTAL'])
+
+    por_area = resumir_cubo(cubo, ['AREA O DEPARTAMENTO']).set_index('AREA O DEPARTAMENTO')
+    assert por_area.loc['FINANZAS', 'VALOR_TOTAL'] == 1200.0
+    assert por_area.loc['FINANZAS', 'VALOR_PROMEDIO'] == 200.0
+    assert resumir_cubo(cubo, ['PISO'])['PISO'].tolist() == [SIN_DATO_RESUMEN, '1']
+
+    filtrado = resumir_cubo(cubo, filtros={'CT': 'CT1'}).iloc[0]
+    assert (filtrado['EMPLEADOS'], filtrado['ARTICULOS']) == (2, 6)
+
+
+def test_almacen_igual_al_dataframe(inventario, tmp_path):
+    articulos, indice = normalizar_inventario(inventario)
+    almacen = AlmacenInventario(str(tmp_path / 'inventario.sqlite'))
+    almacen.cargar(articulos, indice, huella='h')
+
+    cubo = construir_cubo_inventario(almacen)
+    assert cubo.equals(construir_cubo_inventario(articulos, indice))
+    assert estadisticas_inventario(almacen, cubo) == pytest.approx(estadisticas_inventario(almacen))
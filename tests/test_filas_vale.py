@@ -0,0 +1,29 @@
+from vales_core import ANCHOS_COLUMNAS_VALE, MARGEN_CELDA_VALE, TAMANO_LETRA_FILA, _texto_celda
+from vales_pdf import ancho_texto, partir_texto_celda
+
+ANCHO_DESCRIPCION = ANCHOS_COLUMNAS_VALE[3]
+
+
+def test_texto_celda_distingue_tipos_iguales():
+    assert _texto_celda(1.0) == '1.0'
+    assert _texto_celda(True) == 'True'
+    assert _texto_celda(1) == '1'
+
+
+def test_descripcion_corta_en_una_linea():
+    assert partir_texto_celda('SILLA', ANCHO_DESCRIPCION) == ('SILLA',)
+
+
+def test_descripcion_larga_se_parte_en_espacios_y_cabe():
+    texto = 'ESCRITORIO EJECUTIVO DE MADERA CON CUBIERTA DE CRISTAL TEMPLADO Y TRES CAJONES CON CERRADURA'
+    lineas = partir_texto_celda(texto, ANCHO_DESCRIPCION)
+    assert len(lineas) == 2
+    assert texto.startswith(lineas[0] + ' ')
+    assert lineas[1].endswith('...')
+    disponible = ANCHO_DESCRIPCION - 2 * MARGEN_CELDA_VALE
+    assert all(ancho_texto(linea, TAMANO_LETRA_FILA) <= disponible for linea in lineas)
+
+
+def test_palabra_mas_ancha_que_la_celda():
+    lineas = partir_texto_celda('X' * 120, ANCHO_DESCRIPCION)
+    assert len(lineas) == 2 and lineas[0] and set(lineas[0]) == {'X'}
@@ -0,0 +1,20 @@
+from datetime import datetime
+
+from vales_core import iterar_vales
+
+FECHA = datetime(2025, 1, 2)
+
+
+def vales(df, procesos):
+    return [
+        (empleado, resultado, error)
+        for empleado, resultado, error in iterar_vales(df, procesos=procesos, fecha=FECHA, cache=None)
+    ]
+
+
+def test_paralelo_igual_a_serie_byte_a_byte(inventario_ejemplo):
+    serie = vales(inventario_ejemplo, 1)
+    paralelo = vales(inventario_ejemplo, 2)
+    assert [error for _, _, error in serie + paralelo] == [None] * 8
+    assert [resultado for _, resultado, _ in serie] == [resultado for _, resultado, _ in paralelo]
+    assert [empleado for empleado, _, _ in paralelo] == [f'EMPLEADO {e}' for e in range(4)]
@@ -0,0 +1,51 @@
+import pandas as pd
+
+from vales_core import AlmacenInventario, construir_indice_activos, normalizar_inventario
+
+
+def inventario_con_duplicados(inventario):
+    """INV-0-0 también asignado (con otro formato) a EMPLEADO 3, e INV-1-0 repetido por su mismo dueño"""
+    df = inventario.copy()
+    df.loc[9, 'NUMERO DE INVVENTARIO'] = ' inv-0-0 '
+    df.loc[4, 'NUMERO DE INVVENTARIO'] = 'INV-1-0'
+    return df
+
+
+def test_numero_asignado_a_dos_empleados(inventario_ejemplo):
+    duplicados = construir_indice_activos(inventario_con_duplicados(inventario_ejemplo)).duplicados
+
+    assert duplicados[['CAMPO', 'NUMERO', 'EMPLEADOS', 'NOMBRE']].values.tolist() == [
+        ['NUMERO DE INVVENTARIO', 'INV-0-0', 2, 'EMPLEADO 0'],
+        ['NUMERO DE INVVENTARIO', ' inv-0-0 ', 2, 'EMPLEADO 3'],
+    ]
+
+
+def test_sin_duplicados(inventario_ejemplo):
+    assert construir_indice_activos(inventario_ejemplo).duplicados.empty
+
+
+def test_buscar_exacto_antes_que_prefijo(inventario_ejemplo):
+    df = inventario_ejemplo.copy()
+    df.loc[0, 'NUMERO DE INVVENTARIO'] = 'INV-1'
+    activos = construir_indice_activos(df)
+
+    resultado = activos.buscar(' inv-1 ')
+    assert resultado['NUMERO'].tolist() == ['INV-1', 'INV-1-0', 'INV-1-1', 'INV-1-2']
+    assert resultado['NOMBRE'].tolist() == ['EMPLEADO 0', 'EMPLEADO 1', 'EMPLEADO 1', 'EMPLEADO 1']
+    assert len(activos.buscar('INV-1', limite=2)) == 2
+    assert activos.buscar('301')[['CAMPO', 'NOMBRE']].values.tolist() == [['No. SEP', 'EMPLEADO 3']]
+    assert activos.buscar('NO-EXISTE').empty
+
+
+def test_almacen_igual_al_dataframe(inventario_ejemplo, tmp_path):
+    articulos, indice = normalizar_inventario(inventario_con_duplicados(inventario_ejemplo))
+    almacen = AlmacenInventario(str(tmp_path / 'inventario.sqlite'))
+    almacen.cargar(articulos, indice, huella='h')
+
+    en_memoria = construir_indice_activos(articulos)
+    en_almacen = construir_indice_activos(almacen)
+
+    assert en_almacen.filas is None
+    pd.testing.assert_frame_equal(en_almacen.duplicados, en_memoria.duplicados, check_dtype=False)
+    for consulta in ('INV-0', 'inv-1-0', '1'):
+        pd.testing.assert_frame_equal(en_almacen.buscar(consulta), en_memoria.buscar(consulta), check_dtype=False)
@@ -0,0 +1,59 @@
+import gzip
+
+import pandas as pd
+import pytest
+
+from vales_core import leer_csv_inventario
+
+ENCABEZADO = "NOMBRE,DESCRIPCION,VALOR\n"
+
+
+def csv_latin1(filas_ascii):
+    """CSV con encabezado y primeras filas ASCII y una fila final con acentos en Latin-1"""
+    texto = ENCABEZADO + "".join(f"EMPLEADO {i},SILLA,100\n" for i in range(filas_ascii))
+    return (texto + "JOSÉ PEÑA,ESCRITORIO DE CAOBA,250\n").encode('latin-1')
+
+
+@pytest.mark.parametrize('comprimido', [False, True])
+def test_cuerpo_latin1_con_encabezado_ascii(comprimido):
+    datos = csv_latin1(5)
+    if comprimido:
+        datos = gzip.compress(datos)
+    # Bloques pequeños: el error de decodificación aparece después del primer bloque
+    df = leer_csv_inventario(datos, comprimido=comprimido, filas_por_bloque=2)
+    assert len(df) == 6
+    assert df['NOMBRE'].iloc[-1] == 'JOSÉ PEÑA'
+    assert df['VALOR'].sum() == 750
+
+
+def test_utf8_se_conserva():
+    datos = (ENCABEZADO + "JOSÉ PEÑA,SILLA,100\n").encode('utf-8-sig')
+    df = leer_csv_inventario(datos)
+    assert df['NOMBRE'].tolist() == ['JOSÉ PEÑA']
+
+
+def csv_variado(filas):
+    """CSV con separador `;`, columnas ajenas al sistema, filas sin NOMBRE, celdas vacías y códigos QR"""
+    lineas = ["Nombre;Columna Extra;Descripcion;Valor;No. SEP;QR"]
+    for i in range(filas):
+        nombre = "" if i % 7 == 3 else f"EMPLEADO {i % 4}"
+        qr = f"{i:05d}|INV{i}|SILLA QR|{i}.50" if i % 3 == 0 else ""
+        valor = "" if i % 5 == 0 else f"{i * 10}"
+        lineas.append(f"{nombre};x{i};SILLA {i};{valor};00{i};{qr}")
+    return ("\n".join(lineas) + "\n").encode('utf-8')
+
+
+@pytest.mark.parametrize('comprimido', [False, True])
+def test_lectura_por_bloques_igual_a_un_solo_bloque(comprimido):
+    datos = csv_variado(25)
+    if comprimido:
+        datos = gzip.compress(datos)
+    completo = leer_csv_inventario(datos, comprimido=comprimido, filas_por_bloque=1000)
+
+    # 4 filas descartadas por no tener NOMBRE
+    assert len(completo) == 21
+    assert 'Columna Extra' not in completo.columns
+    assert completo['No. SEP'].iloc[0] == '000'
+    for filas_por_bloque in (1, 4, 7):
+        por_bloques = leer_csv_inventario(datos, comprimido=comprimido, filas_por_bloque=filas_por_bloque)
+        pd.testing.assert_frame_equal(por_bloques, completo)
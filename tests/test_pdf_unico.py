@@ -0,0 +1,58 @@
+import re
+import zlib
+from datetime import datetime
+
+import pandas as pd
+
+from vales_core import generar_pdf_unico
+
+
+def inventario_articulos(articulos_por_empleado):
+    filas = [
+        {'NOMBRE': f'EMPLEADO {e}', 'CURP': f'CURP{e:04d}', 'RFC': f'RFC{e:04d}', 'AREA O DEPARTAMENTO': 'FINANZAS',
+         'No. SEP': f'{e}{a:03d}', 'NUMERO DE INVVENTARIO': f'INV-{e}-{a}', 'DESCRIPCION': 'SILLA', 'VALOR': 100.0}
+        for e, articulos in enumerate(articulos_por_empleado) for a in range(articulos)
+    ]
+    return pd.DataFrame(filas)
+
+
+def leer_pdf(ruta):
+    """Páginas, títulos del índice (outline) y textos "Página n de N" de un PDF de fpdf2"""
+    with open(ruta, 'rb') as archivo:
+        contenido = archivo.read()
+    paginas = len(re.findall(rb'/Type /Page\b', contenido))
+    titulos = [
+        bytes.fromhex(titulo.decode('ascii')).decode('utf-16')
+        for titulo in re.findall(rb'/Title <([0-9a-f]+)>', contenido)
+    ]
+    numeracion = []
+    for flujo in re.findall(rb'stream\r?\n(.*?)\r?\nendstream', contenido, re.S):
+        try:
+            texto = zlib.decompress(flujo)
+        except zlib.error:
+            continue
+        numeracion += [pagina.decode('latin-1') for pagina in re.findall(rb'\((P\S*gina [^)]*)\) Tj', texto)]
+    return paginas, titulos, numeracion
+
+
+def test_paginas_indice_y_numeracion_por_vale(tmp_path):
+    vales = []
+    ruta = generar_pdf_unico(
+        inventario_articulos([3, 80, 2]), fecha=datetime(2024, 5, 17),
+        al_vale=lambda *vale: vales.append(vale), destino=str(tmp_path / 'vales.pdf')
+    )
+
+    # El vale de 80 artículos ocupa varias páginas; los demás, una
+    assert vales[0] == ('EMPLEADO 0', 1, 1)
+    empleado, inicio, paginas_vale = vales[1]
+    assert (empleado, inicio) == ('EMPLEADO 1', 2) and paginas_vale > 1
+    assert vales[2] == ('EMPLEADO 2', 2 + paginas_vale, 1)
+
+    paginas, titulos, numeracion = leer_pdf(ruta)
+    assert paginas == 2 + paginas_vale
+    assert titulos == ['EMPLEADO 0', 'EMPLEADO 1', 'EMPLEADO 2']
+    assert numeracion == (
+        ['Página 1 de 1']
+        + [f'Página {pagina} de {paginas_vale}' for pagina in range(1, paginas_vale + 1)]
+        + ['Página 1 de 1']
+    )
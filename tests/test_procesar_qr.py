@@ -0,0 +1,68 @@
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from vales_core import procesar_dataframe_con_qr, procesar_dataframe_con_qr_por_fila
+
+
+def codigo_qr_aleatorio(azar):
+    """Código QR con separadores mezclados, partes faltantes y valores inválidos"""
+    r = azar.random()
+    if r < 0.1:
+        return np.nan
+    if r < 0.15:
+        return azar.choice(['', ' ', 'nan', 'None', 12345, 3.5])
+    separador = azar.choice(['|', ';', ',', '|', ' '])
+    n = azar.choice([2, 3, 4, 4, 4, 5, 6])
+    partes = [azar.choice(['123', ' 45 ', 'ab', '', 'SILLA, GRANDE']) for _ in range(n)]
+    if n >= 4:
+        partes[3] = azar.choice(['$1,500.00', 'abc', '1.2.3', '.', '0', '250.5', ''])
+    return separador.join(partes)
+
+
+def inventario_aleatorio(azar):
+    """Inventario con columnas destino ausentes o ya capturadas e índice no consecutivo"""
+    n = azar.randint(1, 300)
+    df = pd.DataFrame({
+        'NOMBRE': [f'E{azar.randint(0, 20)}' for _ in range(n)],
+        'QR': [codigo_qr_aleatorio(azar) for _ in range(n)],
+    })
+    if azar.random() < 0.7:
+        df['No. SEP'] = [azar.choice([np.nan, '', ' ', '77', 77]) for _ in range(n)]
+    if azar.random() < 0.7:
+        df['NUMERO DE INVVENTARIO'] = [azar.choice([np.nan, np.nan, '', '99']) for _ in range(n)]
+    if azar.random() < 0.7:
+        df['DESCRIPCION'] = [azar.choice([np.nan, '', ' ', 'X', 0]) for _ in range(n)]
+    if azar.random() < 0.7:
+        df['VALOR'] = [azar.choice([0.0, 0.0, np.nan, 10.0]) for _ in range(n)]
+    if azar.random() < 0.3:
+        df.index = azar.sample(range(10 * n), n)
+    return df
+
+
+@pytest.mark.parametrize('semilla', range(30))
+def test_columnar_igual_a_por_fila(semilla):
+    df = inventario_aleatorio(random.Random(semilla))
+    assert_frame_equal(procesar_dataframe_con_qr(df), procesar_dataframe_con_qr_por_fila(df))
+
+
+def test_casos_conocidos():
+    df = pd.DataFrame({
+        'NOMBRE': ['A'] * 6,
+        'QR': ['1|INV-1|SILLA|$1,500.00', '2;INV-2;MESA;abc', '3,INV-3', 'SIN SEPARADOR', '4|INV-4|LAMPARA|10', None],
+        'No. SEP': ['', '', '', '', '99', ''],
+        'DESCRIPCION': ['', 'PREVIA', '', '', '', ''],
+        'VALOR': [0.0, 0.0, 0.0, 0.0, 0.0, 0.0],
+    })
+    resultado = procesar_dataframe_con_qr(df)
+    assert_frame_equal(resultado, procesar_dataframe_con_qr_por_fila(df))
+    assert resultado.loc[0, ['No. SEP', 'NUMERO DE INVVENTARIO', 'DESCRIPCION', 'VALOR']].tolist() == ['1', 'INV-1', 'SILLA', 1500.0]
+    # Descripción capturada y valor no numérico: se conservan
+    assert resultado.loc[1, 'DESCRIPCION'] == 'PREVIA'
+    assert resultado.loc[1, 'VALOR'] == 0.0
+    # Con No. SEP ya capturado el código no se interpreta
+    assert resultado.loc[4, 'DESCRIPCION'] == ''
+    assert resultado.loc[3, 'DESCRIPCION'] == 'SIN SEPARADOR'
@@ -0,0 +1,27 @@
+import tracemalloc
+
+from vales_core import Rendimiento, etapa_rendimiento
+
+
+def test_memoria_pico_detiene_tracemalloc_y_respeta_etapas_anidadas():
+    assert not tracemalloc.is_tracing()
+    rendimiento = Rendimiento(medir_memoria=True)
+    with rendimiento.activar():
+        with etapa_rendimiento('externa'):
+            bloque = bytearray(8 * 1024 * 1024)
+            del bloque
+            # El reset_peak de la etapa interna no debe borrar el pico de la externa
+            with etapa_rendimiento('interna'):
+                pass
+        assert not tracemalloc.is_tracing()
+
+    picos = {etapa['etapa']: etapa['memoria_pico_mb'] for etapa in rendimiento.etapas}
+    assert picos['externa'] >= 8
+    assert picos['interna'] < 1
+
+
+def test_sin_medir_memoria_no_inicia_tracemalloc():
+    rendimiento = Rendimiento()
+    with rendimiento.activar(), etapa_rendimiento('etapa'):
+        assert not tracemalloc.is_tracing()
+    assert 'memoria_pico_mb' not in rendimiento.etapas[0]
@@ -0,0 +1,45 @@
+import os
+import threading
+from datetime import datetime
+
+import vales_core
+from vales_core import TrabajoVales
+
+FECHA = datetime(2025, 1, 2)
+
+
+def test_descartar_durante_la_generacion_elimina_todos_los_zip(inventario_ejemplo, monkeypatch):
+    generar = vales_core.generar_vale_pdf
+    segundo_vale = threading.Event()
+    continuar = threading.Event()
+
+    def generar_vale_pdf(empleado, *args, **kwargs):
+        if empleado == 'EMPLEADO 1':
+            # El primer ZIP (FINANZAS) ya está cerrado; se descarta antes de seguir
+            segundo_vale.set()
+            continuar.wait(5)
+        return generar(empleado, *args, **kwargs)
+
+    monkeypatch.setattr(vales_core, 'generar_vale_pdf', generar_vale_pdf)
+    trabajo = TrabajoVales(
+        inventario_ejemplo, procesos=1, fecha=FECHA, cache=None, particion='AREA O DEPARTAMENTO'
+    ).iniciar()
+    assert segundo_vale.wait(5)
+    rutas = [archivo['ruta'] for archivo in trabajo.archivos]
+    assert len(rutas) == 1
+
+    trabajo.descartar()
+    continuar.set()
+    assert trabajo.esperar(10)
+
+    assert trabajo.estado == 'cancelado'
+    rutas += [archivo['ruta'] for archivo in trabajo.archivos]
+    assert not any(os.path.exists(ruta) for ruta in rutas)
+
+
+def test_descartar_conserva_el_zip_indicado(inventario_ejemplo):
+    trabajo = TrabajoVales(inventario_ejemplo, procesos=1, fecha=FECHA, cache=None).iniciar()
+    assert trabajo.esperar(30)
+    trabajo.descartar(conservar=[trabajo.ruta])
+    assert os.path.exists(trabajo.ruta)
+    vales_core.eliminar_archivo_temporal(trabajo.ruta)
@@ -0,0 +1,76 @@
+import os
+import zipfile
+from datetime import datetime
+
+from vales_core import construir_indice_empleados, escribir_zips_particionados, particionar_empleados
+
+FECHA = datetime(2024, 5, 17)
+
+
+def vale(empleado, tamano):
+    """Resultado de `iterar_vales` con un PDF incompresible de `tamano` bytes"""
+    return empleado, (f"Vale_{empleado}.pdf", os.urandom(tamano)), None
+
+
+def test_partes_no_superan_el_maximo(tmp_path):
+    resultados = [vale(f'EMPLEADO {i}', 1000) for i in range(10)] + [vale('EMPLEADO GRANDE', 5000)]
+    particion_de = {empleado: 'FINANZAS' for empleado, _, _ in resultados}
+    notificados = []
+
+    archivos = escribir_zips_particionados(
+        iter(resultados), particion_de, FECHA, max_bytes=3500, al_archivo=notificados.append,
+        directorio=str(tmp_path)
+    )
+
+    assert notificados == archivos
+    assert [archivo['parte'] for archivo in archivos] == list(range(1, len(archivos) + 1))
+    assert archivos[0]['nombre'] == 'Vales_FINANZAS.zip'
+    assert archivos[1]['nombre'] == 'Vales_FINANZAS_parte2.zip'
+    # Solo el vale que por sí solo supera el máximo queda en una parte más grande
+    assert archivos[-1]['vales'] == 1 and archivos[-1]['bytes'] > 3500
+    for archivo in archivos[:-1]:
+        assert archivo['bytes'] == os.path.getsize(archivo['ruta']) <= 3500
+
+    contenidos = []
+    for archivo in archivos:
+        with zipfile.ZipFile(archivo['ruta']) as zip_particion:
+            assert zip_particion.testzip() is None
+            contenidos += zip_particion.namelist()
+    assert contenidos == [resultado[0] for _, resultado, _ in resultados]
+
+
+def test_nombres_repetidos_al_quitar_acentos(tmp_path):
+    resultados = [vale('EMPLEADO 0', 100), vale('EMPLEADO 1', 100), vale('EMPLEADO 2', 100)]
+    particion_de = {'EMPLEADO 0': 'ÁREA 1', 'EMPLEADO 1': 'AREA 1', 'EMPLEADO 2': 'AREA-1'}
+
+    archivos = escribir_zips_particionados(iter(resultados), particion_de, FECHA, directorio=str(tmp_path))
+
+    assert [archivo['nombre'] for archivo in archivos] == [
+        'Vales_AREA_1.zip', 'Vales_AREA_1_2.zip', 'Vales_AREA_1_3.zip'
+    ]
+    assert sorted(os.listdir(tmp_path)) == sorted(archivo['nombre'] for archivo in archivos)
+
+
+def test_errores_se_reportan_y_se_omiten(tmp_path):
+    errores = []
+    resultados = [vale('EMPLEADO 0', 100), ('EMPLEADO 1', None, ValueError("sin datos")), vale('EMPLEADO 2', 100)]
+    particion_de = {'EMPLEADO 0': 'A', 'EMPLEADO 1': 'A', 'EMPLEADO 2': 'B'}
+
+    archivos = escribir_zips_particionados(
+        iter(resultados), particion_de, FECHA, al_error=lambda empleado, error: errores.append(empleado),
+        directorio=str(tmp_path)
+    )
+
+    assert errores == ['EMPLEADO 1']
+    assert [(archivo['particion'], archivo['vales']) for archivo in archivos] == [('A', 1), ('B', 1)]
+
+
+def test_particiones_en_orden_alfabetico(inventario_ejemplo):
+    indice = construir_indice_empleados(inventario_ejemplo)
+    particiones = particionar_empleados(inventario_ejemplo, indice, 'AREA O DEPARTAMENTO')
+    assert {particion: list(grupo) for particion, grupo in particiones.items()} == {
+        'FINANZAS': ['EMPLEADO 2', 'EMPLEADO 3'],
+        'RECURSOS HUMANOS': ['EMPLEADO 0', 'EMPLEADO 1'],
+    }
+    assert list(particiones) == ['FINANZAS', 'RECURSOS HUMANOS']
+
@@ -0,0 +1,2553 @@
+import argparse
+import atexit
+import bisect
+import csv
+import gzip
+import hashlib
+import heapq
+import io
+import itertools
+import json
+import logging
+import math
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+import tracemalloc
+import unicodedata
+import warnings
+import zipfile
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from datetime import date, datetime
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# Núcleo del sistema de vales sin dependencias de Streamlit: lectura del inventario,
+# códigos QR, generación de PDF (dibujados en vales_pdf) y ZIP, y la línea de comandos para lotes
+# (`main_cli`), que se ejecuta desde sistema_vales sin iniciar Streamlit:
+#     python -m sistema_vales batch area1.xlsx area2.xlsx --out vales/ --jobs 8
+# Este módulo no tiene punto de entrada propio: ejecutado como __main__, vales_pdf
+# importaría una segunda copia (otra caché de vales y otra limpieza de temporales).
+
+logger = logging.getLogger(__name__)
+logger_rendimiento = logging.getLogger(f"{__name__}.rendimiento")
+
+
+# Imágenes de marca de los vales PDF
+IMAGEN_ENCABEZADO_VALE = "LOGOS_VALE.png"
+IMAGEN_PIE_VALE = "Pie_vale.png"
+# Las imágenes de marca se incrustan remuestreadas a la resolución de impresión
+# (ancho en el vale y DPI) en JPEG o PNG de paleta, lo que ocupe menos en el PDF
+ANCHO_IMAGENES_VALE_MM = 190
+DPI_IMAGENES_VALE = int(os.environ.get('VALES_DPI_IMAGENES', 200))
+CALIDAD_JPEG_IMAGENES = 85
+COLORES_PALETA_IMAGENES = 64
+# Directorio de las imágenes optimizadas (por huella del archivo original)
+DIRECTORIO_IMAGENES_OPTIMIZADAS = (
+    os.environ.get('VALES_CACHE_IMAGENES') or os.path.join(tempfile.gettempdir(), 'vales_imagenes')
+)
+
+# Versión de la plantilla del vale: incrementarla al cambiar el diseño del PDF
+# invalida los vales guardados en la caché
+VERSION_PLANTILLA_VALE = "2025.4"
+# Columnas que aparecen en el vale (encabezado del responsable y tabla de bienes)
+COLUMNAS_ENCABEZADO_VALE = ['NOMBRE', 'CURP', 'RFC', 'AREA O DEPARTAMENTO', 'EDIFICIO', 'CT', 'PISO']
+COLUMNAS_ARTICULO_VALE = ['No. SEP', 'NUMERO DE INVVENTARIO', 'DESCRIPCION', 'VALOR', 'OBSERVACIONES']
+# Datos del responsable que se guardan una vez por empleado en el inventario normalizado
+COLUMNAS_DATOS_EMPLEADO = [col for col in COLUMNAS_ENCABEZADO_VALE if col != 'NOMBRE']
+# Archivo y hoja de los que se leyó cada fila ("archivo [hoja]")
+COLUMNA_ORIGEN = 'ORIGEN'
+# Dimensiones y medidas del resumen del inventario (ver `construir_cubo_inventario`)
+DIMENSIONES_RESUMEN = ['AREA O DEPARTAMENTO', 'EDIFICIO', 'CT', 'PISO']
+COLUMNAS_RESUMEN = ['ARTICULOS', 'EMPLEADOS', 'VALOR_TOTAL', 'EN_PROCESO_ALTA']
+SIN_DATO_RESUMEN = "(SIN DATO)"
+# Números que identifican un bien (búsqueda inversa y detección de duplicados)
+COLUMNAS_ACTIVO = ['NUMERO DE INVVENTARIO', 'No. SEP']
+# Textos de artículo que se repiten mucho entre filas
+COLUMNAS_CATEGORICAS = ['DESCRIPCION', 'OBSERVACIONES', COLUMNA_ORIGEN]
+
+# Tabla de bienes del vale: anchos de columna (mm), margen interior de celda (mm)
+# y tamaños de letra (pt) de las filas; el segundo tamaño se usa cuando el texto
+# no cabe con el primero
+ANCHOS_COLUMNAS_VALE = (8, 15, 40, 65, 20, 42)
+MARGEN_CELDA_VALE = 1.0
+TAMANO_LETRA_FILA = 7
+TAMANO_LETRA_FILA_REDUCIDA = 6
+# Líneas en que se parte una descripción larga dentro de la misma fila
+LINEAS_DESCRIPCION_VALE = 2
+
+# Columnas del archivo de inventario que usa el sistema (el resto no se carga)
+COLUMNAS_SISTEMA = [
+    'NOMBRE', 'CURP', 'RFC', 'AREA O DEPARTAMENTO', 'EDIFICIO', 'QR', 'No. SEP',
+    'NUMERO DE INVVENTARIO', 'DESCRIPCION', 'VALOR', 'OBSERVACIONES', 'CT', 'PISO'
+]
+# Columnas de identificadores que se leen como texto
+COLUMNAS_IDENTIFICADOR = ['CURP', 'RFC', 'QR', 'No. SEP', 'NUMERO DE INVVENTARIO', 'CT', 'PISO']
+_COLUMNAS_POR_CLAVE = {col.upper(): col for col in COLUMNAS_SISTEMA}
+
+# Separadores reconocidos en los códigos QR, en orden de prioridad
+SEPARADORES_QR = ("|", ";", ",")
+# Caracteres que se eliminan del campo VALOR de un código QR
+PATRON_VALOR_NO_NUMERICO = re.compile(r'[^\d.]')
+
+# Procesos por pool si no se indican en el entorno: cada sesión del servidor abre
+# sus propios pools, así que no se usan todos los núcleos por defecto
+PROCESOS_MAXIMOS_POR_DEFECTO = 4
+# Procesos para la generación masiva de vales (1 = en serie)
+PROCESOS_GENERACION = max(1, int(os.environ.get(
+    'VALES_PROCESOS', min(PROCESOS_MAXIMOS_POR_DEFECTO, os.cpu_count() or 1)
+)))
+# Tareas en vuelo por proceso durante la generación paralela
+TAREAS_POR_PROCESO = 4
+# Procesos para leer las hojas de los archivos de inventario (una tarea por hoja)
+PROCESOS_LECTURA = max(1, int(os.environ.get(
+    'VALES_PROCESOS_LECTURA', min(PROCESOS_MAXIMOS_POR_DEFECTO, os.cpu_count() or 1)
+)))
+# Filas por bloque al leer un CSV del inventario (acota la memoria de la lectura)
+FILAS_POR_BLOQUE_CSV = 50_000
+# Separadores reconocidos en la primera línea de un CSV
+SEPARADORES_CSV = (",", ";", "\t", "|")
+# Filas por lote al guardar el inventario en el almacén SQLite
+FILAS_POR_LOTE_ALMACEN = 10_000
+# Máximo de id por consulta `WHERE id IN (...)` (SQLite limita los parámetros a 999 en versiones antiguas)
+IDS_POR_CONSULTA_ALMACEN = 500
+
+# Compresión del ZIP masivo (los PDF ya vienen comprimidos)
+COMPRESION_ZIP_DEFAULT = zipfile.ZIP_STORED
+NOMBRE_ZIP_VALES = "Todos_Los_Vales_de_Resguardo.zip"
+NOMBRE_PDF_UNICO = "Vales_de_Resguardo_para_Imprimir.pdf"
+COMPRESIONES_CLI = {"stored": zipfile.ZIP_STORED, "deflate": zipfile.ZIP_DEFLATED}
+# Criterios para dividir la generación masiva en un ZIP por grupo de empleados
+CRITERIOS_PARTICION = ['AREA O DEPARTAMENTO', 'EDIFICIO', 'CT']
+PARTICIONES_CLI = {"area": 'AREA O DEPARTAMENTO', "edificio": 'EDIFICIO', "ct": 'CT'}
+
+# Archivos temporales creados por la aplicación (se eliminan al salir)
+_archivos_temporales = set()
+
+class ErrorInventario(Exception):
+    """Error de validación del inventario; el mensaje se muestra tal cual al usuario"""
+
+class Rendimiento:
+    """
+    Mediciones por etapa (duración, filas/empleados, bytes y memoria pico) y
+    tiempo de renderizado por empleado del último lote. Se activa con `activar()`
+    y las funciones del núcleo registran en la instancia activa, si la hay.
+    """
+    def __init__(self, medir_memoria=False, max_etapas=50):
+        self.medir_memoria = medir_memoria
+        self.etapas = deque(maxlen=max_etapas)
+        self.empleados = []
+
+    @contextmanager
+    def activar(self):
+        token = _rendimiento_actual.set(self)
+        try:
+            yield self
+        finally:
+            _rendimiento_actual.reset(token)
+
+    def iniciar_lote(self):
+        """Descarta los tiempos por empleado de un lote anterior"""
+        self.empleados = []
+
+    def registrar_vale(self, empleado, articulos, segundos, bytes_pdf, desde_cache=False):
+        self.empleados.append({
+            'empleado': empleado,
+            'articulos': int(articulos),
+            'segundos': round(segundos, 4),
+            'bytes': bytes_pdf,
+            'desde_cache': desde_cache,
+        })
+
+    def mas_lentos(self, n=10):
+        """Los `n` empleados que más tardaron en renderizarse en el último lote"""
+        return heapq.nlargest(n, self.empleados, key=lambda registro: registro['segundos'])
+
+_rendimiento_actual = ContextVar('rendimiento_vales', default=None)
+
+def rendimiento_activo():
+    """Instancia de Rendimiento activa en el contexto actual (o None)"""
+    return _rendimiento_actual.get()
+
+# Etapas abiertas que miden memoria (de cualquier sesión o hilo): el pico de
+# tracemalloc es global, así que antes de cada reset_peak se acumula en todas ellas
+_lock_memoria = threading.Lock()
+_picos_abiertos = []
+_tracemalloc_propio = False
+
+def _abrir_medicion_memoria():
+    """Inicia (si hace falta) tracemalloc para una etapa y retorna su pico acumulado"""
+    global _tracemalloc_propio
+    with _lock_memoria:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracemalloc_propio = True
+        pico_actual = tracemalloc.get_traced_memory()[1]
+        for pico in _picos_abiertos:
+            pico[0] = max(pico[0], pico_actual)
+        tracemalloc.reset_peak()
+        pico = [0]
+        _picos_abiertos.append(pico)
+        return pico
+
+def _cerrar_medicion_memoria(pico):
+    """
+    Retorna el pico en bytes de la etapa y detiene tracemalloc si esta medición lo
+    inició y ya no queda ninguna etapa abierta
+    """
+    global _tracemalloc_propio
+    with _lock_memoria:
+        pico_actual = tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else 0
+        for abierto in _picos_abiertos:
+            abierto[0] = max(abierto[0], pico_actual)
+        # Por identidad: dos etapas pueden llevar el mismo pico
+        _picos_abiertos[:] = [abierto for abierto in _picos_abiertos if abierto is not pico]
+        if not _picos_abiertos and _tracemalloc_propio:
+            tracemalloc.stop()
+            _tracemalloc_propio = False
+        return pico[0]
+
+@contextmanager
+def etapa_rendimiento(nombre, **datos):
+    """
+    Mide una etapa si hay un Rendimiento activo. El diccionario que entrega permite
+    agregar datos al terminar (filas, empleados, bytes...). Cada etapa se registra
+    también como log estructurado en el logger `vales_core.rendimiento`.
+    """
+    rendimiento = _rendimiento_actual.get()
+    if rendimiento is None:
+        yield datos
+        return
+
+    pico = _abrir_medicion_memoria() if rendimiento.medir_memoria else None
+    inicio = time.perf_counter()
+    try:
+        yield datos
+    finally:
+        registro = {'etapa': nombre, 'segundos': round(time.perf_counter() - inicio, 4)}
+        registro.update(datos)
+        if pico is not None:
+            registro['memoria_pico_mb'] = round(_cerrar_medicion_memoria(pico) / (1024 * 1024), 1)
+        registro['fecha'] = datetime.now().isoformat(timespec='seconds')
+        rendimiento.etapas.append(registro)
+        logger_rendimiento.info(json.dumps(registro, ensure_ascii=False, default=str),
+                                extra={'rendimiento': registro})
+
+def procesar_codigo_qr(codigo_qr):
+    """
+    Procesa el código QR para extraer:
+    - No. SEP
+    - Número de inventario
+    - Descripción
+    - Valor
+    """
+    # Inicializar valores por defecto
+    no_sep = ""
+    numero_inventario = ""
+    descripcion = ""
+    valor = 0
+    
+    try:
+        # MEJORA: Validación de código QR vacío
+        if not codigo_qr or codigo_qr.strip() == "":
+            return no_sep, numero_inventario, descripcion, valor
+            
+        # MEJORA: Limpieza del código QR
+        codigo_qr = codigo_qr.strip()
+        
+        # Intentar diferentes patrones de códigos QR
+        # Patrón 1: Formato estándar con separadores |
+        if "|" in codigo_qr:
+            partes = codigo_qr.split("|")
+            if len(partes) >= 4:
+                no_sep = partes[0].strip()
+                numero_inventario = partes[1].strip()
+                descripcion = partes[2].strip()
+                # Extraer valor numérico (eliminar caracteres no numéricos)
+                valor_str = PATRON_VALOR_NO_NUMERICO.sub('', partes[3])
+                valor = float(valor_str) if valor_str else 0
+
+        # Patrón 2: Formato con otros separadores
+        elif ";" in codigo_qr:
+            partes = codigo_qr.split(";")
+            if len(partes) >= 4:
+                no_sep = partes[0].strip()
+                numero_inventario = partes[1].strip()
+                descripcion = partes[2].strip()
+                valor_str = PATRON_VALOR_NO_NUMERICO.sub('', partes[3])
+                valor = float(valor_str) if valor_str else 0
+                
+        # MEJORA: Patrón 3 - Formato con comas
+        elif "," in codigo_qr:
+            partes = codigo_qr.split(",")
+            if len(partes) >= 4:
+                no_sep = partes[0].strip()
+                numero_inventario = partes[1].strip()
+                descripcion = partes[2].strip()
+                valor_str = PATRON_VALOR_NO_NUMERICO.sub('', partes[3])
+                valor = float(valor_str) if valor_str else 0
+                
+        # Si no coincide con ningún patrón conocido, usar el código completo como descripción
+        else:
+            descripcion = codigo_qr[:50]  # Limitar a 50 caracteres
+            
+    except Exception as e:
+        logger.error(f"Error al procesar código QR '{codigo_qr}': {str(e)}")
+    
+    return no_sep, numero_inventario, descripcion, valor
+
+def _texto_columna(serie):
+    """Convierte una columna a texto tratando los nulos como cadena vacía"""
+    return serie.where(serie.notna(), "").astype(str)
+
+def _celda_vacia(serie):
+    """Equivalente vectorizado de `not valor or pd.isna(valor) or str(valor).strip() == ""`"""
+    return serie.isna() | _texto_columna(serie).str.strip().eq("") | serie.eq(0)
+
+def procesar_dataframe_con_qr(df):
+    """
+    Procesa el DataFrame que contiene la columna QR y completa las columnas correspondientes.
+
+    Versión columnar de `procesar_dataframe_con_qr_por_fila`: el separador se detecta
+    una vez por grupo de filas, cada grupo se divide en una sola pasada con `.str.split`
+    y solo se rellenan las celdas destino vacías mediante máscaras.
+    """
+    # MEJORA: Validación de DataFrame vacío
+    if df is None or df.empty:
+        return df
+
+    # Verificar si existe la columna QR
+    if 'QR' not in df.columns:
+        return df
+
+    # Crear copia del DataFrame para no modificar el original
+    df_procesado = df.copy()
+
+    # Asegurar que existan las columnas necesarias
+    columnas_necesarias = ['No. SEP', 'NUMERO DE INVVENTARIO', 'DESCRIPCION', 'VALOR']
+    for col in columnas_necesarias:
+        if col not in df_procesado.columns:
+            df_procesado[col] = ""
+            if col == 'VALOR':
+                df_procesado[col] = 0.0
+
+    # Filas con un QR utilizable y sin No. SEP ni número de inventario capturados
+    qr = _texto_columna(df_procesado['QR'])
+    qr_limpio = qr.str.strip()
+    con_qr = qr_limpio.ne("") & ~qr_limpio.isin(["nan", "None"])
+    sin_sep = _texto_columna(df_procesado['No. SEP']).str.strip().eq("")
+    sin_inventario = _texto_columna(df_procesado['NUMERO DE INVVENTARIO']).str.strip().eq("")
+    candidatos = con_qr & sin_sep & sin_inventario
+
+    if not candidatos.any():
+        return df_procesado
+
+    # Se trabaja por posición para no depender de que el índice sea único
+    posiciones = np.flatnonzero(candidatos.to_numpy())
+    codigos = qr_limpio[candidatos].reset_index(drop=True)
+    no_sep = pd.Series("", index=codigos.index, dtype=object)
+    numero_inv = no_sep.copy()
+    descripcion = no_sep.copy()
+    valor = pd.Series(0.0, index=codigos.index)
+
+    # Detectar el separador una sola vez: cada fila usa el primero que contenga
+    pendientes = pd.Series(True, index=codigos.index)
+    for separador in SEPARADORES_QR:
+        grupo = pendientes & codigos.str.contains(separador, regex=False)
+        pendientes &= ~grupo
+        if not grupo.any():
+            continue
+
+        # Con n=4 la cuarta parte coincide con la de un split completo
+        partes = codigos[grupo].str.split(separador, n=4, expand=True).reindex(columns=range(5))
+        partes = partes[partes[3].notna()]
+        if partes.empty:
+            continue
+        idx = partes.index
+
+        no_sep[idx] = partes[0].str.strip()
+        numero_inv[idx] = partes[1].str.strip()
+        descripcion[idx] = partes[2].str.strip()
+
+        valor_str = partes[3].str.replace(PATRON_VALOR_NO_NUMERICO, "", regex=True)
+        valor_num = pd.to_numeric(valor_str, errors='coerce')
+        for codigo in codigos[idx[(valor_str.ne("") & valor_num.isna()).to_numpy()]]:
+            logger.error(f"Error al procesar código QR '{codigo}': valor no numérico")
+        valor[idx] = valor_num.fillna(0).astype(float)
+
+    # Sin separador conocido: el código completo se usa como descripción
+    if pendientes.any():
+        descripcion[pendientes] = codigos[pendientes].str[:50]
+
+    # Actualizar solo las celdas destino vacías
+    descripcion_actual = df_procesado['DESCRIPCION'].iloc[posiciones].reset_index(drop=True)
+    valor_actual = df_procesado['VALOR'].iloc[posiciones].reset_index(drop=True)
+    valor_vacio = valor_actual.notna() & (valor_actual.eq(0) | valor_actual.eq(""))
+    asignaciones = [
+        ('No. SEP', no_sep, no_sep.ne("")),
+        ('NUMERO DE INVVENTARIO', numero_inv, numero_inv.ne("")),
+        ('DESCRIPCION', descripcion, descripcion.ne("") & _celda_vacia(descripcion_actual)),
+        ('VALOR', valor, valor.gt(0) & valor_vacio),
+    ]
+
+    for columna, valores, mascara in asignaciones:
+        mascara = mascara.to_numpy()
+        if mascara.any():
+            df_procesado.iloc[posiciones[mascara], df_procesado.columns.get_loc(columna)] = valores[mascara].to_numpy()
+
+    return df_procesado
+
+def procesar_dataframe_con_qr_por_fila(df):
+    """
+    Implementación de referencia fila por fila de `procesar_dataframe_con_qr`.
+    Se conserva para validar que la versión columnar produce el mismo resultado.
+    """
+    # MEJORA: Validación de DataFrame vacío
+    if df is None or df.empty:
+        return df
+        
+    # Verificar si existe la columna QR
+    if 'QR' not in df.columns:
+        return df
+    
+    # Crear copia del DataFrame para no modificar el original
+    df_procesado = df.copy()
+    
+    # Asegurar que existan las columnas necesarias
+    columnas_necesarias = ['No. SEP', 'NUMERO DE INVVENTARIO', 'DESCRIPCION', 'VALOR']
+    for col in columnas_necesarias:
+        if col not in df_procesado.columns:
+            df_procesado[col] = ""
+            if col == 'VALOR':
+                df_procesado[col] = 0.0
+    
+    # Procesar cada fila con código QR
+    for idx, row in df_procesado.iterrows():
+        qr_value = str(row['QR']) if pd.notna(row['QR']) else ""
+        
+        # MEJORA: Validación más robusta de valores QR
+        if qr_value and qr_value.strip() not in ["", "nan", "None"]:
+            # Verificar si las columnas destino ya tienen datos
+            no_sep_existente = str(row['No. SEP']) if pd.notna(row['No. SEP']) else ""
+            inventario_existente = str(row['NUMERO DE INVVENTARIO']) if pd.notna(row['NUMERO DE INVVENTARIO']) else ""
+            
+            # Solo procesar QR si las columnas destino están vacías
+            if not no_sep_existente.strip() and not inventario_existente.strip():
+                no_sep, numero_inv, descripcion, valor = procesar_codigo_qr(qr_value)
+                
+                # Actualizar las columnas correspondientes
+                if no_sep:
+                    df_procesado.at[idx, 'No. SEP'] = no_sep
+                if numero_inv:
+                    df_procesado.at[idx, 'NUMERO DE INVVENTARIO'] = numero_inv
+                if descripcion and (not row['DESCRIPCION'] or pd.isna(row['DESCRIPCION']) or str(row['DESCRIPCION']).strip() == ""):
+                    df_procesado.at[idx, 'DESCRIPCION'] = descripcion
+                if valor > 0 and (not row['VALOR'] or row['VALOR'] == 0):
+                    df_procesado.at[idx, 'VALOR'] = valor
+    
+    return df_procesado
+
+class IndiceEmpleados(dict):
+    """
+    Índice {NOMBRE: posiciones de sus filas}. En un inventario normalizado
+    (ver `normalizar_inventario`) guarda además en `empleados` la tabla con los
+    datos del responsable, una fila por empleado.
+    """
+    def __init__(self, posiciones=(), empleados=None):
+        super().__init__(posiciones)
+        self.empleados = empleados
+
+    def subconjunto(self, nombres):
+        """Índice restringido a `nombres`, en el orden del índice y con la misma tabla de empleados"""
+        nombres = set(nombres)
+        return IndiceEmpleados(
+            {empleado: posiciones for empleado, posiciones in self.items() if empleado in nombres},
+            self.empleados
+        )
+
+def construir_indice_empleados(df):
+    """
+    Construye el índice {NOMBRE: posiciones de sus filas} en una sola pasada.
+    Los empleados quedan en el orden en que aparecen por primera vez en el archivo.
+    """
+    if df is None or df.empty or 'NOMBRE' not in df.columns:
+        return IndiceEmpleados()
+    indices = df.groupby('NOMBRE', sort=False, observed=True).indices
+    return IndiceEmpleados(sorted(indices.items(), key=lambda item: item[1][0]))
+
+def obtener_bloque_empleado(df, indice, empleado):
+    """
+    Devuelve las filas del empleado usando el índice precalculado (None si no existe).
+    `df` puede ser también un AlmacenInventario, con el índice de su `indice()`.
+    """
+    posiciones = indice.get(empleado)
+    if posiciones is None or len(posiciones) == 0:
+        return None
+    if isinstance(df, AlmacenInventario):
+        return df.bloque_empleado(empleado)
+    return df.iloc[posiciones]
+
+def obtener_datos_empleado(df, indice, empleado):
+    """
+    Datos del responsable (NOMBRE, CURP, RFC, ...) como Series: de la tabla de
+    empleados si el inventario está normalizado o, si no, de su primera fila.
+    """
+    empleados = getattr(indice, 'empleados', None)
+    if empleados is not None:
+        return empleados.loc[empleado]
+    return df.iloc[indice[empleado][0]]
+
+def normalizar_texto_busqueda(texto):
+    """Texto en mayúsculas, sin acentos y con espacios simples para comparar búsquedas"""
+    texto = unicodedata.normalize('NFKD', str(texto))
+    texto = ''.join(caracter for caracter in texto if not unicodedata.combining(caracter))
+    return ' '.join(texto.upper().split())
+
+class IndiceBusquedaEmpleados:
+    """
+    Índice de búsqueda de empleados por nombre, CURP o RFC, normalizados con
+    `normalizar_texto_busqueda`. Las coincidencias por prefijo (del nombre, de
+    cualquiera de sus palabras, de la CURP o del RFC) se resuelven con búsqueda
+    binaria sobre las claves ordenadas y las de subcadena con `str.find` sobre un
+    único texto con una línea por empleado. Se construye una vez por inventario.
+    """
+    def __init__(self, empleados, curps=None, rfcs=None):
+        self.empleados = list(empleados)
+        curps = list(curps) if curps is not None else [''] * len(self.empleados)
+        rfcs = list(rfcs) if rfcs is not None else [''] * len(self.empleados)
+
+        claves = []
+        lineas = []
+        for posicion, (nombre, curp, rfc) in enumerate(zip(self.empleados, curps, rfcs)):
+            nombre = normalizar_texto_busqueda(nombre)
+            identificadores = [
+                texto for texto in (normalizar_texto_busqueda(curp), normalizar_texto_busqueda(rfc))
+                if texto and texto != 'NAN'
+            ]
+            palabras = nombre.split()
+            claves.append((nombre, posicion))
+            claves.extend((palabra, posicion) for palabra in palabras[1:])
+            claves.extend((texto, posicion) for texto in identificadores)
+            lineas.append(' '.join([nombre] + identificadores))
+        claves.sort()
+        self._claves = [clave for clave, _ in claves]
+        self._posiciones = [posicion for _, posicion in claves]
+
+        # Texto con una línea por empleado e inicio de cada línea para ubicar las subcadenas
+        self._texto = '\n'.join(lineas)
+        self._inicios = []
+        inicio = 0
+        for linea in lineas:
+            self._inicios.append(inicio)
+            inicio += len(linea) + 1
+
+    def __len__(self):
+        return len(self.empleados)
+
+    def buscar(self, consulta, limite=50):
+        """
+        Hasta `limite` empleados que coinciden con `consulta`: primero los de
+        coincidencia por prefijo y después los de subcadena. Sin consulta
+        retorna los primeros empleados en orden alfabético.
+        """
+        consulta = normalizar_texto_busqueda(consulta)
+        if not consulta:
+            return self.empleados[:limite]
+
+        encontrados = {}
+        inicio = bisect.bisect_left(self._claves, consulta)
+        for posicion_clave in range(inicio, len(self._claves)):
+            if len(encontrados) >= limite or not self._claves[posicion_clave].startswith(consulta):
+                break
+            encontrados.setdefault(self._posiciones[posicion_clave], None)
+
+        desde = 0
+        while len(encontrados) < limite:
+            encontrado = self._texto.find(consulta, desde)
+            if encontrado == -1:
+                break
+            linea = bisect.bisect_right(self._inicios, encontrado) - 1
+            encontrados.setdefault(linea, None)
+            # Continuar en la línea siguiente: cada empleado cuenta una sola vez
+            desde = self._inicios[linea + 1] if linea + 1 < len(self._inicios) else len(self._texto)
+
+        return [self.empleados[posicion] for posicion in encontrados]
+
+def construir_indice_busqueda(df, indice=None):
+    """Índice de búsqueda (ver `IndiceBusquedaEmpleados`) con los empleados en orden alfabético"""
+    if indice is None:
+        indice = construir_indice_empleados(df)
+    with etapa_rendimiento('indice_busqueda', empleados=len(indice)):
+        empleados = sorted(indice)
+        tabla = getattr(indice, 'empleados', None)
+        if tabla is None:
+            tabla = df.iloc[[indice[empleado][0] for empleado in empleados]]
+        else:
+            tabla = tabla.loc[empleados]
+        columnas = {
+            col: tabla[col].tolist() if col in tabla.columns else None
+            for col in ('CURP', 'RFC')
+        }
+        return IndiceBusquedaEmpleados(empleados, columnas['CURP'], columnas['RFC'])
+
+def memoria_inventario(df, indice=None):
+    """Bytes ocupados por el inventario (incluidas las cadenas) y su tabla de empleados"""
+    if df is None:
+        return 0
+    total = int(df.memory_usage(deep=True).sum())
+    empleados = getattr(indice, 'empleados', None)
+    if empleados is not None:
+        total += int(empleados.memory_usage(deep=True).sum())
+    return total
+
+def normalizar_inventario(df, indice=None):
+    """
+    Representación compacta del inventario procesado para guardarlo en memoria.
+    Los datos del responsable se guardan una sola vez por empleado en la tabla
+    `indice.empleados`; la tabla de artículos conserva NOMBRE, las columnas del
+    vale y ORIGEN, con códigos categóricos para los textos repetidos, VALOR en float64 y
+    sin la columna QR (ya se interpretó). Retorna (articulos, indice); el índice
+    debe acompañar siempre a la tabla de artículos.
+    """
+    if indice is None:
+        indice = construir_indice_empleados(df)
+
+    with etapa_rendimiento('normalizacion', filas=len(df)) as medicion:
+        memoria_antes = memoria_inventario(df)
+
+        columnas_empleado = ['NOMBRE'] + [col for col in COLUMNAS_DATOS_EMPLEADO if col in df.columns]
+        primeras = [posiciones[0] for posiciones in indice.values()]
+        empleados = df.iloc[primeras][columnas_empleado]
+        empleados.index = pd.Index(list(indice))
+
+        columnas_articulo = ['NOMBRE'] + [
+            col for col in COLUMNAS_ARTICULO_VALE + [COLUMNA_ORIGEN] if col in df.columns
+        ]
+        articulos = df[columnas_articulo].copy()
+        articulos['NOMBRE'] = pd.Categorical(articulos['NOMBRE'], categories=list(indice))
+        for col in COLUMNAS_CATEGORICAS:
+            if col in articulos.columns:
+                articulos[col] = articulos[col].astype('category')
+        if 'VALOR' in articulos.columns:
+            articulos['VALOR'] = pd.to_numeric(articulos['VALOR'], errors='coerce').fillna(0).astype('float64')
+
+        indice = IndiceEmpleados(indice, empleados)
+        medicion.update(
+            empleados=len(indice),
+            memoria_antes_mb=round(memoria_antes / 1_048_576, 2),
+            memoria_despues_mb=round(memoria_inventario(articulos, indice) / 1_048_576, 2)
+        )
+    return articulos, indice
+
+class AlmacenInventario:
+    """
+    Almacén local del inventario procesado en un archivo SQLite, para servir los
+    vales sin volver a cargar el Excel (p. ej. después de reiniciar el servidor).
+    Guarda una tabla `empleados` (datos del responsable, en el orden del inventario)
+    y una tabla `articulos` con índices por NOMBRE, No. SEP y NUMERO DE INVVENTARIO,
+    además de un índice por CURP en `empleados`. Se usa en lugar del DataFrame con
+    el índice de `indice()`: `obtener_bloque_empleado` consulta las filas de cada
+    empleado sin tener el inventario completo en memoria.
+    Cada hilo usa su propia conexión.
+    """
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._local = threading.local()
+        self._metadatos = None
+
+    def _conexion(self):
+        conexion = getattr(self._local, 'conexion', None)
+        if conexion is None:
+            conexion = sqlite3.connect(self.ruta)
+            conexion.execute("PRAGMA journal_mode=WAL")
+            self._local.conexion = conexion
+        return conexion
+
+    @property
+    def empty(self):
+        metadatos = self.metadatos()
+        return not metadatos or metadatos['articulos'] == 0
+
+    def __len__(self):
+        metadatos = self.metadatos()
+        return metadatos['articulos'] if metadatos else 0
+
+    @staticmethod
+    def _columnas_sql(columnas):
+        return ", ".join(f'"{col}"' for col in columnas)
+
+    def metadatos(self):
+        """
+        Datos de la última carga (huella, fecha, filas, columnas) o None si el almacén
+        está vacío. Se leen una vez por instancia y se actualizan en `cargar`.
+        """
+        if self._metadatos is None and os.path.exists(self.ruta):
+            try:
+                filas = self._conexion().execute("SELECT clave, valor FROM metadatos").fetchall()
+            except sqlite3.OperationalError:
+                return None
+            self._metadatos = {clave: json.loads(valor) for clave, valor in filas} or None
+        return self._metadatos
+
+    def huella(self):
+        """
+        Huella del inventario guardado (None si el almacén está vacío). Se lee del
+        archivo en cada llamada porque otra sesión o proceso puede haber reemplazado
+        el inventario; en ese caso se descartan los metadatos leídos antes.
+        """
+        if not os.path.exists(self.ruta):
+            return None
+        try:
+            fila = self._conexion().execute("SELECT valor FROM metadatos WHERE clave = 'huella'").fetchone()
+        except sqlite3.OperationalError:
+            fila = None
+        huella = json.loads(fila[0]) if fila else None
+        if self._metadatos is not None and (fila is None or self._metadatos.get('huella') != huella):
+            self._metadatos = None
+        return huella
+
+    def cargar(self, df, indice=None, huella=None, filas_por_lote=None):
+        """
+        Reemplaza el contenido del almacén con el inventario `df` (completo o
+        normalizado con su índice) en una sola transacción: inserciones por lotes
+        con `executemany` y después los índices. Los lectores siguen viendo la
+        versión anterior hasta que termina la carga.
+        """
+        if filas_por_lote is None:
+            filas_por_lote = FILAS_POR_LOTE_ALMACEN
+        if indice is None:
+            indice = construir_indice_empleados(df)
+
+        with etapa_rendimiento('almacen_carga', filas=len(df), empleados=len(indice)):
+            tabla = getattr(indice, 'empleados', None)
+            if tabla is None:
+                tabla = df.iloc[[posiciones[0] for posiciones in indice.values()]]
+            columnas_empleado = ['NOMBRE'] + [col for col in COLUMNAS_DATOS_EMPLEADO if col in tabla.columns]
+            columnas_articulo = ['NOMBRE'] + [
+                col for col in COLUMNAS_ARTICULO_VALE + [COLUMNA_ORIGEN] if col in df.columns
+            ]
+            empleados = pd.DataFrame({'NOMBRE': list(indice)})
+            for col in columnas_empleado[1:]:
+                empleados[col] = tabla[col].to_numpy()
+
+            # Artículos agrupados por empleado (en el orden del índice y, dentro de
+            # cada uno, en el del archivo) para que cada bloque quede contiguo
+            posiciones = np.concatenate([np.asarray(pos) for pos in indice.values()]) if len(indice) else []
+            articulos = df.iloc[posiciones][columnas_articulo]
+
+            conexion = self._conexion()
+            with conexion:
+                # sqlite3 no abre la transacción antes de DROP/CREATE: sin este BEGIN
+                # una carga fallida dejaría el almacén vacío
+                conexion.execute("BEGIN IMMEDIATE")
+                conexion.execute("DROP TABLE IF EXISTS articulos")
+                conexion.execute("DROP TABLE IF EXISTS empleados")
+                conexion.execute("DROP TABLE IF EXISTS metadatos")
+                # Columnas sin tipo declarado: SQLite conserva el tipo de cada valor (texto o número)
+                definiciones = ['posicion INTEGER PRIMARY KEY', '"NOMBRE" NOT NULL UNIQUE']
+                definiciones += [f'"{col}"' for col in columnas_empleado[1:]]
+                conexion.execute(f"CREATE TABLE empleados ({', '.join(definiciones)})")
+                conexion.execute(
+                    'CREATE TABLE articulos (id INTEGER PRIMARY KEY, '
+                    + ", ".join(f'"{col}" REAL' if col == 'VALOR' else f'"{col}"' for col in columnas_articulo)
+                    + ")"
+                )
+                conexion.execute("CREATE TABLE metadatos (clave TEXT PRIMARY KEY, valor TEXT)")
+
+                self._insertar(conexion, 'empleados', empleados, columnas_empleado, filas_por_lote)
+                self._insertar(conexion, 'articulos', articulos, columnas_articulo, filas_por_lote)
+
+                conexion.execute('CREATE INDEX articulos_nombre ON articulos ("NOMBRE")')
+                for nombre_indice, col in (('articulos_no_sep', 'No. SEP'), ('articulos_inventario', 'NUMERO DE INVVENTARIO')):
+                    if col in columnas_articulo:
+                        conexion.execute(f'CREATE INDEX {nombre_indice} ON articulos ("{col}")')
+                if 'CURP' in columnas_empleado:
+                    conexion.execute('CREATE INDEX empleados_curp ON empleados ("CURP")')
+
+                metadatos = {
+                    'huella': huella,
+                    'fecha_carga': datetime.now().isoformat(timespec='seconds'),
+                    'empleados': len(empleados),
+                    'articulos': len(articulos),
+                    'columnas_empleado': columnas_empleado,
+                    'columnas_articulo': columnas_articulo,
+                }
+                conexion.executemany(
+                    "INSERT INTO metadatos (clave, valor) VALUES (?, ?)",
+                    [(clave, json.dumps(valor)) for clave, valor in metadatos.items()]
+                )
+            self._metadatos = metadatos
+        return metadatos
+
+    def _insertar(self, conexion, tabla, df, columnas, filas_por_lote):
+        """Inserta `df` por lotes de `filas_por_lote` filas; los nulos se guardan como NULL"""
+        sql = (
+            f"INSERT INTO {tabla} ({self._columnas_sql(columnas)}) "
+            f"VALUES ({', '.join('?' * len(columnas))})"
+        )
+        for inicio in range(0, len(df), filas_por_lote):
+            lote = df.iloc[inicio:inicio + filas_por_lote]
+            valores = [
+                lote[col].astype(object).where(lote[col].notna(), None).tolist()
+                for col in columnas
+            ]
+            conexion.executemany(sql, zip(*valores))
+
+    def _consultar(self, sql, parametros=(), columnas=None):
+        """Resultado de una consulta como DataFrame (NULL como NaN, igual que al leer el Excel)"""
+        cursor = self._conexion().execute(sql, parametros)
+        if columnas is None:
+            columnas = [descripcion[0] for descripcion in cursor.description]
+        return pd.DataFrame.from_records(cursor.fetchall(), columns=columnas).fillna(np.nan)
+
+    def indice(self):
+        """
+        Índice de empleados del inventario guardado, con su tabla de datos: las
+        posiciones de cada empleado son los id de sus artículos en el almacén
+        """
+        metadatos = self.metadatos()
+        if metadatos is None:
+            return IndiceEmpleados()
+        columnas = metadatos['columnas_empleado']
+        empleados = self._consultar(
+            f"SELECT {self._columnas_sql(columnas)} FROM empleados ORDER BY posicion", columnas=columnas
+        )
+        empleados.index = pd.Index(empleados['NOMBRE'].tolist())
+        rangos = self._conexion().execute(
+            'SELECT "NOMBRE", MIN(id), MAX(id) FROM articulos GROUP BY "NOMBRE"'
+        ).fetchall()
+        rangos = {nombre: range(primero, ultimo + 1) for nombre, primero, ultimo in rangos}
+        return IndiceEmpleados(
+            {nombre: rangos.get(nombre, range(0)) for nombre in empleados.index},
+            empleados
+        )
+
+    def bloque_empleado(self, empleado):
+        """Artículos de un empleado (consulta por el índice de NOMBRE), en el orden del archivo"""
+        columnas = self.metadatos()['columnas_articulo']
+        bloque = self._consultar(
+            f'SELECT {self._columnas_sql(columnas)} FROM articulos WHERE "NOMBRE" = ? ORDER BY id',
+            (empleado,),
+            columnas
+        )
+        return bloque if not bloque.empty else None
+
+    def articulos_por_id(self, ids, columnas):
+        """Las `columnas` guardadas (de las pedidas) de los artículos `ids`, en el orden de `ids`"""
+        columnas = [col for col in self.metadatos()['columnas_articulo'] if col in columnas]
+        ids = [int(id_articulo) for id_articulo in ids]
+        partes = [
+            self._consultar(
+                f"SELECT id, {self._columnas_sql(columnas)} FROM articulos "
+                f"WHERE id IN ({', '.join('?' * len(lote))})",
+                lote,
+                ['id'] + columnas
+            )
+            for lote in (ids[inicio:inicio + IDS_POR_CONSULTA_ALMACEN] for inicio in range(0, len(ids), IDS_POR_CONSULTA_ALMACEN))
+        ]
+        if not partes:
+            return pd.DataFrame(columns=columnas)
+        return pd.concat(partes).set_index('id').loc[ids].reset_index(drop=True)
+
+    def estadisticas(self):
+        """Totales del inventario guardado calculados en SQLite"""
+        empleados, articulos, total, promedio = self._conexion().execute(
+            'SELECT COUNT(DISTINCT "NOMBRE"), COUNT(*), COALESCE(SUM("VALOR"), 0), COALESCE(AVG("VALOR"), 0) '
+            'FROM articulos'
+        ).fetchone()
+        return {
+            'empleados': empleados,
+            'articulos': articulos,
+            'valor_total': total,
+            'valor_promedio': promedio,
+        }
+
+    def columnas_articulos(self, columnas):
+        """
+        Las `columnas` guardadas (de las pedidas, incluido `id`) de todos los
+        artículos, en el orden del almacén
+        """
+        columnas = [col for col in ['id'] + self.metadatos()['columnas_articulo'] if col in columnas]
+        return self._consultar(
+            f"SELECT {self._columnas_sql(columnas)} FROM articulos ORDER BY id", columnas=columnas
+        )
+
+    def a_dataframe(self):
+        """Inventario guardado como (articulos, indice), igual que `normalizar_inventario`"""
+        articulos = self.columnas_articulos(self.metadatos()['columnas_articulo'])
+        return normalizar_inventario(_con_datos_empleado(articulos, self.indice()))
+
+def estadisticas_inventario(df, cubo=None):
+    """
+    Totales del inventario (DataFrame o AlmacenInventario): empleados, artículos,
+    valor total y promedio. Con `cubo` (ver `construir_cubo_inventario`) no se recorren las filas.
+    """
+    if cubo is not None:
+        total = resumir_cubo(cubo).iloc[0]
+        return {
+            'empleados': int(total['EMPLEADOS']),
+            'articulos': int(total['ARTICULOS']),
+            'valor_total': float(total['VALOR_TOTAL']),
+            'valor_promedio': float(total['VALOR_PROMEDIO']),
+        }
+    if isinstance(df, AlmacenInventario):
+        return df.estadisticas()
+    return {
+        'empleados': df['NOMBRE'].nunique(),
+        'articulos': len(df),
+        'valor_total': float(df['VALOR'].sum()),
+        'valor_promedio': float(df['VALOR'].mean()) if len(df) > 0 else 0.0,
+    }
+
+def _celdas_vacias(serie):
+    """Filas cuya celda se imprime vacía en el vale (mismo criterio que `_texto_celda`)"""
+    codigos, unicos = pd.factorize(serie)
+    vacios = np.array([_texto_celda(valor) == '' for valor in unicos] + [True])
+    return vacios[codigos]
+
+def construir_cubo_inventario(df, indice=None):
+    """
+    Agregados del inventario (DataFrame o AlmacenInventario) por AREA O
+    DEPARTAMENTO, EDIFICIO, CT y PISO: una fila por combinación con ARTICULOS,
+    EMPLEADOS, VALOR_TOTAL y EN_PROCESO_ALTA (artículos sin No. SEP, sin número de
+    inventario y con valor 0). Cada empleado cae en una sola combinación, así que
+    todas las columnas se pueden sumar para obtener cualquier nivel (ver `resumir_cubo`).
+    """
+    columnas = ['NOMBRE', 'No. SEP', 'NUMERO DE INVVENTARIO', 'VALOR']
+    if isinstance(df, AlmacenInventario):
+        indice = df.indice() if indice is None else indice
+        df = df.columnas_articulos(columnas)
+    elif indice is None:
+        indice = construir_indice_empleados(df)
+
+    with etapa_rendimiento('cubo_inventario', filas=len(df)) as medicion:
+        valores = pd.to_numeric(df['VALOR'], errors='coerce') if 'VALOR' in df.columns else pd.Series(0.0, index=df.index)
+        en_alta = valores.eq(0).to_numpy()
+        for col in ('No. SEP', 'NUMERO DE INVVENTARIO'):
+            if col in df.columns:
+                en_alta &= _celdas_vacias(df[col])
+
+        # Primero por empleado y después por combinación de dimensiones
+        nombres = df['NOMBRE'].astype(object).to_numpy()
+        por_empleado = pd.DataFrame({
+            'ARTICULOS': 1,
+            'VALOR_TOTAL': valores.fillna(0).to_numpy(),
+            'EN_PROCESO_ALTA': en_alta.astype('int64'),
+        }).groupby(nombres, sort=False).sum()
+
+        empleados = getattr(indice, 'empleados', None)
+        if empleados is None:
+            empleados = df.drop_duplicates('NOMBRE').set_index('NOMBRE')
+        dimensiones = pd.DataFrame(index=por_empleado.index)
+        for col in DIMENSIONES_RESUMEN:
+            valores_dimension = empleados[col].reindex(por_empleado.index) if col in empleados.columns else np.nan
+            dimensiones[col] = pd.Series(valores_dimension, index=por_empleado.index, dtype=object).map(
+                lambda valor: _texto_celda(_texto_identificador(valor)).strip() or SIN_DATO_RESUMEN
+            )
+
+        por_empleado['EMPLEADOS'] = 1
+        cubo = pd.concat([dimensiones, por_empleado], axis=1).groupby(DIMENSIONES_RESUMEN, sort=True).sum()
+        cubo = cubo.reset_index()[DIMENSIONES_RESUMEN + COLUMNAS_RESUMEN]
+        medicion.update(combinaciones=len(cubo))
+    return cubo
+
+def resumir_cubo(cubo, dimensiones=(), filtros=None):
+    """
+    Totales del cubo por `dimensiones` (ninguna = total general) para las
+    combinaciones que cumplen `filtros` ({dimensión: valor}), con VALOR_PROMEDIO
+    por artículo.
+    """
+    for col, valor in (filtros or {}).items():
+        cubo = cubo[cubo[col] == valor]
+    dimensiones = list(dimensiones)
+    if dimensiones:
+        resumen = cubo.groupby(dimensiones, sort=True)[COLUMNAS_RESUMEN].sum().reset_index()
+    else:
+        resumen = pd.DataFrame([cubo[COLUMNAS_RESUMEN].sum()], columns=COLUMNAS_RESUMEN)
+    resumen['VALOR_PROMEDIO'] = (resumen['VALOR_TOTAL'] / resumen['ARTICULOS'].where(resumen['ARTICULOS'] > 0)).fillna(0.0)
+    return resumen
+
+def exportar_resumen_excel(cubo, destino=None):
+    """
+    Libro Excel con el total general, una hoja por dimensión (AREA O DEPARTAMENTO,
+    EDIFICIO, CT, PISO) y el detalle por combinación. Retorna los bytes del libro o
+    escribe en `destino`.
+    """
+    salida = destino or io.BytesIO()
+    with pd.ExcelWriter(salida, engine='openpyxl') as libro:
+        resumir_cubo(cubo).to_excel(libro, sheet_name='Total', index=False)
+        for col in DIMENSIONES_RESUMEN:
+            # Los nombres de hoja de Excel admiten 31 caracteres
+            resumir_cubo(cubo, [col]).to_excel(libro, sheet_name=col[:31], index=False)
+        resumir_cubo(cubo, DIMENSIONES_RESUMEN).to_excel(libro, sheet_name='Detalle', index=False)
+    return None if destino else salida.getvalue()
+
+def _claves_activo(serie):
+    """
+    Clave normalizada de un número de activo (texto sin espacios extremos y en
+    mayúsculas). Cada valor distinto se normaliza una sola vez.
+    Retorna (código de clave por fila, claves); el código -1 indica que no hay número.
+    """
+    codigos, unicos = pd.factorize(serie)
+    claves = pd.Series([_texto_identificador(valor) for valor in unicos], dtype=object)
+    claves = claves.fillna("").str.strip().str.upper()
+    # Valores distintos que coinciden al normalizar comparten un solo código
+    codigos_claves, claves = pd.factorize(claves)
+    codigos_claves[claves[codigos_claves] == ""] = -1
+    return np.append(codigos_claves, -1)[codigos], claves
+
+class IndiceActivos:
+    """
+    Índices hash {número de activo normalizado: filas} sobre NUMERO DE INVVENTARIO y
+    No. SEP (incluidos los valores obtenidos de los códigos QR), construidos en una
+    pasada. Permiten saber quién tiene un bien (`buscar`) y detectar los números
+    asignados a más de un empleado (`duplicados`).
+    Con `almacen`, `filas` solo trae NOMBRE, las columnas de activo y el `id` de
+    cada artículo: los índices guardan esos id y las filas de los resultados se
+    consultan en el almacén, sin copiar el inventario a memoria.
+    """
+    def __init__(self, filas, almacen=None):
+        self._almacen = almacen
+        if almacen is None:
+            self.filas = filas
+            columnas = filas.columns
+            ids = np.arange(len(filas))
+        else:
+            self.filas = None
+            columnas = almacen.metadatos()['columnas_articulo']
+            ids = filas['id'].to_numpy()
+        self._columnas = [col for col in ('NOMBRE', 'DESCRIPCION', COLUMNA_ORIGEN) if col in columnas]
+        self.claves = {}
+        self._ordenadas = {}
+        duplicados = []
+        nombres, _ = pd.factorize(filas['NOMBRE'])
+
+        for campo in COLUMNAS_ACTIVO:
+            if campo not in filas.columns:
+                continue
+            codigos, unicos = _claves_activo(filas[campo])
+            con_clave = codigos >= 0
+            posiciones = pd.Series(codigos).groupby(codigos).indices
+            posiciones.pop(-1, None)
+            self.claves[campo] = {unicos[codigo]: ids[filas_codigo] for codigo, filas_codigo in posiciones.items()}
+            self._ordenadas[campo] = sorted(self.claves[campo])
+
+            # Números con más de un empleado distinto: todas sus asignaciones son conflictos
+            pares = pd.DataFrame({'codigo': codigos[con_clave], 'nombre': nombres[con_clave]}).drop_duplicates()
+            empleados_por_codigo = pares.groupby('codigo').size()
+            en_conflicto = empleados_por_codigo.index[empleados_por_codigo.to_numpy() > 1]
+            if len(en_conflicto):
+                filas_conflicto = np.flatnonzero(np.isin(codigos, en_conflicto))
+                reporte = self._resultado(campo, ids[filas_conflicto])
+                reporte.insert(2, 'EMPLEADOS', empleados_por_codigo.reindex(codigos[filas_conflicto]).to_numpy())
+                reporte['CLAVE'] = unicos[codigos[filas_conflicto]]
+                duplicados.append(reporte)
+
+        columnas_reporte = ['CAMPO', 'NUMERO', 'EMPLEADOS'] + self._columnas_resultado()
+        if duplicados:
+            reporte = pd.concat(duplicados, ignore_index=True)
+            reporte = reporte.sort_values(['CAMPO', 'CLAVE', 'NOMBRE'], kind='stable').drop(columns='CLAVE')
+            self.duplicados = reporte.reset_index(drop=True)[columnas_reporte]
+        else:
+            self.duplicados = pd.DataFrame(columns=columnas_reporte)
+
+    def _columnas_resultado(self):
+        return self._columnas
+
+    def _resultado(self, campo, ids):
+        """Filas `ids` como tabla CAMPO, NUMERO, NOMBRE, DESCRIPCION[, ORIGEN]"""
+        if self._almacen is None:
+            seleccion = self.filas.iloc[ids]
+        else:
+            seleccion = self._almacen.articulos_por_id(ids, [campo] + self._columnas)
+        resultado = pd.DataFrame({'CAMPO': campo, 'NUMERO': seleccion[campo].to_numpy()})
+        for col in self._columnas_resultado():
+            resultado[col] = seleccion[col].astype(object).to_numpy()
+        return resultado
+
+    def buscar(self, numero, limite=50):
+        """
+        Asignaciones de un número de inventario o No. SEP: primero las coincidencias
+        exactas y después las que empiezan por `numero`, hasta `limite` filas.
+        """
+        consulta = str(numero).strip().upper()
+        if not consulta:
+            return pd.DataFrame(columns=['CAMPO', 'NUMERO'] + self._columnas_resultado())
+
+        encontradas = []
+        total = 0
+        for exacta in (True, False):
+            for campo, claves in self.claves.items():
+                if exacta:
+                    coincidencias = [consulta] if consulta in claves else []
+                else:
+                    ordenadas = self._ordenadas[campo]
+                    inicio = bisect.bisect_right(ordenadas, consulta)
+                    coincidencias = itertools.takewhile(
+                        lambda clave: clave.startswith(consulta), itertools.islice(ordenadas, inicio, None)
+                    )
+                for clave in coincidencias:
+                    if total >= limite:
+                        break
+                    posiciones = claves[clave][:limite - total]
+                    encontradas.append((campo, posiciones))
+                    total += len(posiciones)
+
+        if not encontradas:
+            return pd.DataFrame(columns=['CAMPO', 'NUMERO'] + self._columnas_resultado())
+        return pd.concat([
+            self._resultado(campo, np.concatenate([posiciones for _, posiciones in grupo]))
+            for campo, grupo in itertools.groupby(encontradas, key=lambda encontrada: encontrada[0])
+        ], ignore_index=True)
+
+def construir_indice_activos(df):
+    """Índice de activos (ver `IndiceActivos`) de un inventario (DataFrame o AlmacenInventario)"""
+    columnas = ['NOMBRE', 'DESCRIPCION', COLUMNA_ORIGEN] + COLUMNAS_ACTIVO
+    with etapa_rendimiento('indice_activos') as medicion:
+        if isinstance(df, AlmacenInventario):
+            filas = df.columnas_articulos(['id', 'NOMBRE'] + COLUMNAS_ACTIVO)
+            indice = IndiceActivos(filas, almacen=df)
+        else:
+            filas = df[[col for col in columnas if col in df.columns]].reset_index(drop=True)
+            indice = IndiceActivos(filas)
+        medicion.update(filas=len(filas), duplicados=len(indice.duplicados))
+    return indice
+
+def validar_datos_vale(datos_empleado, inventario_empleado):
+    """Verifica que haya datos suficientes para dibujar un vale"""
+    # MEJORA: Validación de datos de entrada
+    if inventario_empleado is None or inventario_empleado.empty:
+        raise Exception("No hay datos de inventario para generar el vale")
+
+    if datos_empleado is None or datos_empleado.empty:
+        raise Exception("No hay datos del empleado")
+
+# typed: 1, 1.0 y True son la misma clave para lru_cache pero se imprimen distinto
+@lru_cache(maxsize=65536, typed=True)
+def _texto_celda(valor):
+    """Texto de una celda de la tabla: vacío para NaN/'nan'"""
+    texto = str(valor)
+    return '' if texto.lower() == 'nan' else texto
+
+def _valores_columna(inventario_empleado, columna, defecto):
+    """Valores de `columna` como lista de escalares de Python (una sola conversión por columna)"""
+    if columna in inventario_empleado.columns:
+        return inventario_empleado[columna].tolist()
+    return [defecto] * len(inventario_empleado)
+
+def generar_vale_pdf(empleado, datos_empleado, inventario_empleado, fecha=None, fecha_creacion=None):
+    """
+    Genera el contenido PDF y lo retorna como bytes.
+    `fecha` fija la FECHA LEVANTAMIENTO y `fecha_creacion` los metadatos del PDF
+    (por defecto, la misma `fecha`); con las mismas fechas y los mismos datos
+    el resultado es idéntico byte a byte.
+    """
+    try:
+        if fecha is None:
+            fecha = datetime.now()
+        if fecha_creacion is None:
+            fecha_creacion = fecha
+
+        validar_datos_vale(datos_empleado, inventario_empleado)
+        # fpdf2 se carga con el primer vale
+        from vales_pdf import PDF, dibujar_vale
+
+        # Crear PDF con formato oficial
+        pdf = PDF()
+        pdf.set_creation_date(fecha_creacion if fecha_creacion.tzinfo else fecha_creacion.astimezone())
+        pdf.iniciar_vale()
+        dibujar_vale(pdf, datos_empleado, inventario_empleado, fecha)
+        
+        # Retornar el PDF como bytes (fpdf2 devuelve bytearray; PyFPDF, str)
+        salida = pdf.output(dest='S')
+        if isinstance(salida, str):
+            return salida.encode('latin1')
+        return bytes(salida)
+        
+    except Exception as e:
+        logger.error(f"Error al generar el PDF para {empleado}: {str(e)}")
+        raise Exception(f"Error al generar el PDF para {empleado}: {str(e)}")
+
+def fecha_vales_del_dia():
+    """Fecha fija (medianoche de hoy) para que los vales del día sean reproducibles y cacheables"""
+    return datetime.combine(date.today(), datetime.min.time())
+
+# Huellas de las imágenes de marca: {(ruta, ancho, dpi): ((mtime, tamaño), huella)}
+_huellas_imagenes = {}
+
+def huella_imagen_marca(ruta, ancho_mm=ANCHO_IMAGENES_VALE_MM, dpi=DPI_IMAGENES_VALE):
+    """
+    Huella de una imagen de marca y de los parámetros con que se optimiza para el
+    vale (None si no existe). Solo se vuelve a leer el archivo si cambia su fecha
+    de modificación o su tamaño.
+    """
+    try:
+        estado = os.stat(ruta)
+    except OSError:
+        return None
+    firma = (estado.st_mtime_ns, estado.st_size)
+    guardada = _huellas_imagenes.get((ruta, ancho_mm, dpi))
+    if guardada is not None and guardada[0] == firma:
+        return guardada[1]
+
+    with open(ruta, 'rb') as archivo:
+        huella = hashlib.sha256(archivo.read())
+    huella.update(f"\x1f{ancho_mm}\x1f{dpi}\x1f{CALIDAD_JPEG_IMAGENES}\x1f{COLORES_PALETA_IMAGENES}".encode('utf-8'))
+    _huellas_imagenes[(ruta, ancho_mm, dpi)] = (firma, huella.hexdigest())
+    return huella.hexdigest()
+
+def clave_vale(empleado, datos_empleado, inventario_empleado, fecha):
+    """
+    Clave de contenido de un vale: hash de los datos del responsable, de sus filas
+    de inventario, de la fecha, de la versión de la plantilla y de las imágenes de
+    marca (un logotipo nuevo invalida los vales guardados).
+    """
+    huella = hashlib.sha256()
+    huella.update(f"{VERSION_PLANTILLA_VALE}\x1f{empleado}\x1f{fecha.isoformat()}".encode('utf-8'))
+    for imagen in (IMAGEN_ENCABEZADO_VALE, IMAGEN_PIE_VALE):
+        huella.update(f"\x1f{huella_imagen_marca(imagen)}".encode('utf-8'))
+    for col in COLUMNAS_ENCABEZADO_VALE:
+        huella.update(f"\x1f{col}={datos_empleado.get(col, None)!r}".encode('utf-8'))
+
+    columnas = [col for col in COLUMNAS_ARTICULO_VALE if col in inventario_empleado.columns]
+    huella.update(f"\x1e{columnas!r}".encode('utf-8'))
+    filas = pd.util.hash_pandas_object(inventario_empleado[columnas], index=False)
+    huella.update(filas.to_numpy().tobytes())
+    return huella.hexdigest()
+
+class CachePDF:
+    """
+    Caché de vales PDF direccionada por contenido (ver `clave_vale`).
+    Guarda los PDF en memoria con desalojo LRU por tamaño total y, opcionalmente,
+    en un directorio en disco con su propio límite de tamaño.
+    """
+    def __init__(self, max_bytes, directorio=None, max_bytes_disco=None):
+        self.max_bytes = max_bytes
+        self.directorio = directorio
+        self.max_bytes_disco = max_bytes_disco if max_bytes_disco is not None else max_bytes * 4
+        self.aciertos = 0
+        self.fallos = 0
+        self._memoria = OrderedDict()
+        self._bytes_memoria = 0
+        self._disco = OrderedDict()
+        self._bytes_disco = 0
+        self._lock = threading.Lock()
+
+        if self.directorio:
+            os.makedirs(self.directorio, exist_ok=True)
+            archivos = []
+            for nombre in os.listdir(self.directorio):
+                if nombre.endswith('.pdf'):
+                    estado = os.stat(os.path.join(self.directorio, nombre))
+                    archivos.append((estado.st_mtime, nombre[:-4], estado.st_size))
+            for _, clave, tamano in sorted(archivos):
+                self._disco[clave] = tamano
+                self._bytes_disco += tamano
+
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, f"{clave}.pdf")
+
+    def obtener(self, clave):
+        """Devuelve los bytes del PDF o None si no está en caché"""
+        with self._lock:
+            pdf_bytes = self._memoria.get(clave)
+            if pdf_bytes is not None:
+                self._memoria.move_to_end(clave)
+                self.aciertos += 1
+                return pdf_bytes
+
+            if self.directorio and clave in self._disco:
+                try:
+                    with open(self._ruta(clave), 'rb') as archivo:
+                        pdf_bytes = archivo.read()
+                except OSError:
+                    self._bytes_disco -= self._disco.pop(clave)
+                else:
+                    self._disco.move_to_end(clave)
+                    self._guardar_memoria(clave, pdf_bytes)
+                    self.aciertos += 1
+                    return pdf_bytes
+
+            self.fallos += 1
+            return None
+
+    def guardar(self, clave, pdf_bytes):
+        """Agrega un PDF a la caché"""
+        with self._lock:
+            self._guardar_memoria(clave, pdf_bytes)
+            if self.directorio and clave not in self._disco:
+                self._guardar_disco(clave, pdf_bytes)
+
+    def limpiar(self):
+        """Vacía la caché en memoria (los archivos en disco se conservan)"""
+        with self._lock:
+            self._memoria.clear()
+            self._bytes_memoria = 0
+
+    def _guardar_memoria(self, clave, pdf_bytes):
+        if len(pdf_bytes) > self.max_bytes:
+            return
+        anterior = self._memoria.pop(clave, None)
+        if anterior is not None:
+            self._bytes_memoria -= len(anterior)
+        self._memoria[clave] = pdf_bytes
+        self._bytes_memoria += len(pdf_bytes)
+        while self._bytes_memoria > self.max_bytes:
+            _, desalojado = self._memoria.popitem(last=False)
+            self._bytes_memoria -= len(desalojado)
+
+    def _guardar_disco(self, clave, pdf_bytes):
+        ruta = self._ruta(clave)
+        try:
+            with open(f"{ruta}.tmp", 'wb') as archivo:
+                archivo.write(pdf_bytes)
+            os.replace(f"{ruta}.tmp", ruta)
+        except OSError as e:
+            logger.warning(f"No se pudo guardar el vale en la caché de disco: {str(e)}")
+            return
+        self._disco[clave] = len(pdf_bytes)
+        self._bytes_disco += len(pdf_bytes)
+        while self._bytes_disco > self.max_bytes_disco and self._disco:
+            desalojada, tamano = self._disco.popitem(last=False)
+            self._bytes_disco -= tamano
+            try:
+                os.remove(self._ruta(desalojada))
+            except OSError:
+                pass
+
+CACHE_VALES = CachePDF(
+    max_bytes=int(os.environ.get('VALES_CACHE_MB', 256)) * 1024 * 1024,
+    directorio=os.environ.get('VALES_CACHE_DIR') or None
+)
+
+def nombre_archivo_vale(empleado):
+    """Nombre del archivo PDF del vale de un empleado"""
+    return f"Vale_Resguardo_{empleado.replace(' ', '_')}.pdf"
+
+def generar_vale_empleado(empleado, datos_empleado, inventario_empleado, fecha):
+    """
+    Genera el vale de un bloque de filas y retorna (filename, bytes).
+    Es una función de módulo para poder enviarse a los procesos del pool.
+    """
+    pdf_bytes = generar_vale_pdf(empleado, datos_empleado, inventario_empleado, fecha=fecha)
+    return nombre_archivo_vale(empleado), pdf_bytes
+
+def generar_vale_medido(empleado, datos_empleado, inventario_empleado, fecha):
+    """Como generar_vale_empleado, pero retorna también los segundos de renderizado"""
+    inicio = time.perf_counter()
+    resultado = generar_vale_empleado(empleado, datos_empleado, inventario_empleado, fecha)
+    return resultado, time.perf_counter() - inicio
+
+def _generar_vale_con_cache(empleado, datos_empleado, inventario_empleado, fecha, cache):
+    """Retorna ((filename, bytes), segundos de renderizado, si vino de la caché)"""
+    clave = clave_vale(empleado, datos_empleado, inventario_empleado, fecha) if cache is not None else None
+    pdf_bytes = cache.obtener(clave) if cache is not None else None
+    if pdf_bytes is not None:
+        return (nombre_archivo_vale(empleado), pdf_bytes), 0.0, True
+
+    resultado, segundos = generar_vale_medido(empleado, datos_empleado, inventario_empleado, fecha)
+    if cache is not None:
+        cache.guardar(clave, resultado[1])
+    return resultado, segundos, False
+
+def generar_vale_con_cache(empleado, datos_empleado, inventario_empleado, fecha, cache=None):
+    """Igual que generar_vale_empleado, pero solo renderiza si el vale no está en `cache`"""
+    resultado, _, _ = _generar_vale_con_cache(empleado, datos_empleado, inventario_empleado, fecha, cache)
+    return resultado
+
+def _bloque_para_proceso(inventario_empleado):
+    """
+    Copia del bloque con las columnas categóricas como texto, para no enviar a
+    cada proceso del pool todas las categorías del inventario.
+    """
+    categoricas = inventario_empleado.select_dtypes('category').columns
+    if len(categoricas) == 0:
+        return inventario_empleado
+    return inventario_empleado.astype({col: object for col in categoricas})
+
+def iterar_bloques_empleados(df, indice):
+    """Recorre (empleado, datos del responsable, filas) en el orden del índice"""
+    for empleado in indice:
+        inventario_empleado = obtener_bloque_empleado(df, indice, empleado)
+
+        # MEJORA: Saltar empleados sin inventario
+        if inventario_empleado is None or inventario_empleado.empty:
+            continue
+        yield empleado, obtener_datos_empleado(df, indice, empleado), inventario_empleado
+
+def _iterar_vales_paralelo(bloques, fecha, procesos, cache=None):
+    """
+    Genera los vales en un ProcessPoolExecutor y los entrega en el orden de `bloques`.
+    Los vales presentes en `cache` no se envían al pool. Mantiene como máximo unas
+    pocas tareas por proceso en vuelo para acotar la memoria.
+    Entrega (empleado, resultado, error) para cada empleado.
+    """
+    en_vuelo = deque()
+    with ProcessPoolExecutor(max_workers=procesos) as executor:
+        try:
+            for empleado, datos_empleado, inventario_empleado in bloques:
+                clave = clave_vale(empleado, datos_empleado, inventario_empleado, fecha) if cache is not None else None
+                pdf_bytes = cache.obtener(clave) if cache is not None else None
+                if pdf_bytes is not None:
+                    tarea = (nombre_archivo_vale(empleado), pdf_bytes)
+                else:
+                    tarea = executor.submit(
+                        generar_vale_medido, empleado, datos_empleado, _bloque_para_proceso(inventario_empleado), fecha
+                    )
+                en_vuelo.append((empleado, len(inventario_empleado), clave, tarea))
+                if len(en_vuelo) >= procesos * TAREAS_POR_PROCESO:
+                    yield _resultado_futuro(*en_vuelo.popleft(), cache)
+            while en_vuelo:
+                yield _resultado_futuro(*en_vuelo.popleft(), cache)
+        finally:
+            # Si se abandona la iteración (p. ej. al cancelar), no esperar vales que nadie leerá
+            for _, _, _, tarea in en_vuelo:
+                if isinstance(tarea, Future):
+                    tarea.cancel()
+
+def _resultado_futuro(empleado, articulos, clave, futuro, cache=None):
+    """Espera el resultado de un futuro y lo convierte en (empleado, resultado, error)"""
+    rendimiento = rendimiento_activo()
+    if not isinstance(futuro, Future):
+        if rendimiento is not None:
+            rendimiento.registrar_vale(empleado, articulos, 0.0, len(futuro[1]), desde_cache=True)
+        return empleado, futuro, None
+    try:
+        resultado, segundos = futuro.result()
+    except Exception as e:
+        return empleado, None, e
+    if cache is not None:
+        cache.guardar(clave, resultado[1])
+    if rendimiento is not None:
+        rendimiento.registrar_vale(empleado, articulos, segundos, len(resultado[1]))
+    return empleado, resultado, None
+
+def _iterar_vales_serie(bloques, fecha, cache=None):
+    """Genera los vales uno tras otro en el proceso actual"""
+    rendimiento = rendimiento_activo()
+    for empleado, datos_empleado, inventario_empleado in bloques:
+        try:
+            resultado, segundos, desde_cache = _generar_vale_con_cache(
+                empleado, datos_empleado, inventario_empleado, fecha, cache
+            )
+        except Exception as e:
+            yield empleado, None, e
+            continue
+        if rendimiento is not None:
+            rendimiento.registrar_vale(empleado, len(inventario_empleado), segundos, len(resultado[1]), desde_cache)
+        yield empleado, resultado, None
+
+def crear_archivo_temporal(sufijo):
+    """Crea un archivo temporal en disco que se elimina al terminar el proceso"""
+    archivo = tempfile.NamedTemporaryFile(prefix="vales_", suffix=sufijo, delete=False)
+    _archivos_temporales.add(archivo.name)
+    return archivo
+
+def eliminar_archivo_temporal(ruta):
+    """Elimina un archivo creado con crear_archivo_temporal"""
+    if not ruta:
+        return
+    _archivos_temporales.discard(ruta)
+    try:
+        os.remove(ruta)
+    except OSError:
+        pass
+
+@atexit.register
+def _limpiar_archivos_temporales():
+    for ruta in list(_archivos_temporales):
+        eliminar_archivo_temporal(ruta)
+
+def iterar_vales(df, indice=None, procesos=None, fecha=None, cache=CACHE_VALES):
+    """
+    Genera los vales de todos los empleados y entrega, en el orden del índice,
+    (empleado, (filename, bytes) o None, error o None).
+    Con `procesos` > 1 los PDF se generan en paralelo con el mismo resultado que en serie.
+    Los vales sin cambios desde una generación anterior se toman de `cache`.
+    """
+    if indice is None:
+        indice = construir_indice_empleados(df)
+    if procesos is None:
+        procesos = PROCESOS_GENERACION
+    if fecha is None:
+        fecha = fecha_vales_del_dia()
+
+    rendimiento = rendimiento_activo()
+    if rendimiento is not None:
+        rendimiento.iniciar_lote()
+
+    bloques = iterar_bloques_empleados(df, indice)
+
+    if procesos > 1 and len(indice) > 1:
+        return _iterar_vales_paralelo(bloques, fecha, procesos, cache)
+    return _iterar_vales_serie(bloques, fecha, cache)
+
+def escribir_zip_vales(resultados, fecha, compresion=None, al_error=None, destino=None):
+    """
+    Escribe en un ZIP en disco los vales que entrega `iterar_vales` y retorna su ruta.
+    Cada PDF se agrega al archivo en cuanto se genera, por lo que la memoria usada
+    no crece con el número de empleados. `compresion` es una constante de zipfile
+    (ZIP_STORED por defecto: los PDF ya están comprimidos). Si no se indica `destino`
+    se usa un archivo temporal. Los errores por empleado se notifican con
+    `al_error(empleado, error)` y no detienen la escritura.
+    """
+    if compresion is None:
+        compresion = COMPRESION_ZIP_DEFAULT
+
+    fecha_zip = fecha.timetuple()[:6]
+    archivo_zip = open(destino, 'wb') if destino else crear_archivo_temporal(".zip")
+
+    try:
+        with etapa_rendimiento('generacion_zip') as medicion:
+            vales = errores = 0
+            segundos_escritura = 0.0
+            with archivo_zip, zipfile.ZipFile(archivo_zip, 'w', compresion) as zipf:
+                for empleado, resultado, error in resultados:
+                    if error is not None:
+                        errores += 1
+                        if al_error is not None:
+                            al_error(empleado, error)
+                        continue
+
+                    filename, pdf_bytes = resultado
+                    inicio = time.perf_counter()
+                    zipf.writestr(zipfile.ZipInfo(filename, date_time=fecha_zip), pdf_bytes, compresion)
+                    segundos_escritura += time.perf_counter() - inicio
+                    vales += 1
+
+            medicion.update(
+                empleados=vales,
+                errores=errores,
+                segundos_escritura_zip=round(segundos_escritura, 4),
+                bytes=os.path.getsize(archivo_zip.name)
+            )
+            rendimiento = rendimiento_activo()
+            if rendimiento is not None:
+                medicion['segundos_renderizado'] = round(
+                    sum(registro['segundos'] for registro in rendimiento.empleados), 4
+                )
+    except Exception:
+        if destino:
+            os.remove(destino)
+        else:
+            eliminar_archivo_temporal(archivo_zip.name)
+        raise
+
+    return archivo_zip.name
+
+def nombre_archivo_particion(particion, parte=1):
+    """Nombre del ZIP de una partición (sin acentos ni caracteres especiales); parte > 1 para las divisiones"""
+    texto = unicodedata.normalize('NFKD', str(particion)).encode('ascii', 'ignore').decode('ascii')
+    base = re.sub(r'[^0-9A-Za-z]+', '_', texto).strip('_') or 'SIN_DATO'
+    return f"Vales_{base}.zip" if parte == 1 else f"Vales_{base}_parte{parte}.zip"
+
+def particionar_empleados(df, indice, criterio):
+    """
+    Agrupa los empleados del índice por su valor de `criterio` (ver
+    `CRITERIOS_PARTICION`). Retorna {valor: IndiceEmpleados} en orden alfabético de
+    valor; dentro de cada grupo se conserva el orden del índice.
+    """
+    nombres = list(indice)
+    empleados = getattr(indice, 'empleados', None)
+    if empleados is not None and criterio in empleados.columns:
+        valores = empleados[criterio].reindex(nombres).tolist()
+    elif isinstance(df, pd.DataFrame) and criterio in df.columns:
+        valores = df[criterio].iloc[[indice[nombre][0] for nombre in nombres]].tolist()
+    else:
+        valores = [np.nan] * len(nombres)
+
+    grupos = {}
+    for nombre, valor in zip(nombres, valores):
+        grupo = _texto_celda(_texto_identificador(valor)).strip() or SIN_DATO_RESUMEN
+        grupos.setdefault(grupo, {})[nombre] = indice[nombre]
+    return {grupo: IndiceEmpleados(grupos[grupo], empleados) for grupo in sorted(grupos)}
+
+def iterar_vales_particionados(df, indice, criterio, procesos=None, fecha=None, cache=CACHE_VALES):
+    """
+    `iterar_vales` con los empleados agrupados por `criterio`, partición tras
+    partición. Retorna (resultados, {empleado: partición}).
+    """
+    if indice is None:
+        indice = construir_indice_empleados(df)
+    particiones = particionar_empleados(df, indice, criterio)
+    particion_de = {empleado: particion for particion, grupo in particiones.items() for empleado in grupo}
+    ordenado = IndiceEmpleados(
+        {empleado: posiciones for grupo in particiones.values() for empleado, posiciones in grupo.items()},
+        getattr(indice, 'empleados', None)
+    )
+    return iterar_vales(df, ordenado, procesos, fecha, cache), particion_de
+
+def escribir_zips_particionados(resultados, particion_de, fecha, compresion=None, max_bytes=None,
+                                al_error=None, al_archivo=None, directorio=None):
+    """
+    Escribe los vales que entrega `iterar_vales_particionados` en un ZIP por
+    partición. Con `max_bytes` una partición se divide en partes que no superan ese
+    tamaño (salvo un vale que por sí solo lo supere). Cada ZIP se notifica con
+    `al_archivo(archivo)` en cuanto se cierra, para poder descargarlo mientras se
+    generan los siguientes; `archivo` es un diccionario con particion, parte,
+    nombre, ruta, vales y bytes. Los ZIP se escriben en `directorio` o como
+    archivos temporales. Retorna la lista de archivos.
+    """
+    if compresion is None:
+        compresion = COMPRESION_ZIP_DEFAULT
+
+    fecha_zip = fecha.timetuple()[:6]
+    archivos = []
+    nombres_usados = set()
+    actual = {}
+
+    def abrir(particion, parte):
+        nombre = nombre_archivo_particion(particion, parte)
+        # Particiones distintas pueden dar el mismo nombre al quitar acentos y símbolos
+        repeticion = 1
+        while nombre in nombres_usados:
+            repeticion += 1
+            nombre = nombre_archivo_particion(f"{particion} {repeticion}", parte)
+        nombres_usados.add(nombre)
+        if directorio:
+            archivo = open(os.path.join(directorio, nombre), 'wb')
+        else:
+            archivo = crear_archivo_temporal(".zip")
+        actual.update(
+            archivo=archivo, zip=zipfile.ZipFile(archivo, 'w', compresion), directorio_central=22,
+            datos={'particion': particion, 'parte': parte, 'nombre': nombre, 'ruta': archivo.name, 'vales': 0}
+        )
+
+    def cerrar():
+        actual['zip'].close()
+        actual['archivo'].close()
+        datos = actual.pop('datos')
+        datos['bytes'] = os.path.getsize(datos['ruta'])
+        archivos.append(datos)
+        actual.clear()
+        if al_archivo is not None:
+            al_archivo(datos)
+
+    try:
+        with etapa_rendimiento('generacion_zip_particionado') as medicion:
+            errores = 0
+            for empleado, resultado, error in resultados:
+                if error is not None:
+                    errores += 1
+                    if al_error is not None:
+                        al_error(empleado, error)
+                    continue
+
+                filename, pdf_bytes = resultado
+                particion = particion_de[empleado]
+                largo_nombre = len(filename.encode('utf-8'))
+                if actual and actual['datos']['particion'] != particion:
+                    cerrar()
+                elif actual and max_bytes and actual['datos']['vales']:
+                    # Encabezado local (30 bytes) + datos + entrada del directorio central (46 bytes)
+                    estimado = (actual['archivo'].tell() + 30 + largo_nombre + len(pdf_bytes)
+                                + actual['directorio_central'] + 46 + largo_nombre)
+                    if estimado > max_bytes:
+                        parte = actual['datos']['parte'] + 1
+                        cerrar()
+                        abrir(particion, parte)
+                if not actual:
+                    abrir(particion, 1)
+
+                actual['zip'].writestr(zipfile.ZipInfo(filename, date_time=fecha_zip), pdf_bytes, compresion)
+                actual['directorio_central'] += 46 + largo_nombre
+                actual['datos']['vales'] += 1
+            if actual:
+                cerrar()
+
+            medicion.update(
+                archivos=len(archivos),
+                empleados=sum(archivo['vales'] for archivo in archivos),
+                errores=errores,
+                bytes=sum(archivo['bytes'] for archivo in archivos)
+            )
+    except Exception:
+        # El ZIP a medio escribir no sirve; los terminados ya se notificaron y se conservan
+        if actual:
+            actual['zip'].close()
+            actual['archivo'].close()
+            if directorio:
+                os.remove(actual['datos']['ruta'])
+            else:
+                eliminar_archivo_temporal(actual['datos']['ruta'])
+        raise
+
+    return archivos
+
+def generar_zip_vales(df, indice=None, procesos=None, fecha=None, compresion=None,
+                      cache=CACHE_VALES, al_error=None, destino=None):
+    """Genera todos los vales del inventario en un ZIP (ver `escribir_zip_vales`) y retorna su ruta"""
+    if df is None or df.empty:
+        raise ErrorInventario("No hay datos para generar vales")
+
+    if fecha is None:
+        fecha = fecha_vales_del_dia()
+
+    resultados = iterar_vales(df, indice, procesos, fecha, cache)
+    return escribir_zip_vales(resultados, fecha, compresion, al_error, destino)
+
+def generar_pdf_unico(df, indice=None, fecha=None, al_error=None, al_vale=None, destino=None):
+    """
+    Genera todos los vales en un solo PDF listo para imprimir y retorna su ruta.
+    Cada empleado empieza en una página nueva, con su propia numeración y una
+    entrada en el índice (outline) del documento; las imágenes de marca se
+    incrustan una sola vez para todo el lote. Los errores por empleado se
+    notifican con `al_error(empleado, error)` y cada vale agregado con
+    `al_vale(empleado, pagina_inicial, paginas)`. Si no se indica `destino`
+    se usa un archivo temporal.
+    """
+    if df is None or df.empty:
+        raise ErrorInventario("No hay datos para generar vales")
+    if indice is None:
+        indice = construir_indice_empleados(df)
+    if fecha is None:
+        fecha = fecha_vales_del_dia()
+
+    if destino:
+        ruta = destino
+    else:
+        with crear_archivo_temporal(".pdf") as archivo:
+            ruta = archivo.name
+    from vales_pdf import PDF, dibujar_vale
+
+    try:
+        with etapa_rendimiento('generacion_pdf_unico') as medicion:
+            pdf = PDF(numerar_vales=True)
+            pdf.set_creation_date(fecha if fecha.tzinfo else fecha.astimezone())
+            pdf.set_title("Vales de Resguardo")
+
+            vales = errores = 0
+            for empleado, datos_empleado, inventario_empleado in iterar_bloques_empleados(df, indice):
+                try:
+                    validar_datos_vale(datos_empleado, inventario_empleado)
+                except Exception as e:
+                    errores += 1
+                    if al_error is not None:
+                        al_error(empleado, e)
+                    continue
+
+                pdf.iniciar_vale(marcador=empleado)
+                dibujar_vale(pdf, datos_empleado, inventario_empleado, fecha)
+                vales += 1
+                if al_vale is not None:
+                    inicio = pdf.paginas_inicio_vales[-1]
+                    al_vale(empleado, inicio, pdf.page - inicio + 1)
+
+            if not vales:
+                raise ErrorInventario("No se pudo generar ningún vale")
+            pdf.output(ruta)
+            medicion.update(
+                empleados=vales,
+                errores=errores,
+                paginas=pdf.pages_count,
+                bytes=os.path.getsize(ruta)
+            )
+    except Exception:
+        if destino:
+            if os.path.exists(destino):
+                os.remove(destino)
+        else:
+            eliminar_archivo_temporal(ruta)
+        raise
+
+    return ruta
+
+class GeneracionCancelada(Exception):
+    """La generación masiva se canceló antes de terminar"""
+
+class TrabajoVales:
+    """
+    Generación masiva de vales en un ZIP en un hilo de fondo, con avance, ETA y
+    cancelación. El trabajo no depende de quien lo consulta, por lo que puede
+    guardarse en la sesión y seguir entre ejecuciones del script. Al terminar,
+    la ruta del ZIP queda en `ruta` y los errores por empleado en `errores`.
+    Con `particion` (ver `CRITERIOS_PARTICION`) se escribe un ZIP por grupo de
+    empleados, dividido según `max_bytes`, y cada ZIP terminado se agrega a
+    `archivos` (ver `escribir_zips_particionados`) sin esperar a los demás.
+    """
+    def __init__(self, df, indice=None, procesos=None, fecha=None, compresion=None, cache=CACHE_VALES,
+                 particion=None, max_bytes=None):
+        if df is None or df.empty:
+            raise ErrorInventario("No hay datos para generar vales")
+        if indice is None:
+            indice = construir_indice_empleados(df)
+        self.total = len(indice)
+        self.hechos = 0
+        self.errores = []
+        self.ruta = None
+        self.archivos = []
+        self.particion = particion
+        self.max_bytes = max_bytes
+        self.error = None
+        self.inicio = None
+        self.fin = None
+        self._cancelar = threading.Event()
+        # Descarte de los archivos: lo hace quien llegue último (descartar() o el hilo al terminar)
+        self._lock_archivos = threading.Lock()
+        self._terminado = False
+        self._conservar = None
+        self._hilo = threading.Thread(
+            # Copia del contexto para conservar la medición de rendimiento activa
+            target=copy_context().run,
+            args=(self._ejecutar, df, indice, procesos, fecha, compresion, cache),
+            name="vales-masivos",
+            daemon=True
+        )
+
+    def iniciar(self):
+        self.inicio = time.perf_counter()
+        self._hilo.start()
+        return self
+
+    def cancelar(self):
+        self._cancelar.set()
+
+    def descartar(self, conservar=()):
+        """
+        Cancela el trabajo y elimina sus ZIP, salvo las rutas de `conservar`. Si el
+        hilo sigue escribiendo, los elimina él al terminar (incluidos los que cierre
+        después de la cancelación).
+        """
+        with self._lock_archivos:
+            self._conservar = set(conservar)
+            self._cancelar.set()
+            if self._terminado:
+                self._eliminar_archivos()
+
+    def _eliminar_archivos(self):
+        rutas = [self.ruta] + [archivo['ruta'] for archivo in self.archivos]
+        for ruta in rutas:
+            if ruta and ruta not in self._conservar:
+                eliminar_archivo_temporal(ruta)
+
+    @property
+    def en_curso(self):
+        return self._hilo.is_alive()
+
+    @property
+    def estado(self):
+        if self.en_curso:
+            return 'cancelando' if self._cancelar.is_set() else 'en_curso'
+        if isinstance(self.error, GeneracionCancelada):
+            return 'cancelado'
+        return 'error' if self.error is not None else 'terminado'
+
+    def avance(self):
+        """Empleados procesados, total, vales por segundo y segundos restantes estimados (None si aún no hay base)"""
+        hechos = self.hechos
+        final = self.fin if self.fin is not None else time.perf_counter()
+        segundos = final - self.inicio if self.inicio is not None else 0.0
+        ritmo = hechos / segundos if hechos and segundos > 0 else 0.0
+        restantes = (self.total - hechos) / ritmo if ritmo else None
+        return {
+            'hechos': hechos,
+            'total': self.total,
+            'fraccion': hechos / self.total if self.total else 1.0,
+            'segundos': segundos,
+            'vales_por_segundo': ritmo,
+            'eta_segundos': restantes,
+        }
+
+    def esperar(self, timeout=None):
+        self._hilo.join(timeout)
+        return not self.en_curso
+
+    def _seguir(self, resultados):
+        try:
+            for resultado in resultados:
+                if self._cancelar.is_set():
+                    raise GeneracionCancelada("Generación cancelada por el usuario")
+                self.hechos += 1
+                yield resultado
+        finally:
+            resultados.close()
+
+    def _ejecutar(self, df, indice, procesos, fecha, compresion, cache):
+        try:
+            if fecha is None:
+                fecha = fecha_vales_del_dia()
+            al_error = lambda empleado, error: self.errores.append((empleado, error))
+            if self.particion:
+                resultados, particion_de = iterar_vales_particionados(
+                    df, indice, self.particion, procesos, fecha, cache
+                )
+                escribir_zips_particionados(
+                    self._seguir(resultados), particion_de, fecha, compresion, self.max_bytes,
+                    al_error=al_error, al_archivo=self.archivos.append
+                )
+            else:
+                resultados = iterar_vales(df, indice, procesos, fecha, cache)
+                self.ruta = escribir_zip_vales(self._seguir(resultados), fecha, compresion, al_error=al_error)
+        except GeneracionCancelada as e:
+            self.error = e
+        except Exception as e:
+            logger.error(f"Error en la generación masiva: {str(e)}")
+            self.error = e
+        finally:
+            self.fin = time.perf_counter()
+            with self._lock_archivos:
+                self._terminado = True
+                if self._conservar is not None:
+                    self._eliminar_archivos()
+
+def normalizar_encabezado(encabezado):
+    """Quita espacios sobrantes y unifica mayúsculas para reconocer las columnas del sistema"""
+    texto = " ".join(str(encabezado).split())
+    return _COLUMNAS_POR_CLAVE.get(texto.upper(), texto)
+
+def _texto_identificador(valor):
+    """Convierte un identificador a texto conservando ceros a la izquierda (12345.0 -> '12345')"""
+    if valor is None or (isinstance(valor, float) and math.isnan(valor)):
+        return np.nan
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return str(valor)
+
+def _leer_hoja_openpyxl(hoja):
+    """
+    Lee una hoja de un libro abierto en modo de solo lectura, conservando solo las
+    columnas del sistema. Retorna None si la hoja está en blanco.
+    """
+    filas = hoja.iter_rows(values_only=True)
+    encabezado = next(filas, None)
+    if encabezado is None or all(titulo is None for titulo in encabezado):
+        return None
+
+    posiciones = {}
+    for posicion, titulo in enumerate(encabezado):
+        if titulo is None:
+            continue
+        columna = normalizar_encabezado(titulo)
+        if columna in COLUMNAS_SISTEMA and columna not in posiciones:
+            posiciones[columna] = posicion
+
+    if not posiciones:
+        return pd.DataFrame()
+
+    columnas = list(posiciones)
+    seleccion = list(posiciones.values())
+    ancho = max(seleccion) + 1
+    registros = []
+    for fila in filas:
+        if len(fila) < ancho:
+            fila = tuple(fila) + (None,) * (ancho - len(fila))
+        registros.append(tuple(fila[posicion] for posicion in seleccion))
+
+    return pd.DataFrame.from_records(registros, columns=columnas).fillna(np.nan)
+
+def _leer_hoja_pandas(archivo, hoja=0):
+    """Lectura con pandas para formatos que openpyxl no soporta (.xls)"""
+    df = pd.read_excel(archivo, sheet_name=hoja, dtype=object)
+    if df.empty and len(df.columns) == 0:
+        return None
+    df.columns = [normalizar_encabezado(col) for col in df.columns]
+    df = df.loc[:, ~df.columns.duplicated()]
+    return df[[col for col in df.columns if col in COLUMNAS_SISTEMA]]
+
+def _nombre_archivo(archivo):
+    """Nombre visible de un archivo cargado o de una ruta"""
+    if isinstance(archivo, (str, os.PathLike)):
+        return os.path.basename(os.fspath(archivo))
+    return os.path.basename(str(getattr(archivo, 'name', None) or "inventario"))
+
+def _formato_archivo(archivo):
+    """Formato de un archivo de inventario según su extensión: 'xlsx', 'xls', 'csv' o 'csv.gz'"""
+    nombre = _nombre_archivo(archivo).lower()
+    if nombre.endswith('.gz'):
+        return 'csv.gz'
+    if nombre.endswith('.csv'):
+        return 'csv'
+    if nombre.endswith('.xls'):
+        return 'xls'
+    return 'xlsx'
+
+def _fuente_archivo(archivo):
+    """Ruta o contenido (bytes) del archivo, para abrirlo de nuevo en otro proceso"""
+    if isinstance(archivo, (str, os.PathLike)):
+        return os.fspath(archivo)
+    if hasattr(archivo, 'getvalue'):
+        return archivo.getvalue()
+    contenido = archivo.read()
+    archivo.seek(0)
+    return contenido
+
+def _abrir_fuente(fuente):
+    return io.BytesIO(fuente) if isinstance(fuente, (bytes, bytearray)) else fuente
+
+def hojas_archivo_excel(fuente, formato='xlsx'):
+    """Nombres de las hojas de un libro (ruta o bytes), sin leer su contenido; un CSV tiene una sola hoja (None)"""
+    if formato in ('csv', 'csv.gz'):
+        return [None]
+    if formato == 'xls':
+        with pd.ExcelFile(_abrir_fuente(fuente)) as libro:
+            return list(libro.sheet_names)
+    import openpyxl
+
+    libro = openpyxl.load_workbook(_abrir_fuente(fuente), read_only=True)
+    try:
+        return list(libro.sheetnames)
+    finally:
+        libro.close()
+
+def leer_excel_inventario(archivo, hoja=None, xls=None):
+    """
+    Lee una hoja del inventario (por defecto, la primera) con solo las columnas del
+    sistema y encabezados normalizados. Los identificadores se leen como texto para
+    conservar ceros a la izquierda. Retorna None si la hoja está en blanco.
+    """
+    if xls is None:
+        xls = _formato_archivo(archivo) == 'xls'
+    if xls:
+        df = _leer_hoja_pandas(archivo, 0 if hoja is None else hoja)
+    else:
+        import openpyxl
+
+        libro = openpyxl.load_workbook(archivo, read_only=True, data_only=True)
+        try:
+            df = _leer_hoja_openpyxl(libro.worksheets[0] if hoja is None else libro[hoja])
+        finally:
+            libro.close()
+    if df is None:
+        return None
+
+    for col in COLUMNAS_IDENTIFICADOR:
+        if col in df.columns:
+            df[col] = df[col].map(_texto_identificador).astype(object)
+    return df
+
+def _validar_columnas_inventario(columnas):
+    """Lanza ErrorInventario si faltan las columnas mínimas del inventario"""
+    if len(columnas) == 0:
+        raise ErrorInventario("La hoja no tiene ninguna columna del inventario")
+
+    # Validar columnas mínimas requeridas
+    columnas_requeridas = ['NOMBRE', 'DESCRIPCION', 'VALOR']
+    for col in columnas_requeridas:
+        if col not in columnas:
+            raise ErrorInventario(f"El archivo debe contener la columna: {col}")
+
+def _limpiar_inventario(df):
+    """Descarta filas sin NOMBRE y convierte VALOR a número"""
+    df = df.dropna(subset=['NOMBRE'])
+    df['VALOR'] = pd.to_numeric(df['VALOR'], errors='coerce').fillna(0).astype(float)
+    return df
+
+def _abrir_csv(fuente, comprimido):
+    """Flujo binario (descomprimido) de un CSV en ruta o bytes"""
+    flujo = _abrir_fuente(fuente)
+    if comprimido:
+        return gzip.open(flujo)
+    return open(flujo, 'rb') if isinstance(flujo, str) else flujo
+
+def _encabezado_csv(fuente, comprimido):
+    """
+    Separador, codificación y columnas del sistema {columna: posición} de un CSV
+    a partir de su primera línea. Retorna None si el archivo está en blanco.
+    Un encabezado ASCII se decodifica como UTF-8 aunque el cuerpo no lo sea:
+    `leer_csv_inventario` reintenta entonces en Latin-1.
+    """
+    with _abrir_csv(fuente, comprimido) as flujo:
+        linea = flujo.readline()
+    if not linea.strip():
+        return None
+
+    try:
+        texto = linea.decode('utf-8-sig')
+        codificacion = 'utf-8-sig'
+    except UnicodeDecodeError:
+        texto = linea.decode('latin-1')
+        codificacion = 'latin-1'
+    separador = max(SEPARADORES_CSV, key=texto.count)
+
+    posiciones = {}
+    encabezado = next(csv.reader([texto.rstrip('\r\n')], delimiter=separador))
+    for posicion, titulo in enumerate(encabezado):
+        columna = normalizar_encabezado(titulo)
+        if columna in COLUMNAS_SISTEMA and columna not in posiciones:
+            posiciones[columna] = posicion
+    return separador, codificacion, posiciones
+
+def _leer_bloques_csv(fuente, comprimido, separador, codificacion, posiciones, filas_por_bloque):
+    """Lee el CSV por bloques ya limpios y con sus códigos QR procesados"""
+    # pandas entrega las columnas de `usecols` en el orden del archivo
+    columnas = sorted(posiciones, key=posiciones.get)
+    bloques = []
+    lector = pd.read_csv(
+        _abrir_fuente(fuente),
+        sep=separador,
+        encoding=codificacion,
+        compression='gzip' if comprimido else None,
+        usecols=[posiciones[col] for col in columnas],
+        dtype=str,
+        keep_default_na=False,
+        na_values=[''],
+        chunksize=filas_por_bloque,
+    )
+    with lector:
+        for bloque in lector:
+            bloque.columns = columnas
+            bloque = _limpiar_inventario(bloque)
+            if 'QR' in bloque.columns:
+                bloque = procesar_dataframe_con_qr(bloque)
+            bloques.append(bloque)
+    return bloques
+
+def leer_csv_inventario(fuente, comprimido=False, filas_por_bloque=None):
+    """
+    Lee un CSV (o CSV gzip) del inventario por bloques de `filas_por_bloque` filas:
+    cada bloque se limpia (NOMBRE, VALOR) y se procesan sus códigos QR antes de
+    leer el siguiente, de modo que el texto crudo del archivo nunca está completo
+    en memoria. Todas las columnas se leen como texto (como los identificadores
+    del Excel) y solo las celdas vacías cuentan como nulas.
+    Retorna None si el archivo está en blanco; lanza ErrorInventario si no tiene
+    datos o le faltan columnas.
+    """
+    if filas_por_bloque is None:
+        filas_por_bloque = FILAS_POR_BLOQUE_CSV
+    encabezado = _encabezado_csv(fuente, comprimido)
+    if encabezado is None:
+        return None
+    separador, codificacion, posiciones = encabezado
+    _validar_columnas_inventario(posiciones)
+
+    try:
+        bloques = _leer_bloques_csv(fuente, comprimido, separador, codificacion, posiciones, filas_por_bloque)
+    except UnicodeDecodeError:
+        if codificacion == 'latin-1':
+            raise
+        # Exportaciones Latin-1/cp1252 con encabezado ASCII: el error aparece en el cuerpo
+        logger.info("El CSV no es UTF-8; se vuelve a leer como Latin-1")
+        bloques = _leer_bloques_csv(fuente, comprimido, separador, 'latin-1', posiciones, filas_por_bloque)
+
+    if not bloques or sum(len(bloque) for bloque in bloques) == 0:
+        raise ErrorInventario("El archivo está vacío")
+    return pd.concat(bloques, ignore_index=True)
+
+def leer_hoja_inventario(fuente, hoja, formato='xlsx'):
+    """
+    Lee y valida una hoja del inventario, o un CSV completo (se ejecuta en el
+    pool de lectura). Retorna None si la hoja está en blanco y lanza
+    ErrorInventario si no tiene datos o le faltan columnas.
+    """
+    if formato in ('csv', 'csv.gz'):
+        return leer_csv_inventario(fuente, comprimido=formato == 'csv.gz')
+
+    df = leer_excel_inventario(_abrir_fuente(fuente), hoja, formato == 'xls')
+    if df is None:
+        return None
+
+    # MEJORA: Validación de DataFrame vacío
+    if len(df.columns) and df.empty:
+        raise ErrorInventario("El archivo Excel está vacío")
+    _validar_columnas_inventario(df.columns)
+
+    # Limpiar datos
+    return _limpiar_inventario(df)
+
+def procesar_archivos_excel(archivos, procesos=None):
+    """
+    Lee todas las hojas de uno o varios archivos de inventario (Excel, CSV o CSV
+    gzip) en paralelo, con una tarea por hoja en un ProcessPoolExecutor, y las
+    concatena con la columna ORIGEN ("archivo [hoja]", o solo "archivo" en un CSV).
+    Las hojas en blanco se omiten y las que no tienen el formato del inventario
+    se reportan en `errores` sin detener la carga.
+    Retorna (df, errores), con errores como lista de {'archivo', 'hoja', 'error'}.
+    Lanza ErrorInventario si ninguna hoja tiene un inventario válido.
+    """
+    archivos = [archivo for archivo in archivos if archivo is not None]
+    if not archivos:
+        return None, []
+    if procesos is None:
+        procesos = PROCESOS_LECTURA
+
+    with etapa_rendimiento('lectura_excel', archivos=len(archivos)) as medicion:
+        tareas = []
+        errores = []
+        for archivo in archivos:
+            nombre = _nombre_archivo(archivo)
+            formato = _formato_archivo(archivo)
+            fuente = _fuente_archivo(archivo)
+            try:
+                hojas = hojas_archivo_excel(fuente, formato)
+            except Exception as e:
+                errores.append({'archivo': nombre, 'hoja': None, 'error': f"No se pudo abrir el archivo: {str(e)}"})
+                continue
+            tareas.extend((nombre, hoja, fuente, formato) for hoja in hojas)
+
+        procesos = max(1, min(procesos, len(tareas)))
+        if procesos == 1:
+            resultados = [
+                _resultado_lectura(leer_hoja_inventario, fuente, hoja, formato)
+                for _, hoja, fuente, formato in tareas
+            ]
+        else:
+            with ProcessPoolExecutor(max_workers=procesos) as executor:
+                futuros = [
+                    executor.submit(leer_hoja_inventario, fuente, hoja, formato)
+                    for _, hoja, fuente, formato in tareas
+                ]
+                resultados = [_resultado_lectura(futuro.result) for futuro in futuros]
+
+        hojas = []
+        for (nombre, hoja, _, formato), (df, error) in zip(tareas, resultados):
+            if error is not None:
+                errores.append({'archivo': nombre, 'hoja': hoja, 'error': error})
+            elif df is not None:
+                origen = nombre if hoja is None else f"{nombre} [{hoja}]"
+                hojas.append((formato, df.assign(**{COLUMNA_ORIGEN: origen})))
+
+        filas = sum(len(df) for _, df in hojas)
+        medicion.update(hojas=len(hojas), filas=filas, errores=len(errores))
+
+    descripciones = [describir_error_lectura(error) for error in errores]
+    for descripcion in descripciones:
+        logger.warning(descripcion)
+
+    if not hojas:
+        if len(errores) == 1:
+            raise ErrorInventario(errores[0]['error'])
+        if errores:
+            raise ErrorInventario("Ninguna hoja tiene un inventario válido: " + "; ".join(descripciones))
+        raise ErrorInventario("El archivo está vacío")
+
+    # Procesar códigos QR de las hojas de Excel (los CSV ya los procesaron por bloques)
+    if any(formato not in ('csv', 'csv.gz') and 'QR' in df.columns for formato, df in hojas):
+        with etapa_rendimiento('procesamiento_qr', filas=filas):
+            hojas = [
+                (formato, df if formato in ('csv', 'csv.gz') else procesar_dataframe_con_qr(df))
+                for formato, df in hojas
+            ]
+
+    return pd.concat([df for _, df in hojas], ignore_index=True), errores
+
+def describir_error_lectura(error):
+    """Texto "archivo [hoja]: error" de un error de `procesar_archivos_excel`"""
+    hoja = f" [{error['hoja']}]" if error['hoja'] is not None else ""
+    return f"{error['archivo']}{hoja}: {error['error']}"
+
+def _resultado_lectura(funcion, *args):
+    """Ejecuta la lectura de una hoja y la convierte en (df, mensaje de error)"""
+    try:
+        return funcion(*args), None
+    except ErrorInventario as e:
+        return None, str(e)
+    except Exception as e:
+        return None, f"No se pudo leer la hoja: {str(e)}"
+
+def procesar_archivo_excel(archivo):
+    """
+    Procesa el archivo Excel (todas sus hojas) y devuelve un DataFrame limpio.
+    Lanza ErrorInventario si ninguna hoja tiene datos o todas tienen columnas faltantes;
+    las hojas inválidas de un libro con otras hojas válidas solo se registran en el log.
+    """
+    # MEJORA: Validación de archivo vacío
+    if archivo is None:
+        return None
+    df, _ = procesar_archivos_excel([archivo])
+    return df
+
+def huella_archivo(archivo):
+    """Hash SHA-256 del contenido de un archivo cargado"""
+    if hasattr(archivo, 'getvalue'):
+        contenido = archivo.getvalue()
+    else:
+        contenido = archivo.read()
+        archivo.seek(0)
+    return hashlib.sha256(contenido).hexdigest()
+
+def huella_archivos(archivos):
+    """Hash de varios archivos cargados: nombre y contenido de cada uno, en orden"""
+    huella = hashlib.sha256()
+    for archivo in archivos:
+        huella.update(f"{_nombre_archivo(archivo)}\x1f{huella_archivo(archivo)}\x1e".encode('utf-8'))
+    return huella.hexdigest()
+
+def _texto_normalizado(serie):
+    """Texto sin espacios extremos (nulos como cadena vacía); cada valor distinto se normaliza una sola vez"""
+    codigos, unicos = pd.factorize(serie)
+    textos = _texto_columna(pd.Series(unicos, dtype=object)).str.strip().to_numpy(dtype=object)
+    # El código -1 (nulo) toma el "" agregado al final
+    return pd.Series(np.append(textos, "")[codigos], index=serie.index)
+
+def _claves_articulos(df):
+    """
+    Clave de cada fila: NOMBRE + número de inventario (o No. SEP si no tiene;
+    o la descripción si no tiene ninguno) + ocurrencia, para distinguir
+    artículos repetidos del mismo empleado.
+    """
+    numero_inventario = _texto_normalizado(df['NUMERO DE INVVENTARIO'])
+    no_sep = _texto_normalizado(df['No. SEP'])
+    descripcion = _texto_normalizado(df['DESCRIPCION'])
+
+    articulo = ("INV:" + numero_inventario).where(numero_inventario != "", "SEP:" + no_sep)
+    articulo = articulo.where((numero_inventario != "") | (no_sep != ""), "DESC:" + descripcion)
+
+    claves = pd.DataFrame({'NOMBRE': df['NOMBRE'].to_numpy(), 'ARTICULO': articulo.to_numpy()})
+    claves['OCURRENCIA'] = claves.groupby(['NOMBRE', 'ARTICULO'], sort=False).cumcount()
+    return claves
+
+def _columnas_comparables(df, columnas):
+    """Columnas del vale normalizadas para comparar entre versiones del inventario"""
+    comparables = {}
+    for col in columnas:
+        if col not in df.columns:
+            comparables[col] = np.full(len(df), "", dtype=object)
+        elif col == 'VALOR':
+            comparables[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).round(2).to_numpy()
+        else:
+            comparables[col] = _texto_normalizado(df[col]).to_numpy()
+    return comparables
+
+def _con_datos_empleado(df, indice):
+    """Inventario con los datos del responsable en cada fila (los de la tabla de empleados si está normalizado)"""
+    empleados = getattr(indice, 'empleados', None)
+    if empleados is None:
+        return df
+    faltantes = [col for col in empleados.columns if col not in df.columns]
+    datos = empleados[faltantes].reindex(df['NOMBRE'].astype(object))
+    datos.index = df.index
+    return pd.concat([df, datos], axis=1)
+
+def comparar_inventarios(anterior, actual, indice_anterior=None, indice_actual=None):
+    """
+    Diferencia fila a fila entre dos versiones del inventario, con clave
+    NOMBRE + NUMERO DE INVVENTARIO / No. SEP. Retorna un DataFrame con una fila
+    por artículo dado de alta, de baja o modificado (CAMBIO) y, para los
+    modificados, las columnas que cambiaron. El orden de las filas no se compara.
+    Los inventarios normalizados deben pasarse con su índice.
+    """
+    columnas = [col for col in COLUMNAS_ENCABEZADO_VALE + COLUMNAS_ARTICULO_VALE if col != 'NOMBRE']
+
+    def preparar(df, indice):
+        df = _con_datos_empleado(df, indice)
+        tabla = _claves_articulos(df)
+        for col, valores in _columnas_comparables(df, columnas).items():
+            tabla[col] = valores
+        return tabla
+
+    claves = ['NOMBRE', 'ARTICULO', 'OCURRENCIA']
+    union = preparar(anterior, indice_anterior).merge(
+        preparar(actual, indice_actual), on=claves, how='outer', suffixes=('_ANTERIOR', ''), indicator=True
+    )
+
+    distintas = pd.DataFrame({
+        col: union[col].ne(union[f"{col}_ANTERIOR"]) for col in columnas
+    })
+    ambos = union['_merge'].eq('both')
+    modificados = ambos & distintas.any(axis=1)
+
+    cambio = np.select(
+        [union['_merge'].eq('right_only'), union['_merge'].eq('left_only'), modificados],
+        ['ALTA', 'BAJA', 'MODIFICADO'],
+        default=""
+    )
+    columnas_cambiadas = pd.Series("", index=union.index)
+    if modificados.any():
+        marcas = distintas[modificados]
+        columnas_cambiadas[modificados] = [
+            ", ".join(col for col, distinta in zip(columnas, fila) if distinta)
+            for fila in marcas.itertuples(index=False)
+        ]
+
+    cambios = pd.DataFrame({
+        'NOMBRE': union['NOMBRE'],
+        'ARTICULO': union['ARTICULO'].str.split(":", n=1).str[1],
+        'CAMBIO': cambio,
+        'DESCRIPCION': union['DESCRIPCION'].where(union['_merge'].ne('left_only'), union['DESCRIPCION_ANTERIOR']),
+        'COLUMNAS': columnas_cambiadas,
+    })
+    return cambios[cambios['CAMBIO'] != ""].reset_index(drop=True)
+
+def resumir_cambios(cambios):
+    """Altas, bajas y modificaciones por empleado a partir de `comparar_inventarios`"""
+    resumen = pd.crosstab(cambios['NOMBRE'], cambios['CAMBIO'])
+    resumen = resumen.reindex(columns=['ALTA', 'BAJA', 'MODIFICADO'], fill_value=0)
+    resumen.columns = ['ALTAS', 'BAJAS', 'MODIFICADOS']
+    resumen.columns.name = None
+    return resumen.reset_index()
+
+def indice_empleados_afectados(indice, cambios):
+    """
+    Restringe el índice de empleados a los que tienen cambios, en el orden del
+    índice. Los empleados que ya no tienen artículos no generan vale.
+    """
+    if not isinstance(indice, IndiceEmpleados):
+        indice = IndiceEmpleados(indice)
+    return indice.subconjunto(cambios['NOMBRE'])
+
+def escribir_lote(df, salida, procesos=None, fecha=None, en_zip=False, compresion=None, origen=None,
+                  pdf_unico=False, cambios=None, particion=None, max_bytes=None):
+    """
+    Genera los vales de todo el inventario en el directorio `salida`: un PDF por
+    empleado, con `en_zip` un solo ZIP, con `particion` un ZIP por grupo de
+    empleados (de hasta `max_bytes`) o, con `pdf_unico`, un solo PDF para
+    imprimir. Con `cambios` (ver `comparar_inventarios`) solo se generan los
+    vales de los empleados afectados. Escribe además `manifiesto.json` y lo retorna.
+    """
+    os.makedirs(salida, exist_ok=True)
+    if fecha is None:
+        fecha = fecha_vales_del_dia()
+    indice = construir_indice_empleados(df)
+    if cambios is not None:
+        indice = indice_empleados_afectados(indice, cambios)
+    valores = df['VALOR'].to_numpy()
+
+    vales = []
+    errores = []
+
+    def registrar(empleado, filename, pdf_bytes):
+        posiciones = indice[empleado]
+        vales.append({
+            'empleado': empleado,
+            'archivo': filename,
+            'articulos': int(len(posiciones)),
+            'valor_total': round(float(valores[posiciones].sum()), 2),
+            'bytes': len(pdf_bytes),
+            'sha256': hashlib.sha256(pdf_bytes).hexdigest(),
+        })
+
+    def registrar_error(empleado, error):
+        logger.error(f"Error con {empleado}: {str(error)}")
+        errores.append({'empleado': empleado, 'error': str(error)})
+
+    if pdf_unico:
+        def registrar_paginas(empleado, pagina, paginas):
+            posiciones = indice[empleado]
+            vales.append({
+                'empleado': empleado,
+                'archivo': NOMBRE_PDF_UNICO,
+                'articulos': int(len(posiciones)),
+                'valor_total': round(float(valores[posiciones].sum()), 2),
+                'pagina': pagina,
+                'paginas': paginas,
+            })
+
+        generar_pdf_unico(df, indice, fecha, registrar_error, registrar_paginas,
+                          destino=os.path.join(salida, NOMBRE_PDF_UNICO))
+        archivos = [NOMBRE_PDF_UNICO]
+    elif particion:
+        resultados, particion_de = iterar_vales_particionados(df, indice, particion, procesos, fecha)
+
+        def registrar_resultados():
+            for empleado, resultado, error in resultados:
+                if error is None:
+                    registrar(empleado, *resultado)
+                    vales[-1]['particion'] = particion_de[empleado]
+                yield empleado, resultado, error
+
+        zips = escribir_zips_particionados(registrar_resultados(), particion_de, fecha, compresion, max_bytes,
+                                           registrar_error, directorio=salida)
+        archivos = [archivo['nombre'] for archivo in zips]
+    elif en_zip:
+        resultados = iterar_vales(df, indice, procesos, fecha)
+        # El manifiesto se arma al vuelo mientras se escribe el ZIP
+        def registrar_resultados():
+            for empleado, resultado, error in resultados:
+                if error is None:
+                    registrar(empleado, *resultado)
+                yield empleado, resultado, error
+
+        escribir_zip_vales(registrar_resultados(), fecha, compresion, registrar_error,
+                           destino=os.path.join(salida, NOMBRE_ZIP_VALES))
+        archivos = [NOMBRE_ZIP_VALES]
+    else:
+        resultados = iterar_vales(df, indice, procesos, fecha)
+        for empleado, resultado, error in resultados:
+            if error is not None:
+                registrar_error(empleado, error)
+                continue
+            filename, pdf_bytes = resultado
+            with open(os.path.join(salida, filename), 'wb') as archivo:
+                archivo.write(pdf_bytes)
+            registrar(empleado, filename, pdf_bytes)
+        archivos = [vale['archivo'] for vale in vales]
+
+    manifiesto = {
+        'origen': origen,
+        'fecha_vales': fecha.isoformat(),
+        'generado': datetime.now().isoformat(timespec='seconds'),
+        'version_plantilla': VERSION_PLANTILLA_VALE,
+        'empleados': len(indice),
+        'articulos': int(len(df)),
+        'archivos': archivos,
+        'vales': vales,
+        'errores': errores,
+    }
+    if cambios is not None:
+        manifiesto['cambios'] = resumir_cambios(cambios).to_dict('records')
+    with open(os.path.join(salida, 'manifiesto.json'), 'w', encoding='utf-8') as archivo:
+        json.dump(manifiesto, archivo, ensure_ascii=False, indent=2)
+    return manifiesto
+
+def main_cli(argv=None):
+    """Línea de comandos: `batch` genera los vales de un inventario sin iniciar Streamlit"""
+    parser = argparse.ArgumentParser(
+        prog="python -m sistema_vales",
+        description="Generación de vales de resguardo por lotes (sin Streamlit)"
+    )
+    comandos = parser.add_subparsers(dest="comando", required=True)
+    batch = comandos.add_parser("batch", help="Genera los vales de todos los empleados de un inventario")
+    batch.add_argument("archivos", nargs="+", metavar="archivo",
+                       help="Archivos de inventario (.xlsx, .xls, .csv o .csv.gz); se leen todas sus hojas")
+    batch.add_argument("--out", required=True, help="Directorio de salida")
+    batch.add_argument("--jobs", type=int, default=PROCESOS_GENERACION,
+                       help="Procesos para leer las hojas y generar los PDF (por defecto: %(default)s)")
+    formato = batch.add_mutually_exclusive_group()
+    formato.add_argument("--zip", action="store_true", help="Escribir un solo ZIP en lugar de un PDF por empleado")
+    formato.add_argument("--pdf-unico", action="store_true",
+                         help="Escribir un solo PDF para imprimir, con un marcador por empleado")
+    formato.add_argument("--particion", choices=sorted(PARTICIONES_CLI),
+                         help="Escribir un ZIP por área, edificio o CT")
+    batch.add_argument("--max-mb", type=float,
+                       help="Con --particion, tamaño máximo de cada ZIP en MB (se divide en partes)")
+    batch.add_argument("--compresion", choices=sorted(COMPRESIONES_CLI), default="stored",
+                       help="Compresión de las entradas del ZIP (por defecto: %(default)s)")
+    batch.add_argument("--fecha", type=date.fromisoformat,
+                       help="Fecha de levantamiento AAAA-MM-DD (por defecto: hoy)")
+    batch.add_argument("--anterior",
+                       help="Versión anterior del inventario: solo se generan los vales de los empleados con cambios")
+    args = parser.parse_args(argv)
+    if args.max_mb and not args.particion:
+        parser.error("--max-mb requiere --particion")
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    # Avisos de fpdf2 (fuentes sustituidas, parámetros obsoletos) que no afectan al vale
+    warnings.simplefilter("ignore", DeprecationWarning)
+    warnings.filterwarnings("ignore", message="Substituting font", category=UserWarning)
+
+    try:
+        df, _ = procesar_archivos_excel(args.archivos, procesos=max(1, args.jobs))
+        cambios = None
+        if args.anterior:
+            cambios = comparar_inventarios(procesar_archivo_excel(args.anterior), df)
+            logger.info(f"{cambios['NOMBRE'].nunique()} empleados con cambios respecto a {args.anterior}")
+    except ErrorInventario as e:
+        logger.error(str(e))
+        return 2
+
+    fecha = datetime.combine(args.fecha, datetime.min.time()) if args.fecha else None
+    manifiesto = escribir_lote(
+        df, args.out,
+        procesos=max(1, args.jobs),
+        fecha=fecha,
+        en_zip=args.zip,
+        pdf_unico=args.pdf_unico,
+        cambios=cambios,
+        compresion=COMPRESIONES_CLI[args.compresion],
+        particion=PARTICIONES_CLI.get(args.particion),
+        max_bytes=int(args.max_mb * 1024 * 1024) if args.max_mb else None,
+        origen=[os.path.abspath(archivo) for archivo in args.archivos]
+    )
+    logger.info(
+        f"{len(manifiesto['vales'])} vales generados en {args.out} "
+        f"({len(manifiesto['errores'])} con error)"
+    )
+    return 1 if manifiesto['errores'] else 0
@@ -0,0 +1,604 @@
+import io
+import logging
+import os
+import threading
+from functools import lru_cache
+
+from fpdf import FPDF
+from fpdf.fonts import fpdf_charwidths
+from fpdf.image_parsing import get_img_info, load_image
+from PIL import Image
+
+from vales_core import (
+    ANCHO_IMAGENES_VALE_MM,
+    ANCHOS_COLUMNAS_VALE,
+    CALIDAD_JPEG_IMAGENES,
+    COLORES_PALETA_IMAGENES,
+    DIRECTORIO_IMAGENES_OPTIMIZADAS,
+    DPI_IMAGENES_VALE,
+    IMAGEN_ENCABEZADO_VALE,
+    IMAGEN_PIE_VALE,
+    LINEAS_DESCRIPCION_VALE,
+    MARGEN_CELDA_VALE,
+    TAMANO_LETRA_FILA,
+    TAMANO_LETRA_FILA_REDUCIDA,
+    _texto_celda,
+    _valores_columna,
+    etapa_rendimiento,
+    huella_imagen_marca,
+)
+
+# Dibujo de los vales en PDF con fpdf2 (encabezado y pie con las imágenes de marca,
+# tabla de bienes y firmas). vales_core lo importa solo al generar un vale, para que
+# la aplicación y la lectura del inventario no carguen fpdf2 ni Pillow.
+
+logger = logging.getLogger(__name__)
+
+# Anchos de glifo (milésimas de punto por pt) de la fuente de las filas (Arial = helvetica)
+_ANCHOS_GLIFOS_FILA = fpdf_charwidths["helvetica"]
+_PUNTOS_POR_MM = 72 / 25.4
+
+
+def _candidatos_imagen(imagen, calidad, colores):
+    """Codificaciones posibles de una imagen RGB: [(formato, bytes)]"""
+    candidatos = []
+    jpeg = io.BytesIO()
+    imagen.save(jpeg, format='JPEG', quality=calidad, optimize=True)
+    candidatos.append(('jpg', jpeg.getvalue()))
+    paleta = io.BytesIO()
+    imagen.quantize(colores, method=Image.Quantize.MEDIANCUT, dither=Image.Dither.NONE).save(
+        paleta, format='PNG', optimize=True
+    )
+    candidatos.append(('png', paleta.getvalue()))
+    return candidatos
+
+def _info_imagen(origen):
+    """
+    Información de imagen de FPDF para una ruta o BytesIO. Los JPEG RGB o en
+    escala de grises se incrustan tal cual (FPDF los volvería a codificar con pérdida).
+    """
+    imagen = Image.open(load_image(origen) if isinstance(origen, str) else origen)
+    info = get_img_info(imagen)
+    if info['f'] == 'DCTDecode' and imagen.mode in ('RGB', 'L'):
+        if isinstance(origen, str):
+            with open(origen, 'rb') as archivo:
+                info['data'] = archivo.read()
+        else:
+            info['data'] = origen.getvalue()
+    return info
+
+def _bytes_incrustados(info):
+    return len(info['data']) + len(info.get('smask') or b'')
+
+def optimizar_imagen_marca(ruta, ancho_mm=ANCHO_IMAGENES_VALE_MM, dpi=DPI_IMAGENES_VALE,
+                           directorio=DIRECTORIO_IMAGENES_OPTIMIZADAS):
+    """
+    Versión de una imagen de marca lista para el PDF: sin transparencia (sobre
+    blanco), remuestreada a `dpi` para `ancho_mm` de ancho y codificada como JPEG o
+    PNG de paleta, la que ocupe menos una vez incrustada. El resultado se guarda
+    en `directorio` con la huella del original y los parámetros, de modo que solo
+    se calcula una vez. Retorna la ruta de la versión optimizada.
+    """
+    huella = huella_imagen_marca(ruta, ancho_mm, dpi)
+    if huella is None:
+        raise FileNotFoundError(ruta)
+    base = f"{os.path.splitext(os.path.basename(ruta))[0]}-{huella[:20]}"
+    for formato in ('jpg', 'png'):
+        existente = os.path.join(directorio, f"{base}.{formato}")
+        if os.path.exists(existente):
+            return existente
+
+    with open(ruta, 'rb') as archivo:
+        original = archivo.read()
+    with etapa_rendimiento('optimizacion_imagen', imagen=os.path.basename(ruta), bytes_original=len(original)) as medicion:
+        imagen = Image.open(io.BytesIO(original))
+        if imagen.mode in ('RGBA', 'LA', 'PA') or (imagen.mode == 'P' and 'transparency' in imagen.info):
+            imagen = imagen.convert('RGBA')
+            fondo = Image.new('RGB', imagen.size, 'white')
+            fondo.paste(imagen, mask=imagen.getchannel('A'))
+            imagen = fondo
+        else:
+            imagen = imagen.convert('RGB')
+
+        ancho = round(ancho_mm / 25.4 * dpi)
+        if ancho < imagen.width:
+            imagen = imagen.resize((ancho, max(1, round(imagen.height * ancho / imagen.width))), Image.LANCZOS)
+
+        formato, datos = min(
+            _candidatos_imagen(imagen, CALIDAD_JPEG_IMAGENES, COLORES_PALETA_IMAGENES),
+            key=lambda candidato: _bytes_incrustados(_info_imagen(io.BytesIO(candidato[1])))
+        )
+        medicion.update(formato=formato, bytes_optimizado=len(datos), ancho=imagen.width)
+
+    # Escritura atómica: varios procesos pueden preparar la misma imagen a la vez
+    os.makedirs(directorio, exist_ok=True)
+    destino = os.path.join(directorio, f"{base}.{formato}")
+    temporal = f"{destino}.{os.getpid()}.tmp"
+    with open(temporal, 'wb') as archivo:
+        archivo.write(datos)
+    os.replace(temporal, destino)
+    return destino
+
+class CacheImagenes:
+    """
+    Caché de proceso de las imágenes de marca ya decodificadas para FPDF.
+    Cada imagen se decodifica una sola vez y se vuelve a cargar solo si cambia
+    la fecha de modificación del archivo. Si falta, se avisa una única vez.
+    Con `optimizar` se usa la versión optimizada (ver `optimizar_imagen_marca`);
+    si no se puede preparar, se usa el original.
+    """
+    def __init__(self, optimizar=True):
+        self.optimizar = optimizar
+        self._entradas = {}
+        self._faltantes = set()
+        self._lock = threading.Lock()
+
+    def _cargar(self, ruta):
+        if self.optimizar:
+            try:
+                return _info_imagen(optimizar_imagen_marca(ruta))
+            except Exception as e:
+                logger.warning(f"No se pudo optimizar la imagen '{ruta}', se usa el original: {str(e)}")
+        return _info_imagen(ruta)
+
+    def obtener(self, ruta):
+        """Devuelve la información de imagen de FPDF para `ruta` o None si no está disponible"""
+        with self._lock:
+            try:
+                mtime = os.stat(ruta).st_mtime_ns
+                entrada = self._entradas.get(ruta)
+                if entrada is not None and entrada[:2] == (mtime, self.optimizar):
+                    return entrada[2]
+
+                info = self._cargar(ruta)
+            except Exception as e:
+                self._entradas.pop(ruta, None)
+                if ruta not in self._faltantes:
+                    self._faltantes.add(ruta)
+                    logger.warning(f"No se pudo cargar la imagen '{ruta}': {str(e)}")
+                return None
+
+            self._faltantes.discard(ruta)
+            self._entradas[ruta] = (mtime, self.optimizar, info)
+            return info
+
+CACHE_IMAGENES = CacheImagenes()
+
+class PDF(FPDF):
+    def __init__(self, numerar_vales=False):
+        super().__init__()
+        # En el PDF único cada vale lleva su propia numeración "Página n de N"
+        self.numerar_vales = numerar_vales
+        self.paginas_inicio_vales = []
+        self._margenes_iniciales = (self.l_margin, self.t_margin, self.r_margin, self.b_margin)
+
+    def iniciar_vale(self, marcador=None):
+        """
+        Abre un vale en una página nueva con los márgenes del formato oficial.
+        En un documento con varios vales restablece el estado inicial para que
+        cada vale se vea igual que si fuera un PDF aparte; `marcador` agrega
+        una entrada al índice (outline) del documento.
+        """
+        if self.page:
+            izquierdo, superior, derecho, inferior = self._margenes_iniciales
+            self.set_margins(left=izquierdo, top=superior, right=derecho)
+            self.set_auto_page_break(auto=True, margin=inferior)
+            self.set_draw_color(0)
+            self.set_fill_color(0)
+            self.set_text_color(0)
+        self.add_page()
+        self.paginas_inicio_vales.append(self.page)
+        if marcador is not None:
+            self.start_section(marcador)
+        self.set_auto_page_break(auto=True, margin=30)
+        self.set_margins(left=10, top=25, right=10)
+
+    def pagina_vale(self):
+        """Número de página dentro del vale actual"""
+        return self.page - self.paginas_inicio_vales[-1] + 1 if self.paginas_inicio_vales else self.page
+
+    def _alias_paginas_vale(self):
+        return f"{{nbv{len(self.paginas_inicio_vales)}}}"
+
+    def _substitute_page_number(self):
+        # Además del total del documento, sustituye el total de páginas de cada vale
+        super()._substitute_page_number()
+        finales = self.paginas_inicio_vales[1:] + [self.pages_count + 1]
+        for numero, (inicio, fin) in enumerate(zip(self.paginas_inicio_vales, finales), 1):
+            alias = f"{{nbv{numero}}}".encode("latin-1")
+            total = str(fin - inicio).encode("latin-1")
+            for pagina in range(inicio, fin):
+                self.pages[pagina].contents = self.pages[pagina].contents.replace(alias, total)
+
+    def imagen_marca(self, ruta, x, y, w):
+        """Inserta una imagen de marca desde la caché de proceso; retorna False si no existe"""
+        info = CACHE_IMAGENES.obtener(ruta)
+        if info is None:
+            return False
+        if ruta not in self.images:
+            # FPDF reutiliza las imágenes registradas en self.images sin decodificarlas
+            self.images[ruta] = dict(info, i=len(self.images) + 1, usages=0)
+        self.image(ruta, x=x, y=y, w=w)
+        return True
+
+    def header(self):
+        # Logo horizontal en TODAS las páginas
+        if not self.imagen_marca(IMAGEN_ENCABEZADO_VALE, x=10, y=8, w=190):
+            # Si no encuentra el logo, poner título
+            self.set_font("Arial", 'B', 14)
+            self.cell(0, 5, "VALES DE RESGUARDO INTERNO 2025", 0, 1, 'C')
+        self.ln(12)
+    
+    def footer(self):
+        # Pie de página con IMAGEN en TODAS las páginas
+        # Usar la imagen Pie_vale.png en lugar de texto
+        pagina = f"Página {self.pagina_vale()}"
+        if self.numerar_vales:
+            pagina += f" de {self._alias_paginas_vale()}"
+
+        if not self.imagen_marca(IMAGEN_PIE_VALE, x=10, y=self.h - 30, w=190):
+            # Fallback a texto si la imagen no existe
+            self.set_y(-25)
+            self.set_font("Arial", 'I', 8)
+            self.set_text_color(100, 100, 100)
+            self.cell(0, 5, "Agustin Delgado No. 58, Col. Transito, CP. 06820, Alcaldia Cuauhtemoc, CDMX.", 0, 1, 'C')
+            self.cell(0, 5, "Tel: (55) 3601 7100", 0, 1, 'C')
+            self.cell(0, 5, pagina, 0, 0, 'C')
+        elif self.numerar_vales:
+            # Numeración del vale bajo la imagen del pie
+            self.set_xy(10, self.h - 10)
+            self.set_font("Arial", 'I', 7)
+            self.set_text_color(100, 100, 100)
+            self.cell(190, 4, pagina, 0, 0, 'R')
+
+@lru_cache(maxsize=65536)
+def ancho_texto(texto, tamano):
+    """Ancho en mm de `texto` en Arial normal de `tamano` pt (anchos de glifo de la fuente base)"""
+    anchos = _ANCHOS_GLIFOS_FILA
+    return sum(anchos.get(caracter, 600) for caracter in texto) * tamano / 1000 / _PUNTOS_POR_MM
+
+@lru_cache(maxsize=65536)
+def ajustar_texto_celda(texto, ancho_columna, tamanos=(TAMANO_LETRA_FILA,)):
+    """
+    Ajusta `texto` a una celda de `ancho_columna` mm. Prueba los `tamanos` en orden y
+    retorna (texto, tamaño) con el primero en que cabe; si no cabe con ninguno, lo
+    recorta con "..." al último tamaño.
+    """
+    disponible = ancho_columna - 2 * MARGEN_CELDA_VALE
+    for tamano in tamanos:
+        if ancho_texto(texto, tamano) <= disponible:
+            return texto, tamano
+
+    tamano = tamanos[-1]
+    escala = tamano / 1000 / _PUNTOS_POR_MM
+    limite = disponible / escala - 3 * _ANCHOS_GLIFOS_FILA['.']
+    acumulado = 0
+    for posicion, caracter in enumerate(texto):
+        acumulado += _ANCHOS_GLIFOS_FILA.get(caracter, 600)
+        if acumulado > limite:
+            return texto[:posicion].rstrip() + "...", tamano
+    return texto, tamano
+
+def _corte_linea(texto, disponible, tamano):
+    """Posición donde cortar `texto` para que su primera línea quepa en `disponible` mm"""
+    limite = disponible / (tamano / 1000 / _PUNTOS_POR_MM)
+    acumulado = 0
+    for posicion, caracter in enumerate(texto):
+        acumulado += _ANCHOS_GLIFOS_FILA.get(caracter, 600)
+        if acumulado > limite:
+            break
+    else:
+        return len(texto)
+    # Cortar en el último espacio; una palabra más ancha que la celda se corta donde llegue
+    espacio = texto.rfind(' ', 0, posicion + 1)
+    return espacio + 1 if espacio > 0 else max(posicion, 1)
+
+@lru_cache(maxsize=65536)
+def partir_texto_celda(texto, ancho_columna, max_lineas=LINEAS_DESCRIPCION_VALE, tamano=TAMANO_LETRA_FILA):
+    """
+    Parte `texto` en hasta `max_lineas` líneas que caben en una celda de `ancho_columna` mm.
+    La última se recorta con "..." si el texto no cabe completo. Retorna una tupla de líneas.
+    """
+    disponible = ancho_columna - 2 * MARGEN_CELDA_VALE
+    if ancho_texto(texto, tamano) <= disponible:
+        return (texto,)
+
+    lineas = []
+    resto = texto
+    while resto and len(lineas) < max_lineas - 1:
+        corte = _corte_linea(resto, disponible, tamano)
+        lineas.append(resto[:corte].rstrip())
+        resto = resto[corte:].lstrip()
+    if resto:
+        lineas.append(ajustar_texto_celda(resto, ancho_columna, (tamano,))[0])
+    return tuple(lineas)
+
+def preparar_filas_vale(inventario_empleado):
+    """
+    Calcula en una pasada por columnas los textos y tamaños de letra de la tabla
+    de bienes. Retorna (filas, total_valor); cada fila es una tupla
+    (numero, no_sep, no_inv, tamano_inv, descripcion, valor, observaciones, tamano_obs)
+    lista para emitir las celdas sin más cálculos; `descripcion` es la tupla de sus líneas.
+    """
+    anchos = ANCHOS_COLUMNAS_VALE
+    tamanos = (TAMANO_LETRA_FILA, TAMANO_LETRA_FILA_REDUCIDA)
+    no_seps = _valores_columna(inventario_empleado, 'No. SEP', '')
+    no_invs = _valores_columna(inventario_empleado, 'NUMERO DE INVVENTARIO', '')
+    descripciones = _valores_columna(inventario_empleado, 'DESCRIPCION', '')
+    valores = _valores_columna(inventario_empleado, 'VALOR', 0)
+    observaciones = _valores_columna(inventario_empleado, 'OBSERVACIONES', '')
+
+    filas = []
+    total_valor = 0
+    for numero, (no_sep, no_inv, descripcion, valor, observ) in enumerate(
+        zip(no_seps, no_invs, descripciones, valores, observaciones), 1
+    ):
+        no_sep = _texto_celda(no_sep)
+        no_inv = _texto_celda(no_inv)
+        if no_sep == '' and no_inv == '' and valor == 0:
+            observ = "EN PROCESO DE ALTA"
+        else:
+            observ = _texto_celda(observ)
+
+        texto_inv, tamano_inv = ajustar_texto_celda(no_inv, anchos[2], tamanos)
+        texto_obs, tamano_obs = ajustar_texto_celda(observ, anchos[5], tamanos)
+        filas.append((
+            str(numero),
+            ajustar_texto_celda(no_sep, anchos[1])[0],
+            texto_inv,
+            tamano_inv,
+            partir_texto_celda(str(descripcion), anchos[3]),
+            f"${valor:.2f}",
+            texto_obs,
+            tamano_obs,
+        ))
+        total_valor += valor
+    return filas, total_valor
+
+def dibujar_vale(pdf, datos_empleado, inventario_empleado, fecha):
+    """Dibuja un vale completo en `pdf` a partir de la página abierta con `pdf.iniciar_vale()`"""
+    # Título principal
+    pdf.set_font("Arial", 'B', 16)
+    pdf.cell(0, 8, "VALE DE RESGUARDO 2025", 0, 1, 'C')
+    pdf.ln(3)
+
+    # Sección de información del responsable - FORMATO MEJORADO CON 2 COLUMNAS PEGADAS
+    y_start = pdf.get_y()
+    pdf.rect(10, y_start, 190, 42)
+
+    # Título dentro del marco
+    pdf.set_font("Arial", 'B', 11)
+    pdf.set_xy(10, y_start + 3)
+    pdf.cell(190, 6, "INFORMACIÓN DEL RESPONSABLE", 0, 1, 'C')
+    pdf.line(10, y_start + 9, 200, y_start + 9)  # Línea bajo el título
+
+    # Línea vertical divisoria más a la derecha (120 en lugar de 130)
+    pdf.line(120, y_start + 9, 120, y_start + 42)
+
+    # Columna izquierda - Información más pegada
+    pdf.set_font("Arial", 'B', 8)
+    pdf.set_xy(12, y_start + 12)
+    pdf.cell(35, 5, "NOMBRE COMPLETO:", 0, 0)
+    pdf.set_font("Arial", '', 8)
+    nombre = f"{datos_empleado.get('NOMBRE', '')}"
+    # Ajustar nombre largo
+    if len(nombre) > 35:
+        nombre = nombre[:32] + "..."
+    pdf.cell(85, 5, nombre, 0, 1)
+
+    pdf.set_font("Arial", 'B', 8)
+    pdf.set_xy(12, y_start + 17)
+    pdf.cell(15, 5, "CURP:", 0, 0)
+    pdf.set_font("Arial", '', 8)
+    curp = f"{datos_empleado.get('CURP', '')}"
+    pdf.cell(93, 5, curp, 0, 1)
+
+    pdf.set_font("Arial", 'B', 8)
+    pdf.set_xy(12, y_start + 22)
+    pdf.cell(12, 5, "RFC:", 0, 0)
+    pdf.set_font("Arial", '', 8)
+    rfc = f"{datos_empleado.get('RFC', '')}"
+    pdf.cell(96, 5, rfc, 0, 1)
+
+    # Área de adscripción - Más compacta y pegada
+    pdf.set_font("Arial", 'B', 8)
+    pdf.set_xy(12, y_start + 27)
+    pdf.cell(42, 5, "AREA DE ADSCRIPCION:", 0, 0)
+    pdf.set_font("Arial", '', 8)
+    area = f"{datos_empleado.get('AREA O DEPARTAMENTO', '')}"
+
+    # Verificar si el área es demasiado larga para una línea
+    if len(area) > 20:
+        # Dividir en two líneas
+        mitad = len(area) // 2
+        espacio_idx = area.rfind(' ', 0, mitad)
+        if espacio_idx == -1:
+            espacio_idx = mitad
+
+        linea1 = area[:espacio_idx].strip()
+        linea2 = area[espacio_idx:].strip()
+
+        pdf.cell(66, 5, linea1, 0, 1)
+        pdf.set_x(54)
+        pdf.cell(66, 5, linea2, 0, 1)
+    else:
+        pdf.cell(66, 5, area, 0, 1)
+
+    # Campo EDIFICIO
+    pdf.set_font("Arial", 'B', 8)
+    pdf.set_xy(12, y_start + 37)
+    pdf.cell(25, 5, "EDIFICIO:", 0, 0)
+    pdf.set_font("Arial", '', 8)
+    edificio = f"{datos_empleado.get('EDIFICIO', '')}"
+    pdf.cell(83, 5, edificio, 0, 1)
+
+    # Columna derecha - Información más pegada y ajustada
+    pdf.set_font("Arial", 'B', 8)
+    pdf.set_xy(122, y_start + 12)
+    pdf.cell(38, 5, "CENTRO DE TRABAJO:", 0, 0)
+    pdf.set_font("Arial", '', 8)
+    ct = f"{datos_empleado.get('CT', 'COMISIONADO')}"
+    pdf.cell(40, 5, ct, 0, 1)
+
+    pdf.set_font("Arial", 'B', 8)
+    pdf.set_xy(122, y_start + 17)
+    pdf.cell(15, 5, "PISO:", 0, 0)
+    pdf.set_font("Arial", '', 8)
+    piso = f"{datos_empleado.get('PISO', '')}"
+    pdf.cell(63, 5, piso, 0, 1)
+
+    pdf.set_font("Arial", 'B', 8)
+    pdf.set_xy(122, y_start + 22)
+    pdf.cell(48, 5, "FECHA LEVANTAMIENTO:", 0, 0)
+    pdf.set_font("Arial", '', 8)
+    pdf.cell(30, 5, f"{fecha.strftime('%d/%m/%Y')}", 0, 1)
+
+    pdf.set_font("Arial", 'B', 8)
+    pdf.set_xy(122, y_start + 27)
+    pdf.cell(33, 5, "TOTAL MUEBLES:", 0, 0)
+    pdf.set_font("Arial", '', 8)
+    pdf.cell(45, 5, f"{len(inventario_empleado)}", 0, 1)
+
+    pdf.set_y(y_start + 43)
+
+    # Tabla de bienes - ANCHOS AJUSTADOS PARA OBSERVACIONES
+    pdf.set_font("Arial", 'B', 12)
+    pdf.cell(0, 8, "INVENTARIO OFICIAL DE BIENES MUEBLES", 0, 1, 'C')
+    pdf.ln(2)
+
+    # Encabezados de tabla con anchos OPTIMIZADOS para observaciones
+    col_widths = ANCHOS_COLUMNAS_VALE
+    headers = ["No.", "No. SEP", "NO. INVENTARIO", "DESCRIPCION DEL BIEN", "VALOR", "OBSERV."]
+
+    def draw_headers():
+        pdf.set_draw_color(0, 51, 102)
+        pdf.set_fill_color(230, 240, 250)
+        pdf.set_font("Arial", 'B', 7)
+        for i, header in enumerate(headers):
+            pdf.cell(col_widths[i], 7, header, 1, 0, 'C', fill=True)
+        pdf.ln()
+        pdf.set_font("Arial", '', TAMANO_LETRA_FILA)
+
+    draw_headers()
+
+    # MEJORA: Textos y tamaños de letra calculados antes del bucle; aquí solo se emiten celdas
+    filas, total_valor = preparar_filas_vale(inventario_empleado)
+    ancho_no, ancho_sep, ancho_inv, ancho_desc, ancho_valor, ancho_obs = col_widths
+    tamano_actual = TAMANO_LETRA_FILA
+    fila_par = True
+    for numero, no_sep, no_inv, tamano_inv, descripcion, valor, observ, tamano_obs in filas:
+        if pdf.get_y() > 220:
+            pdf.add_page()
+            draw_headers()
+            tamano_actual = TAMANO_LETRA_FILA
+
+        fila_par = not fila_par
+        if fila_par:
+            pdf.set_fill_color(245, 245, 245)
+        else:
+            pdf.set_fill_color(255, 255, 255)
+
+        pdf.cell(ancho_no, 6, numero, 1, 0, 'C', fill=True)
+        pdf.cell(ancho_sep, 6, no_sep, 1, 0, 'C', fill=True)
+
+        if tamano_inv != tamano_actual:
+            pdf.set_font_size(tamano_inv)
+            tamano_actual = tamano_inv
+        pdf.cell(ancho_inv, 6, no_inv, 1, 0, 'C', fill=True)
+
+        if tamano_actual != TAMANO_LETRA_FILA:
+            pdf.set_font_size(TAMANO_LETRA_FILA)
+            tamano_actual = TAMANO_LETRA_FILA
+        if len(descripcion) == 1:
+            pdf.cell(ancho_desc, 6, descripcion[0], 1, 0, 'L', fill=True)
+        else:
+            # Descripción partida: marco de la fila y una línea de texto por renglón
+            x, y = pdf.get_x(), pdf.get_y()
+            pdf.cell(ancho_desc, 6, "", 1, 0, 'L', fill=True)
+            alto_linea = 6 / len(descripcion)
+            for renglon, linea in enumerate(descripcion):
+                pdf.set_xy(x, y + renglon * alto_linea)
+                pdf.cell(ancho_desc, alto_linea, linea, 0, 0, 'L')
+            pdf.set_xy(x + ancho_desc, y)
+        pdf.cell(ancho_valor, 6, valor, 1, 0, 'R', fill=True)
+
+        if tamano_obs != tamano_actual:
+            pdf.set_font_size(tamano_obs)
+            tamano_actual = tamano_obs
+        pdf.cell(ancho_obs, 6, observ, 1, 0, 'C', fill=True)
+
+        pdf.ln()
+
+    # Total
+    pdf.set_font("Arial", 'B', 8)
+    pdf.set_fill_color(220, 230, 240)
+    pdf.cell(sum(col_widths[:4]), 7, "VALOR TOTAL DEL INVENTARIO:", 1, 0, 'R', fill=True)
+    pdf.cell(col_widths[4], 7, f"${total_valor:.2f}", 1, 0, 'R', fill=True)
+    pdf.cell(col_widths[5], 7, "", 1, 1, fill=True)
+
+    pdf.ln(8)
+
+    # Condiciones de resguardo
+    pdf.set_font("Arial", 'B', 9)
+    pdf.cell(0, 6, "CONDICIONES DE RESGUARDO", 0, 1, 'C')
+
+    pdf.set_font("Arial", '', 7)
+    condiciones = [
+        "- Los bienes muebles se entregan bajo custodia del resguardante.",
+        "- El resguardante es responsable conforme to the Ley General de Bienes Nacionales.",
+        "- Los bienes son propiedad institucional, no del personal.",
+        "- Debe notificar cualquier movimiento, pérdida or daño inmediatamente.",
+        "- En caso de cambio de adscripción or renuncia, debe devolver los bienes."
+    ]
+
+    for condicion in condiciones:
+        pdf.cell(0, 3.5, condicion, 0, 1)
+
+    pdf.ln(5)
+
+    # Sección de firmas
+    y_firmas = pdf.get_y()
+    pdf.rect(10, y_firmas, 190, 40)
+
+    # Título de la sección
+    pdf.set_font("Arial", 'B', 9)
+    pdf.set_xy(10, y_firmas + 3)
+    pdf.cell(190, 6, "FIRMAS", 0, 1, 'C')
+    pdf.line(10, y_firmas + 9, 200, y_firmas + 9)
+
+    # Línea vertical divisoria en el centro
+    pdf.line(105, y_firmas + 9, 105, y_firmas + 40)
+
+    # RESGUARDANTE (LADO IZQUIERDO)
+    pdf.set_font("Arial", 'B', 9)
+    pdf.set_xy(10, y_firmas + 12)
+    pdf.cell(95, 5, "RESGUARDANTE", 0, 0, 'C')
+
+    # Espacio para firma
+    pdf.set_font("Arial", '', 8)
+    pdf.set_xy(25, y_firmas + 22)
+    pdf.cell(65, 10, "_________________________", 0, 0, 'C')
+
+    nombre_resguardante = f"{datos_empleado.get('NOMBRE', '')}"
+    if len(nombre_resguardante) > 35:
+        nombre_resguardante = nombre_resguardante[:32] + "..."
+
+    pdf.set_xy(10, y_firmas + 32)
+    pdf.cell(95, 5, nombre_resguardante, 0, 0, 'C')
+
+    # AUTORIZA (LADO DERECHO)
+    pdf.set_font("Arial", 'B', 9)
+    pdf.set_xy(105, y_firmas + 12)
+    pdf.cell(95, 5, "AUTORIZA", 0, 0, 'C')
+
+    # Espacio para firma
+    pdf.set_font("Arial", '', 8)
+    pdf.set_xy(120, y_firmas + 22)
+    pdf.cell(65, 10, "_________________________", 0, 0, 'C')
+
+    pdf.set_xy(105, y_firmas + 32)
+    pdf.cell(95, 5, "EDNA SANCHEZ MARTINEZ", 0, 0, 'C')
+
+    pdf.set_font("Arial", 'I', 7)
+    pdf.set_xy(105, y_firmas + 37)
+    pdf.cell(95, 4, "Coordinadora Administrativa", 0, 0, 'C')